@@ -1,6 +1,9 @@
 from fastapi import APIRouter
-from .endpoints import posts
+from .endpoints import flags, posts, reactions, tags
 
 api_router = APIRouter()
 
-api_router.include_router(posts.router, prefix="/posts", tags=["posts"]) 
\ No newline at end of file
+api_router.include_router(posts.router, prefix="/posts", tags=["posts"])
+api_router.include_router(reactions.router, prefix="/reactions", tags=["reactions"])
+api_router.include_router(flags.router, prefix="/flags", tags=["flags"])
+api_router.include_router(tags.router, prefix="/tags", tags=["tags"])
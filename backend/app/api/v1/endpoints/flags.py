@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+import logging
+
+from ....auth import require_moderator
+from ....models.flag import FlagAccepted, FlagCreate, FlagResolution, FlagResolved, ReviewQueueItem
+from ....config import settings
+from ....database import database
+from ....moderation import flag_buffer, resolve_flags, review_queue_pipeline
+from ....pagination import InvalidCursor, decode_score_cursor, next_score_cursor
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("/", response_model=FlagAccepted, status_code=202)
+async def create_flag(flag: FlagCreate, request: Request):
+    """Flag a post for moderation.
+
+    Flags are buffered and written in batches, so ``flag_count`` may lag by
+    up to ``FLAG_FLUSH_INTERVAL_MS``. Each client address flags a post at
+    most once. A post flagged by ``FLAG_HIDE_THRESHOLD`` clients is hidden from feeds, search and exports until a
+    moderator resolves it. Flags of unknown posts are dropped at flush time.
+    """
+    client = request.client.host if request.client else "unknown"
+    flag_buffer.add(flag.post_id, flag.reason, client)
+    return FlagAccepted(post_id=flag.post_id, reason=flag.reason)
+
+@router.get("/queue", response_model=List[ReviewQueueItem], dependencies=[Depends(require_moderator)])
+async def get_review_queue(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Number of posts to return")
+):
+    """List posts with pending flags, most flagged first (moderators only).
+
+    Each post carries its pending flags grouped by reason, fetched in the
+    same aggregation as the page.
+    """
+    after = None
+    if cursor:
+        try:
+            flag_count, post_id = decode_score_cursor(cursor)
+            after = (int(flag_count), post_id)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    try:
+        collection = database.get_collection("posts")
+        posts = await collection.aggregate(review_queue_pipeline(limit, after)).to_list(length=limit)
+    except Exception as e:
+        logger.error(f"Error retrieving review queue: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve review queue")
+
+    page_cursor = next_score_cursor(posts, limit, field="flag_count")
+    if page_cursor:
+        response.headers["X-Next-Cursor"] = page_cursor
+    return posts
+
+@router.post("/{post_id}/resolve", response_model=FlagResolved, dependencies=[Depends(require_moderator)])
+async def resolve_post_flags(post_id: str, resolution: FlagResolution):
+    """Hide a flagged post for good or restore it (moderators only).
+
+    Its pending flags are marked resolved and its flag count reset. A
+    restored post is never hidden automatically again.
+    """
+    try:
+        before = await resolve_flags(ObjectId(post_id), resolution.action)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid post ID")
+    except Exception as e:
+        logger.error(f"Error resolving flags of post {post_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to resolve flags")
+    if before is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return FlagResolved(post_id=post_id, action=resolution.action, is_flagged=resolution.action == "hide")
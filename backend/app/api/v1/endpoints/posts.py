@@ -1,98 +1,528 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
-from datetime import datetime, UTC
+from fastapi import APIRouter, Cookie, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from datetime import datetime
+from pydantic import ValidationError
 from bson import ObjectId
+from bson.errors import InvalidId
+import asyncio
 import logging
 
-from ....models.post import PostCreate, PostResponse
-from ....database import database
+from ....models.post import BulkPostCreate, BulkPostItemResult, BulkPostResponse, PostCreate, PostResponse
+from ....database import READ_AFTER_COOKIE, database, decode_read_token, encode_read_token
 from ....config import settings
+from ....pagination import (
+    FEED_SORT, TRENDING_SORT, InvalidCursor, cursor_filter, decode_cursor, decode_score_cursor,
+    next_cursor, next_score_cursor, score_cursor_filter,
+)
+from ....cache import TRENDING_GROUP, RenderedBody, feed_group, feed_key, post_group, post_key, response_cache
+from ....ingest import NOT_ATTEMPTED, insert_post_documents, new_post_document, post_limit_error
+from ....tags import normalize_tag, update_tag_counts
+from ....search import search_backend
+from ....live import live_feed
+from ....archive import ARCHIVE_COLLECTION, post_archive
+from ....duplicates import duplicate_detector
+from ....moderation import VISIBLE, duplicate_flag, mark_duplicate
+from ....single_flight import single_flight
+from ....auth import require_operator
+from ....negotiation import MSGPACK, NDJSON, VARY, Representation, response_encoder
+from ....conditional import http_date, is_not_modified, last_modified, page_etag, public_cache_control
+from ....serialization import DETAIL_PROJECTION, POST_PROJECTION, TRENDING_PROJECTION, render_post, render_posts
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Export output is flushed to the client in chunks of roughly this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Responses computed for a client's own recent write must not be shared
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+def _body_response(rendered: RenderedBody, cache_status: Optional[str] = None,
+                   request: Optional[Request] = None, cache_control: Optional[str] = None,
+                   vary: Optional[str] = None) -> Response:
+    """Wrap a rendered body, exposing the next-page cursor and validators as headers.
+
+    If ``request`` carries a matching ``If-None-Match`` or
+    ``If-Modified-Since``, a bodyless 304 is returned instead.
+    """
+    headers = {"X-Cache": cache_status} if cache_status else {}
+    if vary:
+        headers["Vary"] = vary
+    if rendered.page_cursor:
+        headers["X-Next-Cursor"] = rendered.page_cursor
+    if rendered.etag:
+        headers["ETag"] = rendered.etag
+    if rendered.last_modified is not None:
+        headers["Last-Modified"] = http_date(rendered.last_modified)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if request is not None and is_not_modified(request.headers, rendered.etag, rendered.last_modified):
+        return Response(status_code=304, headers=headers)
+    if rendered.content_encoding:
+        headers["Content-Encoding"] = rendered.content_encoding
+    return Response(content=rendered.body, media_type=rendered.media_type, headers=headers)
+
+async def _encoded_response(rendered: RenderedBody, representation: Representation, cache_status: str,
+                            request: Request, cache_control: str, variant_key: Optional[str],
+                            cache_version: int) -> Response:
+    """Serve a plain JSON body as the negotiated ``representation``.
+
+    The encoded body is cached under ``variant_key`` with the JSON's
+    invalidation groups, so a hot page is compressed once per change rather
+    than once per request. Without a ``variant_key`` it is encoded for this
+    response only.
+    """
+    if not representation.suffix:
+        return _body_response(rendered, cache_status, request, cache_control, VARY)
+    etag = response_encoder.etag(rendered, representation)
+    if is_not_modified(request.headers, etag, rendered.last_modified):
+        return _body_response(rendered._replace(etag=etag), cache_status, request, cache_control, VARY)
+    if variant_key is None:
+        encoded = await response_encoder.encode_async(rendered, representation)
+    else:
+        async def encode_variant():
+            encoded = await response_encoder.encode_async(rendered, representation)
+            await response_cache.set(variant_key, encoded, rendered.groups, cache_version)
+            return encoded
+        # Concurrent requests for a page that was just invalidated compress it once
+        encoded = await single_flight.do(variant_key, encode_variant)
+    return _body_response(encoded, cache_status, request, cache_control, VARY)
+
+async def _cached_variant(cache_key: str, variant_key: str, representation: Representation, request: Request,
+                          cache_control: str, cache_version: int) -> Optional[Response]:
+    """Serve a cached body in the negotiated representation, encoding the cached JSON if needed."""
+    cached = await response_cache.get(variant_key)
+    if cached is not None:
+        return _body_response(cached, "HIT", request, cache_control, VARY)
+    if variant_key != cache_key:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return await _encoded_response(cached, representation, "HIT", request, cache_control, variant_key,
+                                           cache_version)
+    return None
+
+def _normalize_tag(tag: str) -> str:
+    """Sanitize a tag filter from the query string."""
+    tag = normalize_tag(tag)
+    if len(tag) > 50:  # Reasonable tag length limit
+        raise HTTPException(status_code=400, detail="Tag too long")
+    return tag
+
 @router.post("/", response_model=PostResponse)
-async def create_post(post: PostCreate):
-    """Create a new anonymous post."""
+async def create_post(post: PostCreate, response: Response):
+    """Create a new anonymous post.
+
+    The write's operation time is returned in the ``read_after`` cookie so
+    the creator's next feed reads see the post even from a lagging secondary.
+    Public posts repeating recent posts too often are flagged or rejected
+    with 409, depending on ``DUPLICATE_ACTION``.
+    """
     collection = database.get_collection("posts")
     
-    # Validate content length
-    if len(post.content) > settings.MAX_CONTENT_LENGTH:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Content too long. Maximum {settings.MAX_CONTENT_LENGTH} characters allowed."
-        )
+    # Validate content length and number of tags
+    limit_error = post_limit_error(post)
+    if limit_error:
+        raise HTTPException(status_code=400, detail=limit_error)
     
-    # Validate number of tags
-    if len(post.tags) > settings.MAX_TAGS_PER_POST:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Too many tags. Maximum {settings.MAX_TAGS_PER_POST} tags allowed."
-        )
+    if not post.is_private:
+        verdict = await duplicate_detector.check(post.content)
+        if verdict.action == "reject":
+            raise HTTPException(status_code=409, detail="Too many near-identical posts recently")
     
-    post_data = post.model_dump()
-    post_data["created_at"] = datetime.now(UTC)
-    post_data["is_flagged"] = False
-    post_data["reaction_counts"] = {"same": 0, "helpful": 0, "upvote": 0}
+    post_data = new_post_document(post)
+    if not post.is_private and verdict.action == "flag":
+        mark_duplicate(post_data)
     
     try:
-        result = await collection.insert_one(post_data)
+        async with database.write_session() as session:
+            result = await collection.insert_one(post_data, session=session)
+            if post_data["is_flagged"]:
+                await database.get_collection("flags").insert_one(duplicate_flag(result.inserted_id), session=session)
+            operation_time = session.operation_time if session else None
         post_data["_id"] = str(result.inserted_id)
+        if operation_time is not None:
+            response.set_cookie(
+                READ_AFTER_COOKIE, encode_read_token(operation_time),
+                max_age=settings.FEED_MAX_STALENESS_SECONDS, httponly=True, samesite="lax",
+            )
+        search_backend.add(post_data)
+        live_feed.source.post_created(post_data)
+        if not post.is_private and not post_data["is_flagged"]:
+            await update_tag_counts(database.get_collection("tags"), [post.tags])
+            await response_cache.invalidate(
+                [feed_group(None), TRENDING_GROUP] + [feed_group(normalize_tag(tag)) for tag in post.tags]
+            )
         return PostResponse(**post_data)
     except Exception as e:
         logger.error(f"Error creating post: {e}")
         raise HTTPException(status_code=500, detail="Failed to create post")
 
+@router.post("/bulk", response_model=BulkPostResponse, dependencies=[Depends(require_operator)])
+async def create_posts_bulk(batch: BulkPostCreate):
+    """Create many posts at once, reporting success or failure per item (operators only).
+
+    Meant for migrations and load tests, so it skips the near-duplicate
+    check of ``create_post`` and needs ``X-Operator-Token``. Bulk posts are
+    not pushed to live feed subscribers; they see them on their next refetch.
+
+    Valid items are written with chunked ``insert_many`` calls (unordered
+    unless ``ordered`` is set); invalid items are skipped and reported.
+    """
+    if len(batch.posts) > settings.BULK_MAX_POSTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many posts. Maximum {settings.BULK_MAX_POSTS} posts per request."
+        )
+    
+    results = [BulkPostItemResult(index=i) for i in range(len(batch.posts))]
+    documents, positions = [], []
+    for i, item in enumerate(batch.posts):
+        try:
+            post = PostCreate.model_validate(item)
+        except ValidationError as e:
+            results[i].error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            continue
+        limit_error = post_limit_error(post)
+        if limit_error:
+            results[i].error = limit_error
+            continue
+        documents.append(new_post_document(post))
+        positions.append(i)
+    
+    if batch.ordered:
+        # An ordered batch stops at its first invalid item
+        first_invalid = next((i for i, result in enumerate(results) if result.error), None)
+        if first_invalid is not None:
+            cut = sum(1 for i in positions if i < first_invalid)
+            for i in positions[cut:]:
+                results[i].error = NOT_ATTEMPTED
+            documents, positions = documents[:cut], positions[:cut]
+    
+    try:
+        errors = await insert_post_documents(database.get_collection("posts"), documents, ordered=batch.ordered)
+    except Exception as e:
+        logger.error(f"Error creating posts in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create posts")
+    
+    public_tags = []
+    for document, i, error in zip(documents, positions, errors):
+        if error:
+            results[i].error = error
+            continue
+        results[i].id = str(document["_id"])
+        search_backend.add(document)
+        if not document["is_private"]:
+            public_tags.append(document["tags"])
+    if public_tags:
+        counts = await update_tag_counts(database.get_collection("tags"), public_tags)
+        await response_cache.invalidate([feed_group(None), TRENDING_GROUP] + [feed_group(tag) for tag in counts])
+    
+    inserted = sum(1 for result in results if result.id)
+    return BulkPostResponse(inserted=inserted, failed=len(results) - inserted, results=results)
+
 @router.get("/", response_model=List[PostResponse])
 async def get_posts(
-    skip: int = Query(0, ge=0, description="Number of posts to skip"),
+    request: Request,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of posts to skip (deprecated, use cursor)"),
     limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Number of posts to return"),
-    tag: Optional[str] = Query(None, description="Filter by tag")
+    tag: Optional[str] = Query(None, description="Filter by tag"),
+    sort: Literal["recent", "trending"] = Query("recent", description="Chronological or trending order"),
+    read_after: Optional[str] = Cookie(None, alias=READ_AFTER_COOKIE)
 ):
-    """Get posts (chronological order, excluding private posts)."""
+    """Get posts (chronological or trending order, excluding private and hidden posts).
+
+    The trending order ranks posts by a time-decayed reaction score kept up
+    to date by a background worker. Pages are chained with keyset pagination: the ``X-Next-Cursor`` response
+    header holds the position of the last post and is passed back as
+    ``cursor`` to fetch the next page. ``skip`` is kept for older clients only.
+    Rendered pages are served from the response cache when possible.
+
+    Reads may go to a secondary. A client that just created a post carries
+    its write's operation time in a cookie; its reads skip the cache and
+    wait in a causally consistent session until that write is visible.
+
+    Responses carry an ``ETag``; a request whose ``If-None-Match`` still
+    matches gets a 304, straight from the cache when the page is cached.
+    Pages have no ``Last-Modified``, since a post dropping out of a page
+    changes it without changing any time on it.
+
+    The body is JSON or, if the client's ``Accept`` prefers it, msgpack,
+    compressed as its ``Accept-Encoding`` allows. Encoded pages are cached
+    next to the JSON, each with its own ``ETag``.
+    """
     try:
-        collection = database.get_collection("posts")
+        collection = database.get_read_collection("posts")
+        after = decode_read_token(read_after)
         
         # Build query
-        query = {"is_private": False}
+        query = dict(VISIBLE)
         if tag:
-            # Sanitize tag input
-            tag = tag.strip().lower()
-            if len(tag) > 50:  # Reasonable tag length limit
-                raise HTTPException(status_code=400, detail="Tag too long")
+            tag = _normalize_tag(tag)
             query["tags"] = tag
+        trending = sort == "trending"
         
-        cursor = collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
-        posts = await cursor.to_list(length=limit)
+        if cursor:
+            if skip:
+                raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
+            try:
+                if trending:
+                    query.update(score_cursor_filter(*decode_score_cursor(cursor)))
+                else:
+                    query.update(cursor_filter(*decode_cursor(cursor)))
+            except InvalidCursor:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
         
-        # Convert ObjectIds to strings for Pydantic
-        for post in posts:
-            post["_id"] = str(post["_id"])
+        representation = response_encoder.negotiate(request.headers)
+        cache_key = feed_key(sort, tag, cursor, skip, limit)
+        variant_key = representation.cache_key(cache_key) if after is None else None
+        cache_control = public_cache_control() if after is None else PRIVATE_CACHE_CONTROL
+        cache_version = response_cache.version
+        if after is None:
+            cached = await _cached_variant(cache_key, variant_key, representation, request, cache_control,
+                                           cache_version)
+            if cached is not None:
+                return cached
         
-        return [PostResponse(**post) for post in posts]
+        async def load_page():
+            async with database.read_session(after) as session:
+                if trending:
+                    find = collection.find(query, TRENDING_PROJECTION, session=session).sort(TRENDING_SORT)
+                else:
+                    find = collection.find(query, POST_PROJECTION, session=session).sort(FEED_SORT)
+                if skip:
+                    find = find.skip(skip)
+                posts = await find.limit(limit).to_list(length=limit)
+                if not trending and not skip:
+                    # Older posts may have moved to the archive tier
+                    posts = await post_archive.fill_page(query, posts, limit, POST_PROJECTION, session)
+            page_cursor = next_score_cursor(posts, limit) if trending else next_cursor(posts, limit)
+            etag = page_etag(posts, page_cursor)
+            for post in posts:
+                # Only fetched for the cursor
+                post.pop("trending_score", None)
+            
+            # Chronological cursor pages only hold posts older than the cursor,
+            # so new posts never change them; head and skip pages shift on every
+            # new post. Any trending page can change when scores are recomputed.
+            groups = [post_group(post["_id"]) for post in posts]
+            if trending:
+                groups.append(TRENDING_GROUP)
+            elif not cursor:
+                groups.append(feed_group(tag))
+            rendered = RenderedBody(render_posts(posts), page_cursor, etag, groups=tuple(groups))
+            await response_cache.set(cache_key, rendered, rendered.groups, cache_version)
+            return rendered
+        
+        # Concurrent misses for the same page share one query; reads tied to
+        # a client's own write run alone so they wait for that write
+        rendered = await single_flight.do(cache_key, load_page) if after is None else await load_page()
+        return await _encoded_response(rendered, representation, "MISS", request, cache_control, variant_key,
+                                       cache_version)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving posts: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve posts: {str(e)}")
 
+@router.get("/search", response_model=List[PostResponse])
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Number of posts to return")
+):
+    """Search public posts by content, most relevant first."""
+    after = None
+    if cursor:
+        try:
+            after = decode_score_cursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    try:
+        posts = await search_backend.search(q, limit, after)
+    except Exception as e:
+        logger.error(f"Error searching posts: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search posts")
+    
+    page_cursor = next_score_cursor(posts, limit, field="search_score")
+    for post in posts:
+        post.pop("search_score", None)
+    return _body_response(RenderedBody(render_posts(posts), page_cursor))
+
+@router.get("/live")
+async def live_posts(tag: Optional[str] = Query(None, description="Only push new posts with this tag")):
+    """Push new public posts and reaction count updates as Server-Sent Events.
+
+    ``post`` events carry a new post; ``reactions`` events carry the new
+    counts of a post's changed reaction types. A client that falls too far
+    behind is disconnected and should reconnect and refetch the feed.
+    """
+    subscriber = live_feed.subscribe(_normalize_tag(tag) if tag else None)
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many live subscribers")
+    
+    async def events():
+        try:
+            yield b": connected\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps idle connections open through proxies
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            live_feed.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/export")
+async def export_posts(
+    request: Request,
+    tag: Optional[str] = Query(None, description="Filter by tag"),
+    since: Optional[datetime] = Query(None, description="Only posts created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only posts created before this time"),
+    compress: bool = Query(False, description="Download the export as a gzip file")
+):
+    """Stream every public post that is not hidden as NDJSON, oldest first.
+
+    A client whose ``Accept`` prefers ``application/msgpack`` gets a stream
+    of msgpack maps instead. The stream is compressed as ``Accept-Encoding``
+    allows, unless ``compress`` asks for a ``.gz`` file download.
+
+    Documents are pulled from a Motor cursor in batches of
+    ``EXPORT_BATCH_SIZE`` and written as they arrive, so memory use does not
+    grow with the corpus and a slow client simply slows the cursor down.
+    Archived posts are all older than the ones in ``posts``, so the archive
+    is streamed first.
+    """
+    query = dict(VISIBLE)
+    if tag:
+        query["tags"] = _normalize_tag(tag)
+    if since and until and since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if since or until:
+        query["created_at"] = {}
+        if since:
+            query["created_at"]["$gte"] = since
+        if until:
+            query["created_at"]["$lt"] = until
+    
+    tiers = [ARCHIVE_COLLECTION, "posts"] if post_archive.enabled else ["posts"]
+    cursors = [
+        database.get_read_collection(name).find(query, POST_PROJECTION)
+        .sort([("created_at", 1), ("_id", 1)]).batch_size(settings.EXPORT_BATCH_SIZE)
+        for name in tiers
+    ]
+    
+    if compress:
+        representation = Representation(NDJSON)
+        compressor = response_encoder.compressobj("gzip")
+    else:
+        representation = response_encoder.negotiate(request.headers, [NDJSON, MSGPACK])
+        compressor = response_encoder.compressobj(representation.encoding)
+    as_msgpack = representation.media_type == MSGPACK
+    
+    async def records():
+        chunk = bytearray()
+        try:
+            for cursor in cursors:
+                async for post in cursor:
+                    if as_msgpack:
+                        chunk += response_encoder.to_msgpack(render_post(post))
+                    else:
+                        chunk += render_post(post)
+                        chunk += b"\n"
+                    if len(chunk) >= EXPORT_CHUNK_BYTES:
+                        data = compressor.compress(bytes(chunk)) if compressor else bytes(chunk)
+                        if data:
+                            yield data
+                        chunk.clear()
+            if compressor:
+                yield compressor.compress(bytes(chunk)) + compressor.flush()
+            elif chunk:
+                yield bytes(chunk)
+        except Exception as e:
+            # Headers are already sent, so the client sees a truncated stream
+            logger.error(f"Error exporting posts: {e}")
+            raise
+        finally:
+            for cursor in cursors:
+                await cursor.close()
+    
+    if compress:
+        filename, media_type, headers = "posts.ndjson.gz", "application/gzip", {}
+    else:
+        filename = "posts.msgpack" if as_msgpack else "posts.ndjson"
+        media_type, headers = representation.media_type, {"Vary": VARY}
+        if representation.encoding:
+            headers["Content-Encoding"] = representation.encoding
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(records(), media_type=media_type, headers=headers)
+
 @router.get("/{post_id}", response_model=PostResponse)
-async def get_post(post_id: str):
-    """Get a specific post by ID."""
-    collection = database.get_collection("posts")
+async def get_post(request: Request, post_id: str,
+                   read_after: Optional[str] = Cookie(None, alias=READ_AFTER_COOKIE)):
+    """Get a specific post by ID, honouring ``If-None-Match``/``If-Modified-Since``.
+
+    The body is negotiated like the feed's. Only public posts that are not
+    hidden are cached and marked shareable; private and flagged posts are
+    read from the database every time and sent as ``private``.
+    """
+    collection = database.get_read_collection("posts")
+    after = decode_read_token(read_after)
     
     # Validate post_id format
     if not post_id or len(post_id) != 24:
         raise HTTPException(status_code=400, detail="Invalid post ID format")
     
-    try:
-        post = await collection.find_one({"_id": ObjectId(post_id)})
+    representation = response_encoder.negotiate(request.headers)
+    cache_key = post_key(post_id)
+    variant_key = representation.cache_key(cache_key) if after is None else None
+    cache_control = public_cache_control() if after is None else PRIVATE_CACHE_CONTROL
+    cache_version = response_cache.version
+    if after is None:
+        cached = await _cached_variant(cache_key, variant_key, representation, request, cache_control, cache_version)
+        if cached is not None:
+            return cached
+    
+    async def load_post():
+        async with database.read_session(after) as session:
+            post = await collection.find_one({"_id": ObjectId(post_id)}, DETAIL_PROJECTION, session=session)
+            if not post:
+                post = await post_archive.find_post({"_id": ObjectId(post_id)}, DETAIL_PROJECTION, session=session)
         if not post:
             raise HTTPException(status_code=404, detail="Post not found")
         
-        # Convert ObjectId to string for Pydantic
-        post["_id"] = str(post["_id"])
-        return PostResponse(**post)
-    except ValueError:
+        etag, modified = page_etag([post]), last_modified([post])
+        post.pop("reactions_updated_at", None)
+        post.pop("moderated_at", None)
+        rendered = RenderedBody(render_post(post), None, etag, modified, groups=(post_group(post_id),))
+        shared = not post.get("is_private") and not post.get("is_flagged")
+        if shared:
+            await response_cache.set(cache_key, rendered, rendered.groups, cache_version)
+        return rendered, shared
+    
+    try:
+        # A linked post draws many identical concurrent misses; they share one query
+        rendered, shared = await single_flight.do(cache_key, load_post) if after is None else await load_post()
+        if not shared:
+            cache_control, variant_key = PRIVATE_CACHE_CONTROL, None
+        return await _encoded_response(rendered, representation, "MISS", request, cache_control, variant_key,
+                                       cache_version)
+    except HTTPException:
+        raise
+    except (InvalidId, ValueError):
         raise HTTPException(status_code=400, detail="Invalid post ID")
     except Exception as e:
         logger.error(f"Error retrieving post {post_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve post") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to retrieve post")
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Cookie, Response
+from typing import Optional
+import re
+import secrets
+
+from ....models.reaction import ReactionCreate, ReactionAccepted
+from ....reaction_buffer import reaction_buffer
+
+router = APIRouter()
+
+# Anonymous client token reactions are deduplicated on
+REACTOR_COOKIE = "reactor"
+REACTOR_COOKIE_MAX_AGE = 365 * 24 * 3600
+_REACTOR_TOKEN = re.compile(r"[A-Za-z0-9_-]{16,64}")
+
+@router.post("/", response_model=ReactionAccepted, status_code=202)
+async def create_reaction(reaction: ReactionCreate, response: Response,
+                          reactor: Optional[str] = Cookie(None, alias=REACTOR_COOKIE)):
+    """React to a post.
+
+    The reaction is buffered and applied to the post's ``reaction_counts``
+    on the next batched flush, so counts may lag by up to
+    ``REACTION_FLUSH_INTERVAL_MS``. Reactions to unknown posts are dropped
+    at flush time.
+
+    Each client counts once per post and reaction type, identified by the
+    ``reactor`` cookie. A client without one is given a new cookie and this
+    reaction is counted under it, so its next reactions with the cookie are
+    recognized as the same client's.
+    """
+    if reactor is None or not _REACTOR_TOKEN.fullmatch(reactor):
+        reactor = secrets.token_urlsafe(16)
+        response.set_cookie(REACTOR_COOKIE, reactor, max_age=REACTOR_COOKIE_MAX_AGE,
+                            httponly=True, samesite="lax")
+    reaction_buffer.add(reaction.post_id, reaction.reaction_type, client=reactor)
+    return ReactionAccepted(post_id=reaction.post_id, reaction_type=reaction.reaction_type)
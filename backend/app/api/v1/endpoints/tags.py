@@ -0,0 +1,58 @@
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import List
+import logging
+
+import orjson
+
+from ....models.tag import TagResponse
+from ....database import database
+from ....cache import RenderedBody, response_cache
+from ....tags import MAX_SUGGESTIONS, normalize_tag, tag_suggester
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/top", response_model=List[TagResponse])
+async def get_top_tags(
+    limit: int = Query(20, ge=1, le=100, description="Number of tags to return")
+):
+    """Get the most used tags.
+
+    Reads the first ``limit`` entries of the ``usage_count`` index, which is
+    kept up to date as posts are created. Results are cached briefly and not
+    invalidated on writes, so counts may lag by the cache TTL.
+    """
+    cache_key = f"tags:top:{limit}"
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached.body, media_type="application/json", headers={"X-Cache": "HIT"})
+    cache_version = response_cache.version
+    
+    try:
+        collection = database.get_collection("tags")
+        cursor = collection.find({"usage_count": {"$gt": 0}}, {"_id": 0, "name": 1, "usage_count": 1})
+        tags = await cursor.sort("usage_count", -1).limit(limit).to_list(length=limit)
+    except Exception as e:
+        logger.error(f"Error retrieving top tags: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve tags")
+    
+    body = orjson.dumps(tags)
+    await response_cache.set(cache_key, RenderedBody(body), [], cache_version)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+@router.get("/suggest", response_model=List[TagResponse])
+async def suggest_tags(
+    prefix: str = Query(..., min_length=1, max_length=50, description="Start of the tag being typed"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS, description="Number of tags to return")
+):
+    """Suggest existing tags starting with ``prefix``, most used first.
+
+    Served from an in-memory index of the ``tags`` collection without a
+    database round trip, so clients can reuse tags instead of inventing
+    near-duplicates.
+    """
+    prefix = normalize_tag(prefix)
+    if not prefix:
+        raise HTTPException(status_code=400, detail="Prefix must not be blank")
+    tags = [{"name": name, "usage_count": count} for name, count in tag_suggester.suggest(prefix, limit)]
+    return Response(content=orjson.dumps(tags), media_type="application/json")
@@ -0,0 +1,122 @@
+from datetime import datetime
+from typing import List, Optional
+import logging
+
+from pymongo.errors import BulkWriteError
+
+from .config import settings
+from .database import database
+from .moderation import VISIBLE
+from .pagination import FEED_SORT, cursor_filter
+from .sketches import SKETCH_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLLECTION = "posts_archive"
+
+# Server error code for a duplicate _id
+DUPLICATE_KEY = 11000
+
+# Archival scans every post once, in passes that each match an index:
+# visible posts via feed_recent, private via archive_private, hidden via is_flagged
+ARCHIVE_PASSES = [VISIBLE, {"is_private": True}, {"is_private": False, "is_flagged": True}]
+
+
+async def collection_stats(db, name: str) -> dict:
+    """Document count, data size and index sizes of a collection, in bytes."""
+    pipeline = [{"$collStats": {"storageStats": {}}}]
+    result = await db[name].aggregate(pipeline).to_list(length=1)
+    storage = result[0]["storageStats"] if result else {}
+    return {
+        "count": storage.get("count", 0),
+        "size": storage.get("size", 0),
+        "storage_size": storage.get("storageSize", 0),
+        "index_size": storage.get("totalIndexSize", 0),
+        "index_sizes": dict(storage.get("indexSizes", {})),
+    }
+
+
+async def archive_posts(db, cutoff: datetime, batch_size: int) -> int:
+    """Move posts created before ``cutoff`` from ``posts`` to ``posts_archive``.
+
+    Each batch is copied before it is deleted, so an interrupted run loses
+    nothing: posts already copied are skipped as duplicates on the next run
+    and then deleted, along with their reactor sketches. Visible, private and hidden posts are moved in separate
+    passes so every scan is bounded by an index. Returns the number of posts
+    moved.
+    """
+    posts, archive = db.posts, db[ARCHIVE_COLLECTION]
+    moved = 0
+    for selector in ARCHIVE_PASSES:
+        query = {**selector, "created_at": {"$lt": cutoff}}
+        while True:
+            batch = await posts.find(query).sort("created_at", 1).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+            try:
+                await archive.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != DUPLICATE_KEY for error in errors):
+                    raise
+            ids = [post["_id"] for post in batch]
+            result = await posts.delete_many({"_id": {"$in": ids}})
+            # Archived posts take no more reactions, so their reactor sketches are dead weight
+            await db[SKETCH_COLLECTION].delete_many({"_id": {"$in": ids}})
+            moved += result.deleted_count
+            logger.info(f"Archived {moved} posts")
+    return moved
+
+
+class PostArchive:
+    """Read-through access to archived posts.
+
+    Archived posts are older than every post left in ``posts``, so the
+    chronological feed and single-post reads only need the archive once the
+    hot tier has nothing more to give: a short page is topped up from
+    ``posts_archive`` and a missing id is looked up there. Trending and
+    search only cover the hot tier, and reactions to archived posts are
+    dropped, like reactions to unknown posts.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.page_reads = 0
+        self.post_reads = 0
+        self.hits = 0
+
+    async def fill_page(self, query: dict, posts: List[dict], limit: int, projection: dict, session=None) -> List[dict]:
+        """Top up a chronological page the hot tier left short, in place."""
+        if not self.enabled or len(posts) >= limit:
+            return posts
+        if posts:
+            # Continue right after the last hot post
+            query = {**query, **cursor_filter(posts[-1]["created_at"], posts[-1]["_id"])}
+        self.page_reads += 1
+        missing = limit - len(posts)
+        collection = database.get_read_collection(ARCHIVE_COLLECTION)
+        find = collection.find(query, projection, session=session).sort(FEED_SORT)
+        older = await find.limit(missing).to_list(length=missing)
+        if older:
+            self.hits += 1
+            posts.extend(older)
+        return posts
+
+    async def find_post(self, query: dict, projection: dict, session=None) -> Optional[dict]:
+        """Look up a post the hot tier does not have."""
+        if not self.enabled:
+            return None
+        self.post_reads += 1
+        collection = database.get_read_collection(ARCHIVE_COLLECTION)
+        post = await collection.find_one(query, projection, session=session)
+        if post is not None:
+            self.hits += 1
+        return post
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {"enabled": self.enabled, "page_reads": self.page_reads, "post_reads": self.post_reads, "hits": self.hits}
+
+
+# Global archive tier
+post_archive = PostArchive(settings.ARCHIVE_READS)
@@ -0,0 +1,24 @@
+from fastapi import Header, HTTPException
+from typing import Optional
+import hmac
+
+from .config import settings
+
+
+def _check_token(provided: Optional[str], expected: str, disabled: str, invalid: str):
+    """403 unless ``provided`` matches ``expected``; an empty ``expected`` disables the endpoint."""
+    if not expected:
+        raise HTTPException(status_code=403, detail=disabled)
+    # compare_digest only takes ASCII str, and headers may carry any Latin-1 text
+    if not provided or not hmac.compare_digest(provided.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail=invalid)
+
+
+def require_moderator(x_moderator_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured ``MODERATOR_TOKEN``."""
+    _check_token(x_moderator_token, settings.MODERATOR_TOKEN, "Moderation is disabled", "Invalid moderator token")
+
+
+def require_operator(x_operator_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured ``OPERATOR_TOKEN``."""
+    _check_token(x_operator_token, settings.OPERATOR_TOKEN, "Bulk ingestion is disabled", "Invalid operator token")
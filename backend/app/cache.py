@@ -0,0 +1,372 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Interface for response cache storage.
+
+    Values are opaque bytes. Every entry is tagged with invalidation groups
+    (e.g. ``feed:<tag>`` or ``post:<id>``) so writes can drop exactly the
+    entries they affect. Backends shared between workers call
+    ``on_remote_invalidation`` when another worker's write invalidated
+    entries, or when such invalidations may have been missed.
+    """
+
+    on_remote_invalidation: Optional[Callable[[], None]] = None
+
+    async def start(self):
+        """Open connections and background listeners."""
+
+    async def close(self):
+        """Release connections and background listeners."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, groups: Iterable[str]):
+        raise NotImplementedError
+
+    async def invalidate(self, groups: Iterable[str]):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Bounded LRU cache with a TTL, local to the current process."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[bytes, float, tuple]]" = OrderedDict()
+        self._groups: Dict[str, Set[str]] = {}
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.get_local(key)
+
+    async def set(self, key: str, value: bytes, groups: Iterable[str]):
+        self.set_local(key, value, groups)
+
+    async def invalidate(self, groups: Iterable[str]):
+        self.invalidate_local(groups)
+
+    def get_local(self, key: str) -> Optional[bytes]:
+        """Return a live value for ``key`` and mark it recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set_local(self, key: str, value: bytes, groups: Iterable[str]):
+        if self.max_entries <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        groups = tuple(groups)
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds, groups)
+        for group in groups:
+            self._groups.setdefault(group, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_local(self, groups: Iterable[str]):
+        for group in groups:
+            for key in self._groups.pop(group, ()):
+                if key in self._entries:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._groups.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: str):
+        _, _, groups = self._entries.pop(key)
+        for group in groups:
+            members = self._groups.get(group)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._groups[group]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by all workers through a Redis-protocol server.
+
+    Each worker keeps a small, short-lived local copy of hot entries in front
+    of Redis, filled on writes and on remote hits. Invalidations delete the
+    shared entries and are broadcast over pub/sub so every worker also drops
+    its local copy. Values are stored behind a JSON line of their groups, so
+    a remote hit can be copied locally under the same groups.
+    """
+
+    def __init__(self, client, ttl_seconds: float, local: MemoryCacheBackend,
+                 namespace: str = "unlinked:cache:"):
+        self.client = client
+        self.ttl_seconds = max(1, int(ttl_seconds))
+        self.local = local
+        self.namespace = namespace
+        self.group_prefix = f"{namespace}group:"
+        self.channel = f"{namespace}invalidate"
+        self.worker_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self.errors = 0
+        self.remote_invalidations = 0
+
+    async def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.client.aclose()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self.local.get_local(key)
+        if value is not None:
+            return value
+        try:
+            stored = await self.client.get(self.namespace + key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache read failed: {e}")
+            return None
+        if stored is None:
+            return None
+        groups, _, value = stored.partition(b"\n")
+        try:
+            groups = json.loads(groups)
+        except ValueError:
+            # Written by an older version sharing the Redis cache
+            return None
+        if not isinstance(groups, list):
+            return None
+        self.local.set_local(key, value, groups)
+        return value
+
+    async def set(self, key: str, value: bytes, groups: Iterable[str]):
+        groups = tuple(groups)
+        self.local.set_local(key, value, groups)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            # json.dumps escapes newlines, so the groups stay on one line
+            pipe.set(self.namespace + key, json.dumps(groups).encode() + b"\n" + value, ex=self.ttl_seconds)
+            for group in groups:
+                pipe.sadd(self.group_prefix + group, key)
+                pipe.expire(self.group_prefix + group, self.ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache write failed: {e}")
+
+    async def invalidate(self, groups: Iterable[str]):
+        groups = list(groups)
+        self.local.invalidate_local(groups)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for group in groups:
+                pipe.smembers(self.group_prefix + group)
+            members = await pipe.execute()
+            keys = {self.namespace + k.decode() for group_keys in members for k in group_keys}
+            keys.update(self.group_prefix + group for group in groups)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(*keys)
+            pipe.publish(self.channel, json.dumps({"origin": self.worker_id, "groups": groups}))
+            await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache invalidation failed: {e}")
+
+    async def _listen(self):
+        """Drop local copies invalidated by other workers."""
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") == self.worker_id:
+                        continue
+                    self.local.invalidate_local(payload.get("groups", []))
+                    self.remote_invalidations += 1
+                    self._remote_invalidation()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                # Local copies may now be stale; drop them all before resubscribing
+                self.local.clear()
+                self._remote_invalidation()
+                logger.warning(f"Cache invalidation listener failed, retrying: {e}")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    def _remote_invalidation(self):
+        if self.on_remote_invalidation is not None:
+            self.on_remote_invalidation()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "local": self.local.stats(),
+            "errors": self.errors,
+            "remote_invalidations": self.remote_invalidations,
+        }
+
+
+def create_cache_backend(url: str) -> CacheBackend:
+    """Build a cache backend from a URL.
+
+    ``memory://`` keeps entries in-process, ``redis://``/``rediss://`` share
+    them through a Redis server and ``fakeredis://`` uses an in-process Redis
+    stand-in (requires the ``fakeredis`` package) for tests and local dev.
+    """
+    local = MemoryCacheBackend(settings.FEED_CACHE_MAX_ENTRIES, settings.FEED_CACHE_TTL_SECONDS)
+    if not url or url.startswith("memory://"):
+        return local
+
+    # Entries in front of a shared backend only live long enough to absorb bursts
+    local.ttl_seconds = min(settings.FEED_CACHE_TTL_SECONDS, settings.CACHE_LOCAL_TTL_SECONDS)
+    client = create_redis_client(url)
+    if client is None:
+        raise ValueError(f"Unsupported CACHE_URL scheme: {url}")
+    return RedisCacheBackend(client, settings.FEED_CACHE_TTL_SECONDS, local)
+
+
+def create_redis_client(url: str):
+    """Async Redis client for a ``redis://``, ``rediss://`` or ``fakeredis://``
+    URL, or None for any other scheme."""
+    if url.startswith("fakeredis://"):
+        import fakeredis
+        return fakeredis.FakeAsyncRedis()
+    if url.startswith(("redis://", "rediss://")):
+        import redis.asyncio as redis
+        return redis.Redis.from_url(url)
+    return None
+
+
+class RenderedBody(NamedTuple):
+    """A rendered response body with the headers needed to serve it again."""
+
+    body: bytes
+    page_cursor: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[int] = None  # epoch seconds
+    media_type: str = "application/json"
+    content_encoding: Optional[str] = None
+    # Invalidation groups, kept so encoded variants can be cached alongside
+    groups: Tuple[str, ...] = ()
+
+
+class ResponseCache:
+    """Cache of rendered response bodies for the feed and single posts."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        # Bumped on every invalidation, local or from another worker, so a
+        # page read before a write is never stored after it
+        self.version = 0
+        backend.on_remote_invalidation = self._bump_version
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[RenderedBody]:
+        """Return the rendered body stored for ``key`` or None on a miss."""
+        value = await self.backend.get(key)
+        parts = value.split(b"\n", 6) if value is not None else ()
+        if len(parts) != 7:
+            # Missing, or written by an older version sharing the Redis cache
+            self.misses += 1
+            return None
+        self.hits += 1
+        page_cursor, etag, modified, media_type, content_encoding, groups, body = parts
+        return RenderedBody(body, page_cursor.decode() or None, etag.decode() or None,
+                            int(modified) if modified else None, media_type.decode(),
+                            content_encoding.decode() or None, tuple(json.loads(groups)))
+
+    async def set(self, key: str, rendered: RenderedBody, groups: Iterable[str], version: int):
+        """Store a rendered body unless an invalidation happened since ``version``."""
+        if version != self.version:
+            return
+        groups = tuple(groups)
+        # json.dumps escapes newlines, so the groups stay on one header line
+        header = (f"{rendered.page_cursor or ''}\n{rendered.etag or ''}\n{rendered.last_modified or ''}\n"
+                  f"{rendered.media_type}\n{rendered.content_encoding or ''}\n{json.dumps(groups)}\n")
+        await self.backend.set(key, header.encode() + rendered.body, groups)
+
+    async def invalidate(self, groups: Iterable[str]):
+        """Drop every entry tagged with any of ``groups``, in all workers."""
+        self._bump_version()
+        await self.backend.invalidate(groups)
+
+    def _bump_version(self):
+        self.version += 1
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {"hits": self.hits, "misses": self.misses, **self.backend.stats()}
+
+
+# Every trending page; scores move whenever the trending worker runs
+TRENDING_GROUP = "trending"
+
+
+def feed_key(sort: str, tag: Optional[str], cursor: Optional[str], skip: int, limit: int) -> str:
+    return f"feed:{sort}:{tag or '*'}:{cursor or ''}:{skip}:{limit}"
+
+
+def post_key(post_id: str) -> str:
+    return f"post:{post_id}"
+
+
+def feed_group(tag: Optional[str]) -> str:
+    """Invalidation group for head-of-feed pages of ``tag`` (None = global feed)."""
+    return f"feed:{tag or '*'}"
+
+
+def post_group(post_id) -> str:
+    """Invalidation group for every cached body containing ``post_id``."""
+    return f"post:{post_id}"
+
+
+# Global response cache instance
+response_cache = ResponseCache(create_cache_backend(settings.CACHE_URL))
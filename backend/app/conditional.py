@@ -0,0 +1,84 @@
+from datetime import datetime, UTC
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Optional
+import hashlib
+
+from .config import settings
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def page_etag(posts: List[dict], page_cursor: Optional[str] = None) -> str:
+    """Strong ETag for a rendered list of posts.
+
+    Post content and tags never change after creation, so a page is
+    identified by its post ids, the fields that do change (reaction counts,
+    unique reactors and visibility) and the next-page cursor. Hashing those
+    is far cheaper than hashing the serialized body.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    # Both serializers produce valid JSON, but not byte-identical JSON
+    digest.update(b"fast" if settings.FAST_SERIALIZATION else b"model")
+    for post in posts:
+        post_id = post["_id"]
+        digest.update(post_id.binary if hasattr(post_id, "binary") else str(post_id).encode())
+        counts = post.get("reaction_counts") or {}
+        digest.update(f"{sorted(counts.items())}{post.get('unique_reactors')}"
+                      f"{post.get('is_flagged')}{post.get('is_private')}".encode())
+    digest.update((page_cursor or "").encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def last_modified(posts: List[dict]) -> Optional[int]:
+    """Latest creation, reaction or moderation time of ``posts``, in whole epoch seconds.
+
+    Only valid for single posts: a page can also change when a post drops
+    out of it, which only the ETag captures.
+    """
+    latest = None
+    for post in posts:
+        for field in ("created_at", "reactions_updated_at", "moderated_at"):
+            value = post.get(field)
+            if value is not None and (latest is None or value > latest):
+                latest = value
+    if latest is None:
+        return None
+    if latest.tzinfo is None:
+        # Motor returns naive datetimes that are already in UTC
+        latest = latest.replace(tzinfo=UTC)
+    return int((latest - EPOCH).total_seconds())
+
+
+def http_date(seconds: int) -> str:
+    return formatdate(seconds, usegmt=True)
+
+
+def is_not_modified(headers, etag: Optional[str], modified: Optional[int]) -> bool:
+    """Whether the request's validators match, so a 304 can be sent.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since``, as in
+    RFC 9110.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+        return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    return modified <= (since - EPOCH).total_seconds()
+
+
+def public_cache_control() -> str:
+    """``Cache-Control`` for responses any client or CDN may share."""
+    return (f"public, max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}, "
+            f"stale-while-revalidate={settings.HTTP_CACHE_STALE_SECONDS}")
@@ -11,6 +11,23 @@ class Settings:
     MONGODB_URI: str = os.getenv("MONGODB_URI", "")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "anti_linkedin")
     
+    # MongoDB connection pool and driver options
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "10"))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "1"))
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "30000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "0"))  # 0 = no limit
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "5000"))
+    MONGO_READ_PREFERENCE: str = os.getenv("MONGO_READ_PREFERENCE", "primary")
+    MONGO_COMPRESSORS: str = os.getenv("MONGO_COMPRESSORS", "")  # e.g. "zstd,snappy"
+    MONGO_WARM_POOL: bool = os.getenv("MONGO_WARM_POOL", "true").lower() == "true"
+    
+    # Feed, post and search reads may be served by secondaries lagging up to
+    # FEED_MAX_STALENESS_SECONDS (90 is MongoDB's minimum); "primary" disables this
+    FEED_READ_PREFERENCE: str = os.getenv("FEED_READ_PREFERENCE", "secondaryPreferred")
+    FEED_MAX_STALENESS_SECONDS: int = int(os.getenv("FEED_MAX_STALENESS_SECONDS", "90"))
+    
     # API settings
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Anti-LinkedIn API"
@@ -21,14 +38,131 @@ class Settings:
         "http://localhost:8000",  # Backend dev
         "https://your-frontend-domain.com"  # Production frontend
     ]
+    # Signs read_after cookies and keys the flagger hashes; use the same value on
+    # every worker. Empty picks a random key per process, so tokens only work on
+    # the worker that issued them and a client can flag a post once per worker
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "")
     
-    # Rate limiting
-    RATE_LIMIT_PER_MINUTE: int = 60
+    # Rate limiting: token buckets per client IP refilled at RATE_LIMIT_PER_MINUTE
+    # (0 disables), holding up to RATE_LIMIT_BURST tokens (0 = one minute's worth).
+    # RATE_LIMIT_URL is memory://, redis://host:6379/0 or fakeredis://
+    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "0"))
+    RATE_LIMIT_URL: str = os.getenv("RATE_LIMIT_URL", "memory://")
+    RATE_LIMIT_MAX_CLIENTS: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+    # Tokens per request as "METHOD /path=cost", comma separated; other routes cost 1
+    RATE_LIMIT_COSTS: str = os.getenv(
+        "RATE_LIMIT_COSTS",
+        "POST /api/v1/posts/=5,POST /api/v1/posts/bulk=30,GET /health=0,GET /metrics=0,GET /stats=0",
+    )
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
     
+    # Bulk ingestion
+    BULK_MAX_POSTS: int = int(os.getenv("BULK_MAX_POSTS", "10000"))
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+    # POST /posts/bulk is an operator tool for migrations and load tests: it needs the
+    # X-Operator-Token header (empty OPERATOR_TOKEN disables it)
+    OPERATOR_TOKEN: str = os.getenv("OPERATOR_TOKEN", "")
+    
+    # Streaming export
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    
+    # Response cache: memory://, redis://host:6379/0 or fakeredis://
+    CACHE_URL: str = os.getenv("CACHE_URL", "memory://")
+    CACHE_LOCAL_TTL_SECONDS: float = float(os.getenv("CACHE_LOCAL_TTL_SECONDS", "1"))
+    FEED_CACHE_MAX_ENTRIES: int = int(os.getenv("FEED_CACHE_MAX_ENTRIES", "1024"))
+    FEED_CACHE_TTL_SECONDS: float = float(os.getenv("FEED_CACHE_TTL_SECONDS", "10"))
+    
+    # Cache-Control for public feed pages and posts, for browsers and CDNs
+    HTTP_CACHE_MAX_AGE_SECONDS: int = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", "5"))
+    HTTP_CACHE_STALE_SECONDS: int = int(os.getenv("HTTP_CACHE_STALE_SECONDS", "30"))
+    
+    # Collapse concurrent identical feed and post queries into one
+    COALESCE_READS: bool = os.getenv("COALESCE_READS", "true").lower() == "true"
+    
+    # Reaction counters are written behind in batches
+    REACTION_FLUSH_INTERVAL_MS: int = int(os.getenv("REACTION_FLUSH_INTERVAL_MS", "250"))
+    REACTION_BUFFER_MAX_KEYS: int = int(os.getenv("REACTION_BUFFER_MAX_KEYS", "10000"))
+    
+    # Reactions count once per client token, post and type. Each post keeps a
+    # scalable Bloom filter of who reacted, starting at REACTION_BLOOM_CAPACITY
+    # reactions with a false positive rate below REACTION_BLOOM_ERROR_RATE and
+    # capped at REACTION_BLOOM_MAX_BYTES, and a HyperLogLog of unique reactors
+    # with 2**REACTION_HLL_PRECISION registers
+    REACTION_DEDUPE: bool = os.getenv("REACTION_DEDUPE", "true").lower() == "true"
+    REACTION_BLOOM_CAPACITY: int = int(os.getenv("REACTION_BLOOM_CAPACITY", "64"))
+    REACTION_BLOOM_ERROR_RATE: float = float(os.getenv("REACTION_BLOOM_ERROR_RATE", "0.01"))
+    REACTION_BLOOM_MAX_BYTES: int = int(os.getenv("REACTION_BLOOM_MAX_BYTES", "16384"))
+    REACTION_HLL_PRECISION: int = int(os.getenv("REACTION_HLL_PRECISION", "10"))
+    
+    # Moderation: flags are written behind in batches; a post is hidden once its
+    # pending flags reach FLAG_HIDE_THRESHOLD. The review queue and resolve
+    # endpoints need the X-Moderator-Token header (empty MODERATOR_TOKEN disables them)
+    FLAG_HIDE_THRESHOLD: int = int(os.getenv("FLAG_HIDE_THRESHOLD", "5"))
+    FLAG_FLUSH_INTERVAL_MS: int = int(os.getenv("FLAG_FLUSH_INTERVAL_MS", "250"))
+    FLAG_BUFFER_MAX_KEYS: int = int(os.getenv("FLAG_BUFFER_MAX_KEYS", "10000"))
+    MODERATOR_TOKEN: str = os.getenv("MODERATOR_TOKEN", "")
+    
+    # Trending feed: every TRENDING_DECAY_SECONDS of recency is worth 10x the reactions
+    TRENDING_DECAY_SECONDS: float = float(os.getenv("TRENDING_DECAY_SECONDS", "45000"))
+    TRENDING_INTERVAL_SECONDS: float = float(os.getenv("TRENDING_INTERVAL_SECONDS", "30"))
+    TRENDING_BATCH_SIZE: int = int(os.getenv("TRENDING_BATCH_SIZE", "1000"))
+    
+    # Near-duplicate detection on new public posts: once a post's near-copies
+    # (estimated Jaccard similarity >= DUPLICATE_THRESHOLD) appeared
+    # DUPLICATE_MAX_COPIES times within the window, further copies are
+    # flagged or rejected (DUPLICATE_ACTION). The index holds at most
+    # DUPLICATE_MAX_POSTS posts, about 125 bytes each; signatures are computed
+    # in DUPLICATE_WORKERS processes (0 = in the event loop). Posts shorter than
+    # DUPLICATE_MIN_CHARS letters and digits are never checked: short replies
+    # like "Same here." are legitimately repeated by many people
+    DUPLICATE_DETECTION: bool = os.getenv("DUPLICATE_DETECTION", "true").lower() == "true"
+    DUPLICATE_ACTION: str = os.getenv("DUPLICATE_ACTION", "reject")
+    DUPLICATE_MAX_COPIES: int = int(os.getenv("DUPLICATE_MAX_COPIES", "3"))
+    DUPLICATE_MIN_CHARS: int = int(os.getenv("DUPLICATE_MIN_CHARS", "32"))
+    DUPLICATE_THRESHOLD: float = float(os.getenv("DUPLICATE_THRESHOLD", "0.8"))
+    DUPLICATE_WINDOW_SECONDS: float = float(os.getenv("DUPLICATE_WINDOW_SECONDS", "86400"))
+    DUPLICATE_MAX_POSTS: int = int(os.getenv("DUPLICATE_MAX_POSTS", "200000"))
+    DUPLICATE_WORKERS: int = int(os.getenv("DUPLICATE_WORKERS", "1"))
+    
+    # Archival: posts older than ARCHIVE_AFTER_DAYS are moved to posts_archive by
+    # archive_posts.py; with ARCHIVE_READS the feed and post reads fall through to it
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+    ARCHIVE_READS: bool = os.getenv("ARCHIVE_READS", "true").lower() == "true"
+    
+    # Tag suggestions: the TAG_SUGGEST_MAX_TAGS most used tags are held in memory
+    # per worker and fully reloaded every TAG_SUGGEST_REFRESH_SECONDS (0 = never)
+    TAG_SUGGEST_MAX_TAGS: int = int(os.getenv("TAG_SUGGEST_MAX_TAGS", "1000000"))
+    TAG_SUGGEST_REFRESH_SECONDS: float = float(os.getenv("TAG_SUGGEST_REFRESH_SECONDS", "300"))
+    
+    # Full-text search: "mongo" (text index) or "memory" (in-process BM25 index)
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "mongo")
+    SEARCH_MAX_DOCS: int = int(os.getenv("SEARCH_MAX_DOCS", "1000000"))
+    SEARCH_MEMORY_BUDGET_MB: int = int(os.getenv("SEARCH_MEMORY_BUDGET_MB", "256"))
+    
+    # Metrics: fraction of requests and Mongo commands recorded (1 = all, 0 = off)
+    METRICS_SAMPLE_RATE: float = float(os.getenv("METRICS_SAMPLE_RATE", "1"))
+    
+    # Live feed over SSE: "changestream" (needs a replica set) or "memory" (this process only)
+    LIVE_SOURCE: str = os.getenv("LIVE_SOURCE", "changestream")
+    LIVE_QUEUE_SIZE: int = int(os.getenv("LIVE_QUEUE_SIZE", "256"))
+    LIVE_MAX_SUBSCRIBERS: int = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "10000"))
+    LIVE_HEARTBEAT_SECONDS: float = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+    
+    # Serialize trusted DB documents with orjson instead of pydantic models
+    FAST_SERIALIZATION: bool = os.getenv("FAST_SERIALIZATION", "true").lower() == "true"
+    
+    # Response compression, in order of preference ("br" needs the brotli package;
+    # application/msgpack bodies need the msgpack package)
+    RESPONSE_ENCODINGS: str = os.getenv("RESPONSE_ENCODINGS", "br,gzip")
+    RESPONSE_COMPRESSION_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "4"))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "4"))
+    
     # Content limits
     MAX_CONTENT_LENGTH: int = 2000
     MAX_TAGS_PER_POST: int = 10
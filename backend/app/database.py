@@ -1,39 +1,132 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+from bson.timestamp import Timestamp
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from .config import settings
+from .metrics import CommandMetrics, pool_metrics
+import asyncio
+import hashlib
+import hmac
 import logging
+import secrets
+import time
 
 logger = logging.getLogger(__name__)
 
+READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Cookie carrying the operation time of a client's last write, so its next
+# reads from a secondary wait until that write has replicated
+READ_AFTER_COOKIE = "read_after"
+# Tokens more than this far ahead of the server clock are ignored
+READ_TOKEN_MAX_SKEW_SECONDS = 5
+
+_read_token_key = settings.SECRET_KEY.encode() or secrets.token_bytes(32)
+
+
+def feed_read_preference(mode: str, max_staleness: int):
+    """Read preference for reads that tolerate ``max_staleness`` seconds of lag."""
+    if mode == "primary":
+        return Primary()
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"Unsupported FEED_READ_PREFERENCE: {mode}")
+    return READ_PREFERENCES[mode](max_staleness=max_staleness)
+
+
+def _read_token_signature(payload: str) -> str:
+    return hmac.new(_read_token_key, payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def encode_read_token(operation_time: Timestamp) -> str:
+    """Encode and sign a write's operation time for the ``READ_AFTER_COOKIE``."""
+    payload = f"{operation_time.time}.{operation_time.inc}"
+    return f"{payload}.{_read_token_signature(payload)}"
+
+
+def decode_read_token(token: Optional[str], now: Optional[float] = None) -> Optional[Timestamp]:
+    """Decode a ``READ_AFTER_COOKIE`` value.
+
+    Unsigned, forged or malformed tokens are ignored, as are tokens from
+    outside the last ``FEED_MAX_STALENESS_SECONDS`` or from the future: the
+    cookie is client-controlled, and a read session waiting for an operation
+    time the cluster has not reached fails instead of returning.
+    """
+    if not token:
+        return None
+    payload, _, signature = token.rpartition(".")
+    if not hmac.compare_digest(signature.encode(), _read_token_signature(payload).encode()):
+        return None
+    try:
+        seconds, _, increment = payload.partition(".")
+        operation_time = Timestamp(int(seconds), int(increment))
+    except (ValueError, TypeError, OverflowError):
+        return None
+    now = time.time() if now is None else now
+    if not now - settings.FEED_MAX_STALENESS_SECONDS <= operation_time.time <= now + READ_TOKEN_MAX_SKEW_SECONDS:
+        return None
+    return operation_time
+
 class Database:
     """Database connection manager."""
     
     def __init__(self):
         self.client: AsyncIOMotorClient = None
         self.database = None
+        self.read_preference = feed_read_preference(
+            settings.FEED_READ_PREFERENCE, settings.FEED_MAX_STALENESS_SECONDS
+        )
     
     async def connect(self):
         """Connect to MongoDB with connection pooling."""
         try:
-            # Configure connection pooling for better performance
-            self.client = AsyncIOMotorClient(
-                settings.MONGODB_URI,
-                maxPoolSize=10,  # Maximum number of connections in the pool
-                minPoolSize=1,   # Minimum number of connections in the pool
-                maxIdleTimeMS=30000,  # Close connections after 30 seconds of inactivity
-                serverSelectionTimeoutMS=5000,  # 5 second timeout for server selection
-                connectTimeoutMS=10000,  # 10 second timeout for connection
-                socketTimeoutMS=5000,  # 5 second timeout for socket operations
+            # Connection pooling is configured from settings so it can be sized
+            # from the pool telemetry reported at /metrics and /stats
+            options = dict(
+                maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+                serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+                readPreference=settings.MONGO_READ_PREFERENCE,
+                event_listeners=[CommandMetrics(), pool_metrics],  # Command timings and pool saturation
             )
+            if settings.MONGO_COMPRESSORS:
+                # zstd and snappy need the zstandard / python-snappy packages
+                options["compressors"] = settings.MONGO_COMPRESSORS
+            self.client = AsyncIOMotorClient(settings.MONGODB_URI, **options)
             self.database = self.client[settings.DATABASE_NAME]
             
             # Test the connection
             await self.client.admin.command('ping')
             logger.info(f"Connected to MongoDB database: {settings.DATABASE_NAME}")
+            if settings.MONGO_WARM_POOL:
+                await self.warm_up(settings.MONGO_MIN_POOL_SIZE)
             
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
     
+    async def warm_up(self, connections: int):
+        """Open ``connections`` pooled connections before serving traffic.
+
+        The driver only fills ``minPoolSize`` in the background, so the first
+        requests after startup would otherwise pay for connection setup.
+        Concurrent pings each need a connection while in flight, which grows
+        the pool to about the requested size.
+        """
+        if connections <= 1:
+            return
+        await asyncio.gather(*(self.client.admin.command('ping') for _ in range(connections)))
+        logger.info(f"Warmed MongoDB connection pool with {connections} concurrent pings")
+    
     async def disconnect(self):
         """Disconnect from MongoDB."""
         if self.client:
@@ -46,6 +139,45 @@ class Database:
             raise RuntimeError("Database not connected. Call connect() first.")
         return self.database[collection_name]
     
+    def get_read_collection(self, collection_name: str):
+        """Get a collection for reads that may be served by a secondary.
+
+        Writes and reads that must see the latest data use ``get_collection``,
+        which stays on the primary.
+        """
+        if self.database is None:
+            raise RuntimeError("Database not connected. Call connect() first.")
+        return self.database.get_collection(collection_name, read_preference=self.read_preference)
+    
+    def write_session(self):
+        """Causally consistent session for a write; its ``operation_time``
+        becomes the client's read token."""
+        return self._causal_session(None)
+    
+    @asynccontextmanager
+    async def read_session(self, after: Optional[Timestamp]):
+        """Session whose reads wait until the client's write at ``after`` is
+        visible, or no session when there is no such write."""
+        if after is None:
+            yield None
+            return
+        async with self._causal_session(after) as session:
+            yield session
+    
+    @asynccontextmanager
+    async def _causal_session(self, after: Optional[Timestamp]):
+        try:
+            session = await self.client.start_session(causal_consistency=True)
+        except NotImplementedError:
+            # In-memory stand-ins such as mongomock have no sessions and no
+            # replication lag to wait for
+            yield None
+            return
+        async with session:
+            if after is not None:
+                session.advance_operation_time(after)
+            yield session
+    
     async def health_check(self) -> bool:
         """Check if database connection is healthy."""
         try:
@@ -0,0 +1,327 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, NamedTuple, Optional, Set, Tuple
+import asyncio
+import logging
+import multiprocessing
+import re
+import struct
+import time
+import zlib
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 5  # characters
+NUM_BINS = 32     # MinHash values per signature
+BANDS = 8         # LSH bands of NUM_BINS // BANDS values each
+ROWS = NUM_BINS // BANDS
+BIN_BITS = 5      # log2(NUM_BINS)
+
+_NON_WORD = re.compile(r"[\W_]+")
+_BAND_FORMAT = struct.Struct(f"<{ROWS}I")
+_EMPTY = 1 << 32
+
+
+def _fmix32(h: int) -> int:
+    """MurmurHash3 finalizer; spreads CRC32's linear output over all bits."""
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    return h ^ (h >> 16)
+
+
+def normalize(text: str) -> str:
+    """``text`` in lower case with runs of punctuation and spaces collapsed to one space."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def shingles(text: str) -> Set[bytes]:
+    """Overlapping character shingles of ``text``, ignoring case and punctuation."""
+    data = normalize(text).encode()
+    if len(data) <= SHINGLE_SIZE:
+        return {data}
+    return {data[i:i + SHINGLE_SIZE] for i in range(len(data) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> Tuple[Tuple[int, ...], bytes]:
+    """LSH band keys and a compact MinHash signature of ``text``.
+
+    Uses one-permutation hashing: every character shingle is hashed once
+    and the hash's low bits pick one of ``NUM_BINS`` bins, each keeping its
+    minimum, instead of hashing every shingle ``NUM_BINS`` times. Empty bins
+    borrow the next filled bin's value (rotation densification). Returns one
+    32-bit key per band and the low byte of every bin (b-bit MinHash), which
+    is all ``similarity`` needs. Deterministic across processes, unlike
+    ``hash()``, so it can run in a process pool.
+    """
+    bins = [_EMPTY] * NUM_BINS
+    for shingle in shingles(text):
+        h = _fmix32(zlib.crc32(shingle))
+        index, value = h & (NUM_BINS - 1), h >> BIN_BITS
+        if value < bins[index]:
+            bins[index] = value
+    for index in range(NUM_BINS):
+        if bins[index] == _EMPTY:
+            for distance in range(1, NUM_BINS):
+                value = bins[(index + distance) % NUM_BINS]
+                if value < _EMPTY and value < 1 << (32 - BIN_BITS):
+                    # Offset borrowed values so they never equal a real minimum
+                    bins[index] = value + (distance << (32 - BIN_BITS))
+                    break
+    keys = tuple(zlib.crc32(_BAND_FORMAT.pack(*bins[band * ROWS:(band + 1) * ROWS]), band) for band in range(BANDS))
+    return keys, bytes(value & 0xFF for value in bins)
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """Estimated Jaccard similarity of two ``minhash_signature`` signatures.
+
+    Unrelated bins still agree on their low byte 1 time in 256, which is
+    corrected for.
+    """
+    matches = sum(1 for x, y in zip(a, b) if x == y) / NUM_BINS
+    return max(0.0, (matches - 1 / 256) / (1 - 1 / 256))
+
+
+class _Generation:
+    """Posts indexed during one slice of the window, in preallocated arrays.
+
+    Band keys live in an open-addressing table that maps each key to the
+    newest post with it. Nothing is ever deleted from a generation; the whole
+    generation is dropped once it falls out of the window, so memory is
+    fixed when it is created.
+    """
+
+    def __init__(self, max_posts: int, started: float):
+        self.started = started
+        self.max_posts = max_posts
+        self.size = 0
+        # Load factor stays below 0.7 even when the generation is full
+        self.slots = int(max_posts * BANDS / 0.7) + 1
+        self.keys = array("I", bytes(4 * self.slots))
+        self.posts = array("I", bytes(4 * self.slots))  # post index + 1, 0 = empty slot
+        self.signatures = bytearray(max_posts * NUM_BINS)
+        self.copies = array("H", bytes(2 * max_posts))
+
+    def find(self, key: int) -> int:
+        """Index of the newest post with band ``key``, or -1."""
+        keys, posts, slots = self.keys, self.posts, self.slots
+        i = key % slots
+        while True:
+            post = posts[i]
+            if post == 0:
+                return -1
+            if keys[i] == key:
+                return post - 1
+            i += 1
+            if i == slots:
+                i = 0
+
+    def add(self, band_keys: Tuple[int, ...], signature: bytes, copies: int):
+        index = self.size
+        self.size += 1
+        self.signatures[index * NUM_BINS:(index + 1) * NUM_BINS] = signature
+        self.copies[index] = min(copies, 0xFFFF)
+        keys, posts, slots = self.keys, self.posts, self.slots
+        for key in band_keys:
+            i = key % slots
+            while posts[i] != 0 and keys[i] != key:
+                i += 1
+                if i == slots:
+                    i = 0
+            keys[i] = key
+            posts[i] = index + 1
+
+    def signature(self, index: int) -> bytes:
+        return bytes(self.signatures[index * NUM_BINS:(index + 1) * NUM_BINS])
+
+    def nbytes(self) -> int:
+        return (self.keys.itemsize * len(self.keys) + self.posts.itemsize * len(self.posts)
+                + len(self.signatures) + self.copies.itemsize * len(self.copies))
+
+
+class Match(NamedTuple):
+    similarity: float
+    copies: int  # near-identical posts in the window, counting the match
+
+
+class DuplicateIndex:
+    """MinHash LSH index over the posts of a sliding time window.
+
+    The window is split into ``generations`` slices, each a ``_Generation``
+    sized for ``max_posts / generations`` posts. A generation is retired
+    when its slice ends or it is full, and the oldest is dropped once it
+    leaves the window or there are too many, so memory never exceeds
+    ``generations`` preallocated slices however fast posts arrive.
+    """
+
+    def __init__(self, window_seconds: float, max_posts: int, threshold: float, generations: int = 4):
+        self.window = window_seconds
+        self.span = window_seconds / generations
+        self.generation_size = max(1, max_posts // generations)
+        self.max_generations = generations
+        self.threshold = threshold
+        self._generations: List[_Generation] = []
+
+    def _live(self, now: float):
+        """Drop generations whose whole slice is older than the window."""
+        while self._generations and self._generations[0].started + self.span < now - self.window:
+            self._generations.pop(0)
+
+    def match(self, band_keys: Tuple[int, ...], signature: bytes, now: Optional[float] = None) -> Optional[Match]:
+        """The newest indexed post at least ``threshold`` similar, if any."""
+        self._live(time.monotonic() if now is None else now)
+        for generation in reversed(self._generations):
+            seen = set()
+            for key in band_keys:
+                index = generation.find(key)
+                if index < 0 or index in seen:
+                    continue
+                seen.add(index)
+                score = similarity(signature, generation.signature(index))
+                if score >= self.threshold:
+                    return Match(score, generation.copies[index] + 1)
+        return None
+
+    def add(self, band_keys: Tuple[int, ...], signature: bytes, copies: int = 1, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        current = self._generations[-1] if self._generations else None
+        if current is None or current.size >= current.max_posts or now - current.started >= self.span:
+            current = _Generation(self.generation_size, now)
+            self._generations.append(current)
+            if len(self._generations) > self.max_generations:
+                self._generations.pop(0)
+        current.add(band_keys, signature, copies)
+
+    def __len__(self) -> int:
+        return sum(generation.size for generation in self._generations)
+
+    def nbytes(self) -> int:
+        return sum(generation.nbytes() for generation in self._generations)
+
+
+class Verdict(NamedTuple):
+    action: str        # "allow", "flag" or "reject"
+    copies: int        # near-identical posts in the window, counting this one
+    similarity: float  # to the closest recent post, 0 when there is none
+
+
+ALLOW = Verdict("allow", 1, 0.0)
+
+
+class DuplicateDetector:
+    """Flags or rejects copy-pasted floods on ``create_post``.
+
+    Signatures are computed in a process pool so shingling never blocks the
+    event loop; the index itself lives in this process. A post whose
+    near-duplicates (estimated Jaccard similarity of at least ``threshold``)
+    already appeared ``max_copies`` times in the window gets ``action``.
+    Rejected posts are not indexed, so a flood stays rejected for as long
+    as its earlier copies are in the window. Posts with fewer than
+    ``min_chars`` letters and digits are let through unchecked and not
+    indexed; they have too few shingles to tell a flood from many people
+    giving the same short reply. Errors let the post through.
+    """
+
+    def __init__(self, enabled: bool, action: str, max_copies: int, workers: int, index: DuplicateIndex,
+                 min_chars: int = 0):
+        if action not in ("flag", "reject"):
+            raise ValueError(f"Unsupported DUPLICATE_ACTION: {action}")
+        self.enabled = enabled
+        self.action = action
+        self.max_copies = max_copies
+        self.min_chars = min_chars
+        self.workers = workers
+        self.index = index
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.checked = 0
+        self.too_short = 0
+        self.duplicates = 0
+        self.flagged = 0
+        self.rejected = 0
+        self.errors = 0
+        self.signature_ms = 0.0
+
+    async def start(self):
+        """Start the signature worker processes."""
+        if self.enabled and self.workers > 0 and self._pool is None:
+            # Forking a process that runs driver threads can deadlock the child
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            # Pay the process start-up before the first post, not during it
+            await asyncio.get_running_loop().run_in_executor(self._pool, minhash_signature, "")
+
+    async def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def signature(self, text: str) -> Tuple[Tuple[int, ...], bytes]:
+        if self._pool is None:
+            return minhash_signature(text)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, minhash_signature, text)
+        except BrokenProcessPool:
+            logger.error("Duplicate signature pool died; computing signatures inline")
+            self._pool = None
+            return minhash_signature(text)
+
+    async def check(self, text: str) -> Verdict:
+        """Judge a new post's content and index it unless it is rejected."""
+        if not self.enabled:
+            return ALLOW
+        if len(normalize(text).replace(" ", "")) < self.min_chars:
+            self.too_short += 1
+            return ALLOW
+        try:
+            start = time.perf_counter()
+            band_keys, signature = await self.signature(text)
+            self.signature_ms += (time.perf_counter() - start) * 1000
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error computing duplicate signature: {e}")
+            return ALLOW
+        self.checked += 1
+        match = self.index.match(band_keys, signature)
+        if match is None:
+            self.index.add(band_keys, signature)
+            return ALLOW
+        self.duplicates += 1
+        if match.copies <= self.max_copies:
+            self.index.add(band_keys, signature, match.copies)
+            return Verdict("allow", match.copies, match.similarity)
+        if self.action == "reject":
+            self.rejected += 1
+            return Verdict("reject", match.copies, match.similarity)
+        self.flagged += 1
+        self.index.add(band_keys, signature, match.copies)
+        return Verdict("flag", match.copies, match.similarity)
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "enabled": self.enabled,
+            "action": self.action,
+            "checked": self.checked,
+            "too_short": self.too_short,
+            "duplicates": self.duplicates,
+            "flagged": self.flagged,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "avg_signature_ms": round(self.signature_ms / self.checked, 3) if self.checked else 0.0,
+            "indexed_posts": len(self.index),
+            "memory_bytes": self.index.nbytes(),
+        }
+
+
+# Global near-duplicate detector for new posts
+duplicate_detector = DuplicateDetector(
+    settings.DUPLICATE_DETECTION,
+    settings.DUPLICATE_ACTION,
+    settings.DUPLICATE_MAX_COPIES,
+    settings.DUPLICATE_WORKERS,
+    DuplicateIndex(settings.DUPLICATE_WINDOW_SECONDS, settings.DUPLICATE_MAX_POSTS, settings.DUPLICATE_THRESHOLD),
+    settings.DUPLICATE_MIN_CHARS,
+)
@@ -0,0 +1,89 @@
+from datetime import datetime, UTC
+from typing import List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from .config import settings
+from .models.post import PostCreate
+from .trending import hot_score
+
+# Stay well below MongoDB's 48MB message limit; insert_many would split
+# larger batches itself, but smaller chunks keep per-item error mapping simple
+BULK_CHUNK_MAX_BYTES = 8 * 1024 * 1024
+# Rough BSON overhead of a post besides its content and tags
+POST_OVERHEAD_BYTES = 256
+
+NOT_ATTEMPTED = "Not attempted: an earlier post in the ordered batch failed"
+
+# Marks bulk-ingested posts, which the live feed does not push: a batch of
+# thousands would overflow every subscriber's queue
+BULK_INGEST = {"ingest": "bulk"}
+
+
+def post_limit_error(post: PostCreate) -> Optional[str]:
+    """Return why ``post`` exceeds the configured limits, or None if it fits."""
+    if len(post.content) > settings.MAX_CONTENT_LENGTH:
+        return f"Content too long. Maximum {settings.MAX_CONTENT_LENGTH} characters allowed."
+    if len(post.tags) > settings.MAX_TAGS_PER_POST:
+        return f"Too many tags. Maximum {settings.MAX_TAGS_PER_POST} tags allowed."
+    return None
+
+
+def new_post_document(post: PostCreate, created_at: Optional[datetime] = None) -> dict:
+    """Build the stored document for a newly created post."""
+    post_data = post.model_dump()
+    post_data["created_at"] = created_at or datetime.now(UTC)
+    post_data["is_flagged"] = False
+    post_data["reaction_counts"] = {"same": 0, "helpful": 0, "upvote": 0}
+    post_data["unique_reactors"] = 0
+    post_data["trending_score"] = hot_score(post_data["reaction_counts"], post_data["created_at"])
+    return post_data
+
+
+def _estimated_size(document: dict) -> int:
+    return len(document["content"].encode()) + sum(len(tag) + 8 for tag in document["tags"]) + POST_OVERHEAD_BYTES
+
+
+def _chunks(documents: List[dict]):
+    """Yield (offset, chunk) slices bounded by count and estimated size."""
+    start, size = 0, 0
+    for i, document in enumerate(documents):
+        doc_size = _estimated_size(document)
+        if i > start and (i - start >= settings.BULK_CHUNK_SIZE or size + doc_size > BULK_CHUNK_MAX_BYTES):
+            yield start, documents[start:i]
+            start, size = i, 0
+        size += doc_size
+    if start < len(documents):
+        yield start, documents[start:]
+
+
+async def insert_post_documents(collection, documents: List[dict], ordered: bool = False) -> List[Optional[str]]:
+    """Insert ``documents`` with chunked ``insert_many`` calls.
+
+    Returns one entry per document: None if it was inserted (its ``_id`` is
+    set in place), otherwise the error message. With ``ordered=True`` the
+    first failure stops the batch and every later document is reported as
+    not attempted. Documents are marked with ``BULK_INGEST``.
+    """
+    errors: List[Optional[str]] = [None] * len(documents)
+    for document in documents:
+        document.update(BULK_INGEST)
+    for offset, chunk in _chunks(documents):
+        stop_at = None
+        try:
+            await collection.insert_many(chunk, ordered=ordered)
+        except BulkWriteError as e:
+            failed = e.details.get("writeErrors", [])
+            for write_error in failed:
+                errors[offset + write_error["index"]] = write_error.get("errmsg", "Write failed")
+            stop_at = offset + min((write_error["index"] for write_error in failed), default=0)
+        except Exception as e:
+            # e.g. a network error; the chunk may be partially written
+            for i in range(offset, offset + len(chunk)):
+                errors[i] = f"Insert failed, outcome unknown: {e}"
+            stop_at = offset + len(chunk) - 1
+        if ordered and stop_at is not None:
+            for i in range(stop_at + 1, len(documents)):
+                errors[i] = errors[i] or NOT_ATTEMPTED
+            break
+    return errors
@@ -0,0 +1,263 @@
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+import orjson
+
+from .config import settings
+from .database import database
+from .moderation import VISIBLE
+from .serialization import POST_PROJECTION, render_post
+from .tags import normalize_tag
+
+logger = logging.getLogger(__name__)
+
+# Server error code for change streams on a standalone server
+CHANGE_STREAM_NOT_SUPPORTED = 40573
+
+# New public posts that are not hidden or bulk ingested, and public posts that
+# are not hidden whose reactions were flushed by the reaction buffer. Updates
+# carry the post as it is now (full_document="updateLookup") for the check.
+_VISIBLE_DOCUMENT = {f"fullDocument.{field}": value for field, value in VISIBLE.items()}
+CHANGE_STREAM_PIPELINE = [
+    {"$match": {"$or": [
+        {"operationType": "insert", **_VISIBLE_DOCUMENT, "fullDocument.ingest": {"$exists": False}},
+        {"operationType": "update", **_VISIBLE_DOCUMENT,
+         "updateDescription.updatedFields.reactions_updated_at": {"$exists": True}},
+    ]}},
+    {"$project": {
+        "operationType": 1,
+        "documentKey": 1,
+        "updateDescription.updatedFields": 1,
+        **{f"fullDocument.{field}": 1 for field in POST_PROJECTION},
+    }},
+]
+
+Event = Tuple[str, dict]  # ("post", post document) or ("reactions", {"_id", "reaction_counts"})
+
+
+class EventSource:
+    """Interface for the stream of feed changes pushed to live subscribers."""
+
+    def events(self) -> AsyncIterator[Event]:
+        raise NotImplementedError
+
+    def post_created(self, post: dict):
+        """Called after a post is stored."""
+
+    async def reactions_flushed(self, post_ids: Iterable[str]):
+        """Called after the reaction buffer wrote new counts for ``post_ids``."""
+
+
+class ChangeStreamSource(EventSource):
+    """Feed changes read from a MongoDB change stream on ``posts``.
+
+    The stream resumes from its last token after errors, so a brief
+    disconnect loses no events. Change streams need a replica set; on a
+    standalone server the live feed stays silent.
+    """
+
+    async def events(self) -> AsyncIterator[Event]:
+        resume_token = None
+        delay = 1.0
+        while True:
+            try:
+                collection = database.get_collection("posts")
+                async with collection.watch(CHANGE_STREAM_PIPELINE, full_document="updateLookup",
+                                            resume_after=resume_token) as stream:
+                    delay = 1.0
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        event = _change_to_event(change)
+                        if event is not None:
+                            yield event
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_NOT_SUPPORTED:
+                    logger.warning("Change streams need a replica set; live feed disabled")
+                    return
+                logger.error(f"Change stream failed, resuming in {delay:.0f}s: {e}")
+            except Exception as e:
+                logger.error(f"Change stream failed, resuming in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+def _change_to_event(change: dict) -> Optional[Event]:
+    if change["operationType"] == "insert":
+        return "post", change["fullDocument"]
+    updated = change.get("updateDescription", {}).get("updatedFields", {})
+    counts = dict(updated.get("reaction_counts") or {})
+    for field, value in updated.items():
+        if field.startswith("reaction_counts."):
+            counts[field[len("reaction_counts."):]] = value
+    if not counts:
+        return None
+    return "reactions", {"_id": change["documentKey"]["_id"], "reaction_counts": counts}
+
+
+class MemoryEventSource(EventSource):
+    """In-process stand-in for change streams, for tests and local dev.
+
+    Events are published by the write paths of this process only, so other
+    workers never see them.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def events(self) -> AsyncIterator[Event]:
+        while True:
+            yield await self._queue.get()
+
+    def post_created(self, post: dict):
+        if not post.get("is_private") and not post.get("is_flagged"):
+            self._queue.put_nowait(("post", {field: post.get(field) for field in ("_id", *POST_PROJECTION)}))
+
+    async def reactions_flushed(self, post_ids: Iterable[str]):
+        # Read the new totals back, as a change stream would report them
+        ids = [ObjectId(post_id) for post_id in post_ids]
+        collection = database.get_collection("posts")
+        async for post in collection.find({"_id": {"$in": ids}, **VISIBLE}, {"reaction_counts": 1}):
+            self._queue.put_nowait(("reactions", post))
+
+
+class Subscriber:
+    """One live client: a bounded queue of ready-to-send SSE frames."""
+
+    def __init__(self, tag: Optional[str], max_queue: int):
+        self.tag = tag
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped = False
+
+
+class LiveFeed:
+    """Fans feed changes out to SSE subscribers.
+
+    One background task per worker reads the event source, renders each
+    event once and offers the frame to every interested subscriber without
+    waiting. A subscriber whose queue is full is dropped instead of slowing
+    everyone else down; its stream ends and the client reconnects and
+    refetches. New posts go to subscribers of any of their tags and to
+    unfiltered subscribers; reaction updates to visible posts go to
+    everyone, since a client may be showing any post.
+    """
+
+    def __init__(self, source: EventSource, max_queue: int, max_subscribers: int):
+        self.source = source
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self._all: Set[Subscriber] = set()
+        self._by_tag: Dict[str, Set[Subscriber]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+        self.events = 0
+        self.frames_sent = 0
+        self.slow_consumers_dropped = 0
+
+    def subscribe(self, tag: Optional[str] = None) -> Optional[Subscriber]:
+        """Register a subscriber, or return None when the worker is full."""
+        if self.subscribers >= self.max_subscribers:
+            return None
+        subscriber = Subscriber(tag, self.max_queue)
+        if tag:
+            self._by_tag.setdefault(tag, set()).add(subscriber)
+        else:
+            self._all.add(subscriber)
+        self.subscribers += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber.tag:
+            members = self._by_tag.get(subscriber.tag)
+            if members is None or subscriber not in members:
+                return
+            members.discard(subscriber)
+            if not members:
+                del self._by_tag[subscriber.tag]
+        elif subscriber in self._all:
+            self._all.discard(subscriber)
+        else:
+            return
+        self.subscribers -= 1
+
+    def publish(self, kind: str, payload: dict):
+        """Render an event once and queue it for every interested subscriber."""
+        self.events += 1
+        data = render_post(payload) if kind == "post" else orjson.dumps(payload, default=str)
+        frame = f"event: {kind}\ndata: ".encode() + data + b"\n\n"
+        if kind == "post":
+            targets: List[Set[Subscriber]] = [self._all]
+            tags = {normalize_tag(tag) for tag in payload.get("tags") or ()}
+            targets += [self._by_tag[tag] for tag in tags if tag in self._by_tag]
+        else:
+            targets = [self._all, *self._by_tag.values()]
+        slow = []
+        for subscribers in targets:
+            for subscriber in subscribers:
+                try:
+                    subscriber.queue.put_nowait(frame)
+                    self.frames_sent += 1
+                except asyncio.QueueFull:
+                    slow.append(subscriber)
+        for subscriber in slow:
+            self.unsubscribe(subscriber)
+            self._close(subscriber)
+            subscriber.dropped = True
+            self.slow_consumers_dropped += 1
+
+    def _close(self, subscriber: Subscriber):
+        """Replace the subscriber's backlog with the end-of-stream marker."""
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    async def start(self):
+        """Start reading the event source."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop reading events and end every open stream."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscriber in [*self._all, *(s for members in self._by_tag.values() for s in members)]:
+            self.unsubscribe(subscriber)
+            self._close(subscriber)
+
+    async def _run(self):
+        async for kind, payload in self.source.events():
+            try:
+                self.publish(kind, payload)
+            except Exception as e:
+                logger.error(f"Error publishing live {kind} event: {e}")
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "subscribers": self.subscribers,
+            "events": self.events,
+            "frames_sent": self.frames_sent,
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+        }
+
+
+def create_event_source(name: str) -> EventSource:
+    """Build the event source named by ``LIVE_SOURCE``."""
+    if name == "changestream":
+        return ChangeStreamSource()
+    if name == "memory":
+        return MemoryEventSource()
+    raise ValueError(f"Unsupported LIVE_SOURCE: {name}")
+
+
+# Global live feed instance
+live_feed = LiveFeed(create_event_source(settings.LIVE_SOURCE), settings.LIVE_QUEUE_SIZE, settings.LIVE_MAX_SUBSCRIBERS)
@@ -1,10 +1,25 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import PlainTextResponse
 import logging
 
 from .config import settings
 from .database import database
+from .cache import response_cache
+from .reaction_buffer import reaction_buffer
+from .trending import trending_worker
+from .search import search_backend
+from .metrics import MetricsMiddleware, metrics, pool_metrics
+from .rate_limit import RateLimitMiddleware, rate_limiter
+from .single_flight import single_flight
+from .live import live_feed
+from .archive import post_archive
+from .duplicates import duplicate_detector
+from .moderation import flag_buffer
+from .tags import tag_suggester
+from .sketches import reactor_sketches
+from .negotiation import response_encoder
 from .api.v1.api import api_router
 
 # Configure logging
@@ -24,6 +39,10 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Rate limiting runs innermost, inside CORS so 429s carry CORS headers, but
+# still before any route touches the database
+app.add_middleware(RateLimitMiddleware)
+
 # Security middleware
 app.add_middleware(
     TrustedHostMiddleware,
@@ -37,9 +56,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "ETag"],
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
+# Per-route latency histograms, outermost so they cover the whole stack
+app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -48,6 +71,15 @@ async def startup_event():
     """Startup event - connect to database."""
     try:
         await database.connect()
+        await response_cache.backend.start()
+        await rate_limiter.backend.start()
+        await reaction_buffer.start()
+        await flag_buffer.start()
+        await trending_worker.start()
+        await search_backend.start()
+        await tag_suggester.start()
+        await live_feed.start()
+        await duplicate_detector.start()
         logger.info("Application startup completed")
     except Exception as e:
         logger.error(f"Failed to start application: {e}")
@@ -55,7 +87,15 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Shutdown event - disconnect from database."""
+    """Shutdown event - flush buffered writes and disconnect from database."""
+    await live_feed.stop()
+    await duplicate_detector.stop()
+    await reaction_buffer.stop()
+    await flag_buffer.stop()
+    await trending_worker.stop()
+    await tag_suggester.stop()
+    await response_cache.backend.close()
+    await rate_limiter.backend.close()
     await database.disconnect()
     logger.info("Application shutdown completed")
 
@@ -74,4 +114,29 @@ async def health_check():
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         logger.error(f"Health check failed: {e}")
-        raise HTTPException(status_code=503, detail="Service unhealthy") 
\ No newline at end of file
+        raise HTTPException(status_code=503, detail="Service unhealthy")
+
+@app.get("/stats")
+async def stats():
+    """Internal counters for monitoring."""
+    return {
+        "response_cache": response_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "wire": response_encoder.stats(),
+        "reaction_buffer": reaction_buffer.stats(),
+        "reaction_dedupe": reactor_sketches.stats() if reactor_sketches else {"enabled": False},
+        "flags": flag_buffer.stats(),
+        "trending": trending_worker.stats(),
+        "search": search_backend.stats(),
+        "tag_suggest": tag_suggester.stats(),
+        "live": live_feed.stats(),
+        "archive": post_archive.stats(),
+        "duplicates": duplicate_detector.stats(),
+        "mongo_pool": pool_metrics.stats(),
+        "rate_limit": rate_limiter.stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Request and MongoDB command metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,345 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+import random
+import threading
+import time
+
+from pymongo import monitoring
+
+from .config import settings
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow exports
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in values]
+
+
+class Gauge(Counter):
+    """Value that can go up and down, such as connections in use."""
+
+    kind = "gauge"
+
+    def dec(self, labels: Tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus exposition format.
+
+    Observations only bump one bucket; the cumulative counts are built when
+    the metric is rendered, which keeps ``observe`` cheap on the hot path.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # One count per bucket plus +Inf, then the running sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        lines = []
+        for labels, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together at ``/metrics``.
+
+    With ``sample_rate`` below 1 only that fraction of requests and Mongo
+    commands is recorded at all, trading precision for less overhead;
+    divide counts by the exported ``metrics_sample_rate`` to estimate totals.
+    """
+
+    def __init__(self, sample_rate: float):
+        self.sample_rate = sample_rate
+        self._metrics: list = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        metric = Gauge(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def sampled(self) -> bool:
+        """Whether the current call should be recorded."""
+        rate = self.sample_rate
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP metrics_sample_rate Fraction of requests and commands recorded",
+            "# TYPE metrics_sample_rate gauge",
+            f"metrics_sample_rate {self.sample_rate}",
+        ]
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+metrics = MetricsRegistry(settings.METRICS_SAMPLE_RATE)
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+mongo_commands = metrics.counter(
+    "mongo_commands_total", "MongoDB commands by collection, operation and outcome", ("collection", "command", "outcome"))
+mongo_command_duration = metrics.histogram(
+    "mongo_command_duration_seconds", "MongoDB command round-trip time", ("collection", "command"))
+mongo_documents = metrics.counter(
+    "mongo_documents_total", "Documents returned or written by MongoDB commands", ("collection", "command"))
+mongo_pool_connections = metrics.gauge(
+    "mongo_pool_connections", "Open connections per server", ("address",))
+mongo_pool_checked_out = metrics.gauge(
+    "mongo_pool_checked_out", "Connections currently checked out per server", ("address",))
+mongo_pool_wait = metrics.histogram(
+    "mongo_pool_wait_seconds", "Time spent waiting to check out a connection", ("address",))
+mongo_pool_checkout_failures = metrics.counter(
+    "mongo_pool_checkout_failures_total", "Failed connection checkouts by reason", ("address", "reason"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status of every HTTP request.
+
+    Requests are labelled with the route template (``/api/v1/posts/{post_id}``)
+    rather than the raw path so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[dict] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.sampled():
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self._route(scope)
+            http_request_duration.observe((scope["method"], route), time.perf_counter() - start)
+            http_requests.inc((scope["method"], route, str(status)))
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None:
+            # The router stores the matched endpoint in the scope; map it back
+            # to its path template once all routes are registered
+            self._routes = {route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")}
+        return self._routes.get(endpoint, "unmatched")
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """pymongo listener timing each command by collection and operation.
+
+    Events are delivered on the driver's threads, so the only shared state is
+    the map of in-flight sampled commands and the thread-safe metrics.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple, Tuple[str, str]] = {}
+
+    def started(self, event):
+        if not metrics.sampled():
+            return
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def succeeded(self, event):
+        labels = self._pending.pop((event.connection_id, event.request_id), None)
+        if labels is None:
+            return
+        mongo_command_duration.observe(labels, event.duration_micros / 1e6)
+        mongo_commands.inc(labels + ("ok",))
+        documents = _document_count(event.reply)
+        if documents:
+            mongo_documents.inc(labels, documents)
+
+    def failed(self, event):
+        labels = self._pending.pop((event.connection_id, event.request_id), None)
+        if labels is None:
+            return
+        mongo_command_duration.observe(labels, event.duration_micros / 1e6)
+        mongo_commands.inc(labels + ("error",))
+
+
+def _document_count(reply) -> int:
+    """Documents in a command reply: the cursor batch for reads, ``n`` for writes."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else 0
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """pymongo listener reporting connection pool saturation.
+
+    Pool events are not sampled: they are cheap and the gauges only stay
+    right if every checkout is paired with its check-in. A checkout starts
+    and finishes on the same driver thread, so the wait is timed with a
+    thread-local start time.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.failures = 0
+        self.peak_checked_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._checked_out = 0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        address = _address(event.address)
+        mongo_pool_wait.observe((address,), wait)
+        mongo_pool_checked_out.inc((address,))
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self._checked_out)
+
+    def connection_check_out_failed(self, event):
+        wait = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        address = _address(event.address)
+        mongo_pool_wait.observe((address,), wait)
+        mongo_pool_checkout_failures.inc((address, event.reason))
+        with self._lock:
+            self.failures += 1
+
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.dec((_address(event.address),))
+        with self._lock:
+            self._checked_out -= 1
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc((_address(event.address),))
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec((_address(event.address),))
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "checked_out": self._checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.failures,
+            "avg_wait_ms": round(self.total_wait * 1000 / max(self.checkouts, 1), 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+def _address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+# Global pool listener, registered on every client Database.connect creates
+pool_metrics = PoolMetrics()
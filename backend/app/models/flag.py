@@ -0,0 +1,69 @@
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import List, Literal, Optional
+from datetime import datetime
+from bson import ObjectId
+
+class FlagCreate(BaseModel):
+    """Model for flagging a post for moderation."""
+    post_id: str
+    reason: Literal["spam", "harassment", "personal_info", "other"]
+
+    @field_validator('post_id', mode='before')
+    @classmethod
+    def validate_object_id(cls, v):
+        if isinstance(v, ObjectId):
+            return str(v)
+        if isinstance(v, str) and ObjectId.is_valid(v):
+            return v
+        raise ValueError("Invalid ObjectId")
+
+    model_config = ConfigDict(
+        json_encoders={ObjectId: str}
+    )
+
+class FlagAccepted(FlagCreate):
+    """Model acknowledging a flag queued for the next flush."""
+    status: Literal["queued"] = "queued"
+
+class FlagReasonSummary(BaseModel):
+    """Pending flags of one reason on a post."""
+    reason: str
+    count: int
+    last_flagged_at: datetime
+
+class ReviewQueueItem(BaseModel):
+    """A flagged post awaiting a moderator, with its flags aggregated by reason."""
+    id: str = Field(alias="_id")
+    content: str
+    tags: List[str] = Field(default_factory=list)
+    is_private: bool = False
+    is_flagged: bool = False
+    created_at: datetime
+    flag_count: int
+    hidden_at: Optional[datetime] = None
+    moderation: Optional[str] = None
+    flags: List[FlagReasonSummary] = Field(default_factory=list)
+
+    @field_validator('id', mode='before')
+    @classmethod
+    def validate_object_id(cls, v):
+        if isinstance(v, ObjectId):
+            return str(v)
+        if isinstance(v, str) and ObjectId.is_valid(v):
+            return v
+        raise ValueError("Invalid ObjectId")
+
+    model_config = ConfigDict(
+        json_encoders={ObjectId: str},
+        populate_by_name=True
+    )
+
+class FlagResolution(BaseModel):
+    """Model for a moderator's decision on a flagged post."""
+    action: Literal["hide", "restore"]
+
+class FlagResolved(BaseModel):
+    """Model acknowledging a moderator's decision."""
+    post_id: str
+    action: Literal["hide", "restore"]
+    is_flagged: bool
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict, field_validator
-from typing import List, Optional, Any
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from bson import ObjectId
 
@@ -24,6 +24,7 @@ class PostResponse(PostBase):
     created_at: datetime
     is_flagged: bool = False
     reaction_counts: dict = Field(default_factory=dict)
+    unique_reactors: int = 0
     
     @field_validator('id', mode='before')
     @classmethod
@@ -37,4 +38,25 @@ class PostResponse(PostBase):
     model_config = ConfigDict(
         json_encoders={ObjectId: str},
         populate_by_name=True
-    ) 
\ No newline at end of file
+    )
+
+class BulkPostCreate(BaseModel):
+    """Model for creating a batch of posts.
+
+    Items are validated one by one so a bad item is reported in the results
+    instead of rejecting the whole batch.
+    """
+    posts: List[Dict[str, Any]] = Field(..., min_length=1)
+    ordered: bool = Field(default=False)
+
+class BulkPostItemResult(BaseModel):
+    """Outcome of one item of a bulk create."""
+    index: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkPostResponse(BaseModel):
+    """Model for bulk create responses."""
+    inserted: int
+    failed: int
+    results: List[BulkPostItemResult]
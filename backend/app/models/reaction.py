@@ -40,4 +40,8 @@ class ReactionResponse(ReactionBase):
     model_config = ConfigDict(
         json_encoders={ObjectId: str},
         populate_by_name=True
-    ) 
\ No newline at end of file
+    )
+
+class ReactionAccepted(ReactionBase):
+    """Model acknowledging a reaction queued for the next counter flush."""
+    status: Literal["queued"] = "queued"
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+class TagResponse(BaseModel):
+    """Model for tag responses."""
+    name: str
+    usage_count: int
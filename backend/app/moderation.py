@@ -0,0 +1,312 @@
+from datetime import datetime, UTC
+from hashlib import blake2b, sha256
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import secrets
+import time
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .cache import TRENDING_GROUP, feed_group, post_group, response_cache
+from .config import settings
+from .database import database
+from .pagination import REVIEW_SORT, review_cursor_filter
+from .tags import normalize_tag, update_tag_counts
+
+logger = logging.getLogger(__name__)
+
+# Posts anyone may see in feeds, search and exports. Flagged posts are
+# hidden, and the feed indexes are partial on this filter so they skip them
+VISIBLE = {"is_private": False, "is_flagged": False}
+
+# Set on a post a moderator restored, so further flags never hide it again
+RESTORED = "restored"
+
+# Flagger of the flag the near-duplicate check files on the posts it hides
+DUPLICATE_FLAGGER = "duplicate-check"
+
+if not settings.SECRET_KEY:
+    logger.warning("SECRET_KEY is not set; flagger hashes change with every worker and restart")
+_flagger_key = sha256(settings.SECRET_KEY.encode()).digest() if settings.SECRET_KEY else secrets.token_bytes(32)
+
+# Per reason breakdown of a post's pending flags, for the review queue. Runs
+# inside a $lookup on post_id (MongoDB 5.0+), which uses the flags index
+REVIEW_FLAGS_PIPELINE = [
+    {"$match": {"status": "pending"}},
+    {"$group": {"_id": "$reason", "count": {"$sum": 1}, "last_flagged_at": {"$max": "$created_at"}}},
+    {"$sort": {"count": -1, "_id": 1}},
+    {"$project": {"_id": 0, "reason": "$_id", "count": 1, "last_flagged_at": 1}},
+]
+
+# Review queue entries: the post as moderators need to judge it, plus its flags
+REVIEW_PROJECTION = {
+    "content": 1, "tags": 1, "is_private": 1, "is_flagged": 1, "created_at": 1,
+    "flag_count": 1, "hidden_at": 1, "moderation": 1, "flags": 1,
+}
+
+
+def flagger_id(client: str) -> str:
+    """Stored identity of a flagging client.
+
+    A hash keyed with ``SECRET_KEY``, so the stored value cannot be matched
+    back to an address by hashing every IPv4 address.
+    """
+    return blake2b(client.encode(), digest_size=16, key=_flagger_key, person=b"flagger").hexdigest()
+
+
+def mark_duplicate(post: dict):
+    """Hide a new post caught by the near-duplicate check and count its ``duplicate_flag``.
+
+    The flag count puts the post in the review queue, where a moderator
+    can restore it.
+    """
+    post.update(is_flagged=True, flag_count=1, hidden_at=post["created_at"])
+
+
+def duplicate_flag(post_id: ObjectId) -> dict:
+    """The pending flag stored alongside a post hidden by ``mark_duplicate``."""
+    return {"post_id": post_id, "flagger": DUPLICATE_FLAGGER, "reason": "duplicate", "status": "pending",
+            "created_at": datetime.now(UTC)}
+
+
+async def _visibility_changed(posts: List[dict], hidden: bool):
+    """Keep tag counts and cached pages in line after posts were hidden or restored."""
+    public = [post for post in posts if not post.get("is_private")]
+    if public:
+        await update_tag_counts(database.get_collection("tags"), [post["tags"] for post in public],
+                                delta=-1 if hidden else 1)
+    groups = {post_group(post["_id"]) for post in posts}
+    groups.add(feed_group(None))
+    groups.add(TRENDING_GROUP)
+    groups.update(feed_group(normalize_tag(tag)) for post in public for tag in post["tags"])
+    await response_cache.invalidate(groups)
+
+
+async def hide_over_threshold(post_ids: List[ObjectId], threshold: int) -> List[ObjectId]:
+    """Hide every post in ``post_ids`` whose pending flags reached ``threshold``.
+
+    Each post is hidden with a conditional update on ``is_flagged: False``,
+    so concurrent flushes in several workers hide it exactly once and only
+    one of them adjusts the tag counts. Returns the posts this call hid.
+    """
+    collection = database.get_collection("posts")
+    candidates = await collection.find(
+        {"_id": {"$in": post_ids}, "is_flagged": False, "flag_count": {"$gte": threshold}, "moderation": {"$ne": RESTORED}},
+        {"tags": 1, "is_private": 1},
+    ).to_list(length=len(post_ids))
+    hidden = []
+    for post in candidates:
+        now = datetime.now(UTC)
+        result = await collection.update_one(
+            {"_id": post["_id"], "is_flagged": False},
+            {"$set": {"is_flagged": True, "hidden_at": now, "moderated_at": now}},
+        )
+        if result.modified_count:
+            hidden.append(post)
+    if hidden:
+        await _visibility_changed(hidden, hidden=True)
+        logger.info(f"Hid {len(hidden)} posts that reached {threshold} flags")
+    return [post["_id"] for post in hidden]
+
+
+async def resolve_flags(post_id: ObjectId, action: str) -> Optional[dict]:
+    """Apply a moderator's decision to a flagged post.
+
+    ``hide`` keeps (or makes) the post hidden; ``restore`` shows it again
+    and exempts it from automatic hiding. Either way its pending flags are
+    marked resolved and its counter reset. Returns the post as it was
+    before, or None if it does not exist.
+    """
+    collection = database.get_collection("posts")
+    hide = action == "hide"
+    update = {"$set": {"is_flagged": hide, "flag_count": 0, "moderation": "hidden" if hide else RESTORED,
+                       "moderated_at": datetime.now(UTC)}}
+    if not hide:
+        update["$unset"] = {"hidden_at": ""}
+    before = await collection.find_one_and_update({"_id": post_id}, update, {"tags": 1, "is_private": 1, "is_flagged": 1})
+    if before is None:
+        return None
+    await database.get_collection("flags").update_many(
+        {"post_id": post_id, "status": "pending"},
+        {"$set": {"status": "resolved", "resolution": action, "resolved_at": datetime.now(UTC)}},
+    )
+    if before.get("is_flagged", False) != hide:
+        await _visibility_changed([before], hidden=hide)
+    return before
+
+
+def review_queue_pipeline(limit: int, after: Optional[Tuple[int, ObjectId]] = None) -> list:
+    """Posts with pending flags, most flagged first, each with its flags grouped by reason.
+
+    One aggregation on ``posts`` walks the partial ``review_queue`` index and
+    joins only the page's posts to their flags, instead of a query per post.
+    """
+    match: dict = {"flag_count": {"$gt": 0}}
+    if after is not None:
+        keyset = review_cursor_filter(*after)
+        # Keep the $gt so the query still matches the partial index
+        match = {**keyset, "flag_count": {"$gt": 0, **keyset["flag_count"]}}
+    return [
+        {"$match": match},
+        {"$sort": dict(REVIEW_SORT)},
+        {"$limit": limit},
+        {"$lookup": {"from": "flags", "localField": "_id", "foreignField": "post_id",
+                     "pipeline": REVIEW_FLAGS_PIPELINE, "as": "flags"}},
+        {"$project": REVIEW_PROJECTION},
+    ]
+
+
+class FlagBuffer:
+    """Write-behind buffer for flags, so a brigading burst costs a few bulk writes.
+
+    Flags are queued in memory and written every ``flush_interval_ms`` as
+    one ``bulk_write`` of upserts keyed on (post, flagger), which the
+    ``one_flag_per_flagger`` unique index enforces across flushes and
+    workers: a client flags a post once, ever. Each flagged post's
+    ``flag_count`` is then set to its pending flags, i.e. its distinct
+    flaggers, and only those posts are checked against the hide threshold.
+    Flags of posts that do not exist are dropped.
+    """
+
+    def __init__(self, flush_interval_ms: int, max_pending: int, threshold: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.threshold = threshold
+        self._pending: Dict[Tuple[str, str], dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.received = 0
+        self.duplicates = 0
+        self.written = 0
+        self.dropped = 0
+        self.hidden = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def add(self, post_id: str, reason: str, client: str):
+        """Queue a flag; it reaches MongoDB on the next flush."""
+        self.received += 1
+        key = (post_id, client)
+        if key in self._pending:
+            self.duplicates += 1
+            return
+        self._pending[key] = {"post_id": ObjectId(post_id), "flagger": flagger_id(client), "reason": reason,
+                              "status": "pending", "created_at": datetime.now(UTC)}
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write all queued flags and hide posts that crossed the threshold."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            flags = list(pending.values())
+            start = time.perf_counter()
+            try:
+                posts = database.get_collection("posts")
+                ids = list({flag["post_id"] for flag in flags})
+                existing: Set[ObjectId] = {
+                    post["_id"] for post in await posts.find({"_id": {"$in": ids}}, {"_id": 1}).to_list(length=len(ids))
+                }
+                valid = [flag for flag in flags if flag["post_id"] in existing]
+                self.dropped += len(flags) - len(valid)
+                if valid:
+                    written = await self._upsert(valid)
+                    self.written += written
+                    self.duplicates += len(valid) - written
+                    flagged = list({flag["post_id"] for flag in valid})
+                    await self._recount(flagged)
+                    self.hidden += len(await hide_over_threshold(flagged, self.threshold))
+            except Exception as e:
+                # Retrying is safe: flags already stored are not stored twice, and
+                # counts are recomputed. Newer flags from the same client win.
+                for key, flag in pending.items():
+                    self._pending.setdefault(key, flag)
+                self.flush_failures += 1
+                logger.error(f"Error flushing {len(flags)} flags: {e}")
+                return
+            finally:
+                self.last_flush_ms = (time.perf_counter() - start) * 1000
+                self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+            self.flushes += 1
+
+    async def _upsert(self, flags: List[dict]) -> int:
+        """Store the flags no client has made before; returns how many were new."""
+        ops = [UpdateOne({"post_id": flag["post_id"], "flagger": flag["flagger"]}, {"$setOnInsert": flag}, upsert=True)
+               for flag in flags]
+        try:
+            result = await database.get_collection("flags").bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # Two workers upserting the same new flag: the unique index rejects the second
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+            return e.details.get("nUpserted", 0)
+        return result.upserted_count
+
+    async def _recount(self, post_ids: List[ObjectId]):
+        """Set ``flag_count`` of ``post_ids`` to their pending flags."""
+        counts = {
+            group["_id"]: group["count"]
+            async for group in database.get_collection("flags").aggregate([
+                {"$match": {"post_id": {"$in": post_ids}, "status": "pending"}},
+                {"$group": {"_id": "$post_id", "count": {"$sum": 1}}},
+            ])
+        }
+        await database.get_collection("posts").bulk_write(
+            [UpdateOne({"_id": post_id}, {"$set": {"flag_count": counts.get(post_id, 0)}}) for post_id in post_ids],
+            ordered=False,
+        )
+
+    async def start(self):
+        """Start the periodic flush loop."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still queued."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Flag flush loop error: {e}")
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "buffer_depth": len(self._pending),
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "written": self.written,
+            "dropped": self.dropped,
+            "hidden": self.hidden,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+
+# Global flag buffer instance
+flag_buffer = FlagBuffer(settings.FLAG_FLUSH_INTERVAL_MS, settings.FLAG_BUFFER_MAX_KEYS, settings.FLAG_HIDE_THRESHOLD)
@@ -0,0 +1,241 @@
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import logging
+import time
+import zlib
+
+import orjson
+
+from .cache import RenderedBody
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # br is only offered with the brotli package
+    brotli = None
+try:
+    import msgpack
+except ImportError:  # application/msgpack is only offered with the msgpack package
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+MSGPACK = "application/msgpack"
+# Unregistered name some msgpack clients still send
+_MEDIA_ALIASES = {"application/x-msgpack": MSGPACK}
+# Tags distinguishing a representation's ETag and cache key from plain JSON's
+_SUFFIXES = {MSGPACK: "mp", "br": "br", "gzip": "gz"}
+
+# Negotiated responses differ by these request headers
+VARY = "Accept, Accept-Encoding"
+
+# Bodies at least this large are encoded in a thread; compressing a full
+# page takes milliseconds, and zlib and brotli release the GIL meanwhile
+OFFLOAD_BYTES = 32 * 1024
+
+
+def _weights(header: str) -> Dict[str, float]:
+    """``{value: q}`` for a comma-separated header with optional ``q`` parameters."""
+    weights: Dict[str, float] = {}
+    for item in header.split(","):
+        value, *params = item.split(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(number), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        weights[value] = max(q, weights.get(value, 0.0))
+    return weights
+
+
+def _media_quality(weights: Dict[str, float], media_type: str) -> Tuple[float, int]:
+    """q of ``media_type`` from its most specific matching range, and that range's specificity."""
+    names = [media_type] + [alias for alias, target in _MEDIA_ALIASES.items() if target == media_type]
+    for specificity, ranges in ((2, names), (1, [media_type.split("/")[0] + "/*"]), (0, ["*/*"])):
+        matched = [weights[name] for name in ranges if name in weights]
+        if matched:
+            return max(matched), specificity
+    return 0.0, 0
+
+
+class Representation(NamedTuple):
+    """A negotiated media type and content coding (None for identity)."""
+
+    media_type: str = JSON
+    encoding: Optional[str] = None
+
+    @property
+    def suffix(self) -> str:
+        """Tag for this representation's ETags and cache keys; empty for the plain one."""
+        return "-".join(_SUFFIXES[part] for part in self if part in _SUFFIXES)
+
+    def cache_key(self, key: str) -> str:
+        return f"{key}|{self.suffix}" if self.suffix else key
+
+
+class _BrotliCompressor:
+    """``brotli.Compressor`` behind zlib's ``compress``/``flush`` interface."""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ResponseEncoder:
+    """Negotiates the wire format of post payloads and encodes rendered bodies.
+
+    Bodies are rendered and cached as JSON; other representations are
+    derived from them. ``application/msgpack`` is transcoded from the JSON,
+    so both formats always carry the same fields and values. Bodies are
+    compressed with the client's preferred coding among ``encodings``
+    unless the JSON is under ``min_bytes``, where headers would outweigh
+    the savings. Compressed output is deterministic, so every worker
+    produces the same bytes for the same variant ETag.
+    """
+
+    def __init__(self, encodings: str, min_bytes: int, gzip_level: int, brotli_quality: int):
+        self.encodings: List[str] = []
+        for name in encodings.split(","):
+            name = name.strip().lower()
+            if name == "br" and brotli is None:
+                logger.warning("RESPONSE_ENCODINGS lists br but the brotli package is not installed")
+            elif name in ("br", "gzip"):
+                self.encodings.append(name)
+            elif name:
+                logger.warning(f"Ignoring unknown response encoding {name!r}")
+        self.media_types = [JSON] + ([MSGPACK] if msgpack is not None else [])
+        if msgpack is None:
+            logger.warning("application/msgpack is not offered: the msgpack package is not installed")
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.negotiated: Counter = Counter()
+        self.encoded = 0
+        self.encode_ms = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self, headers, media_types: Optional[Sequence[str]] = None) -> Representation:
+        """Pick the representation for a request from its ``Accept`` and ``Accept-Encoding``.
+
+        ``media_types`` are offered in order of preference, which breaks
+        ties. When the client accepts none of them, the first is served
+        anyway rather than a 406, as RFC 9110 allows.
+        """
+        media_types = [offered for offered in media_types or self.media_types
+                       if offered != MSGPACK or msgpack is not None]
+        media_type = media_types[0]
+        accept = headers.get("accept")
+        if accept:
+            weights = _weights(accept)
+            (q, _), _, best = max((_media_quality(weights, offered), -i, offered)
+                                  for i, offered in enumerate(media_types))
+            if q > 0:
+                media_type = best
+        encoding = None
+        accept_encoding = headers.get("accept-encoding")
+        if accept_encoding:
+            weights = _weights(accept_encoding)
+            if "x-gzip" in weights:
+                weights["gzip"] = max(weights["x-gzip"], weights.get("gzip", 0.0))
+            best_q = 0.0
+            for offered in self.encodings:
+                q = weights.get(offered, weights.get("*", 0.0))
+                if q > best_q:
+                    encoding, best_q = offered, q
+        representation = Representation(media_type, encoding)
+        self.negotiated[representation.suffix or "json"] += 1
+        return representation
+
+    def effective(self, rendered: RenderedBody, representation: Representation) -> Representation:
+        """``representation`` without its encoding if ``rendered`` is too small to compress."""
+        if representation.encoding and len(rendered.body) < self.min_bytes:
+            return representation._replace(encoding=None)
+        return representation
+
+    def etag(self, rendered: RenderedBody, representation: Representation) -> Optional[str]:
+        """Strong ETag of ``rendered`` served as ``representation``.
+
+        Each representation has different bytes, so it gets its own ETag:
+        the JSON's with the representation's suffix.
+        """
+        suffix = self.effective(rendered, representation).suffix
+        if rendered.etag is None or not suffix:
+            return rendered.etag
+        return f'{rendered.etag[:-1]}-{suffix}"'
+
+    def encode(self, rendered: RenderedBody, representation: Representation) -> RenderedBody:
+        """``rendered`` (plain JSON) converted to ``representation``, with its headers."""
+        start = time.perf_counter()
+        etag = self.etag(rendered, representation)
+        representation = self.effective(rendered, representation)
+        body = rendered.body
+        if representation.media_type == MSGPACK:
+            body = self.to_msgpack(body)
+        if representation.encoding:
+            body = self.compress(body, representation.encoding)
+        self.encoded += 1
+        self.encode_ms += (time.perf_counter() - start) * 1000
+        self.bytes_in += len(rendered.body)
+        self.bytes_out += len(body)
+        return rendered._replace(body=body, etag=etag, media_type=representation.media_type,
+                                 content_encoding=representation.encoding)
+
+    async def encode_async(self, rendered: RenderedBody, representation: Representation) -> RenderedBody:
+        """``encode`` without stalling the event loop on large bodies."""
+        if len(rendered.body) < OFFLOAD_BYTES:
+            return self.encode(rendered, representation)
+        return await asyncio.get_running_loop().run_in_executor(None, self.encode, rendered, representation)
+
+    @staticmethod
+    def to_msgpack(json_body: bytes) -> bytes:
+        return msgpack.packb(orjson.loads(json_body))
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        # A zero gzip timestamp keeps the output byte-identical across workers
+        return zlib.compress(body, self.gzip_level, wbits=31)
+
+    def compressobj(self, encoding: Optional[str]):
+        """Streaming compressor with zlib's ``compress``/``flush`` interface, or None for identity."""
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        if encoding == "gzip":
+            return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return None
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "encodings": self.encodings,
+            "media_types": self.media_types,
+            "negotiated": dict(self.negotiated),
+            "encoded": self.encoded,
+            "encode_ms": round(self.encode_ms, 3),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+# Global response encoder
+response_encoder = ResponseEncoder(
+    settings.RESPONSE_ENCODINGS,
+    settings.RESPONSE_COMPRESSION_MIN_BYTES,
+    settings.GZIP_LEVEL,
+    settings.BROTLI_QUALITY,
+)
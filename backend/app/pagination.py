@@ -0,0 +1,126 @@
+import base64
+import binascii
+import math
+from datetime import datetime, timedelta, UTC
+from typing import Tuple
+
+from bson import ObjectId
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# Sort order shared by every chronological feed query. ``_id`` breaks ties
+# between posts created in the same millisecond so cursors never skip or
+# repeat a post.
+FEED_SORT = [("created_at", -1), ("_id", -1)]
+
+# Sort order of the trending feed, with the same ``_id`` tie-breaker
+TRENDING_SORT = [("trending_score", -1), ("_id", -1)]
+
+# Moderation review queue order: most flagged posts first
+REVIEW_SORT = [("flag_count", -1), ("_id", -1)]
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplies a malformed pagination cursor."""
+
+
+def _encode(position: str, post_id) -> str:
+    raw = f"{position}:{post_id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode(cursor: str) -> Tuple[str, ObjectId]:
+    if not cursor or len(cursor) > 64:
+        raise InvalidCursor("Invalid cursor")
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+    position, _, post_id = raw.partition(":")
+    if not ObjectId.is_valid(post_id):
+        raise InvalidCursor("Invalid cursor")
+    return position, ObjectId(post_id)
+
+
+def _keyset_filter(field: str, value, post_id: ObjectId) -> dict:
+    """Range predicate resuming a (``field`` desc, ``_id`` desc) scan after a position.
+
+    The top-level ``$lte`` bounds the index scan on ``field``; the ``$or``
+    only resolves ties on that exact value.
+    """
+    return {
+        field: {"$lte": value},
+        "$or": [
+            {field: {"$lt": value}},
+            {"_id": {"$lt": post_id}},
+        ],
+    }
+
+
+def encode_cursor(created_at: datetime, post_id) -> str:
+    """Encode the (created_at, _id) position of a post as an opaque cursor."""
+    if created_at.tzinfo is None:
+        # Motor returns naive datetimes that are already in UTC
+        created_at = created_at.replace(tzinfo=UTC)
+    millis = (created_at - EPOCH) // timedelta(milliseconds=1)
+    return _encode(str(millis), post_id)
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by ``encode_cursor``."""
+    position, post_id = _decode(cursor)
+    try:
+        return EPOCH + timedelta(milliseconds=int(position)), post_id
+    except (ValueError, OverflowError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def cursor_filter(created_at: datetime, post_id: ObjectId) -> dict:
+    """Range predicate resuming a ``FEED_SORT`` scan after the given position."""
+    return _keyset_filter("created_at", created_at, post_id)
+
+
+def next_cursor(posts: list, limit: int):
+    """Cursor for the page after ``posts``, or None when the feed is exhausted."""
+    if len(posts) < limit:
+        return None
+    last = posts[-1]
+    return encode_cursor(last["created_at"], last["_id"])
+
+
+def encode_score_cursor(score: float, post_id) -> str:
+    """Encode the (score, _id) position of a post as an opaque cursor."""
+    return _encode(f"s{score!r}", post_id)
+
+
+def decode_score_cursor(cursor: str) -> Tuple[float, ObjectId]:
+    """Decode a cursor produced by ``encode_score_cursor``."""
+    position, post_id = _decode(cursor)
+    if not position.startswith("s"):
+        raise InvalidCursor("Invalid cursor")
+    try:
+        score = float(position[1:])
+    except ValueError:
+        raise InvalidCursor("Invalid cursor")
+    if not math.isfinite(score):
+        raise InvalidCursor("Invalid cursor")
+    return score, post_id
+
+
+def score_cursor_filter(score: float, post_id: ObjectId) -> dict:
+    """Range predicate resuming a ``TRENDING_SORT`` scan after the given position."""
+    return _keyset_filter("trending_score", score, post_id)
+
+
+def review_cursor_filter(flag_count: int, post_id: ObjectId) -> dict:
+    """Range predicate resuming a ``REVIEW_SORT`` scan after the given position."""
+    return _keyset_filter("flag_count", flag_count, post_id)
+
+
+def next_score_cursor(posts: list, limit: int, field: str = "trending_score"):
+    """Score-ordered cursor for the page after ``posts``, or None when exhausted."""
+    if len(posts) < limit:
+        return None
+    last = posts[-1]
+    return encode_score_cursor(last[field], last["_id"])
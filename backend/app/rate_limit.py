@@ -0,0 +1,232 @@
+from collections import OrderedDict
+from typing import Dict, Tuple
+import logging
+import math
+import time
+
+from starlette.responses import JSONResponse
+
+from .cache import create_redis_client
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend:
+    """Interface for token-bucket state.
+
+    ``acquire`` takes ``cost`` tokens from the bucket of ``key`` and returns
+    0 when the request may proceed, otherwise the seconds until enough
+    tokens will have refilled. Buckets hold at most ``burst`` tokens and
+    refill at ``rate`` tokens per second.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+
+    async def start(self):
+        """Open connections."""
+
+    async def close(self):
+        """Release connections."""
+
+    async def acquire(self, key: str, cost: float) -> float:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Token buckets local to the current process.
+
+    Each bucket is a (tokens, last refill) pair refilled lazily on access, so
+    a request costs one dict lookup and a little arithmetic. The least
+    recently seen clients are forgotten beyond ``max_keys``, which only ever
+    hands them a full bucket again.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int):
+        super().__init__(rate, burst)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.evictions = 0
+
+    async def acquire(self, key: str, cost: float) -> float:
+        return self.acquire_local(key, cost)
+
+    def acquire_local(self, key: str, cost: float) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = self.burst
+        else:
+            tokens, updated_at = bucket
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            self._buckets.move_to_end(key)
+        if tokens >= cost:
+            self._buckets[key] = (tokens - cost, now)
+            wait = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            wait = (cost - tokens) / self.rate
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+        return wait
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "clients": len(self._buckets), "evictions": self.evictions}
+
+
+# Refill and take from a bucket atomically, using the Redis clock so workers
+# with skewed clocks share one timeline. Returns the wait as a string because
+# Lua numbers are truncated to integers in replies.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Token buckets shared by all workers through a Redis-protocol server.
+
+    Every request runs one Lua script round-trip. If Redis is unavailable
+    requests are let through rather than failing the API.
+    """
+
+    def __init__(self, client, rate: float, burst: float, namespace: str = "unlinked:ratelimit:"):
+        super().__init__(rate, burst)
+        self.client = client
+        self.namespace = namespace
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.errors = 0
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def acquire(self, key: str, cost: float) -> float:
+        try:
+            wait = await self._script(keys=[self.namespace + key], args=[self.rate, self.burst, cost])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Rate limit check failed, allowing request: {e}")
+            return 0.0
+        return float(wait)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "errors": self.errors}
+
+
+def create_rate_limit_backend(url: str) -> RateLimitBackend:
+    """Build a rate limit backend from a URL, with the same schemes as ``CACHE_URL``."""
+    rate = settings.RATE_LIMIT_PER_MINUTE / 60
+    burst = settings.RATE_LIMIT_BURST or settings.RATE_LIMIT_PER_MINUTE
+    if not url or url.startswith("memory://"):
+        return MemoryRateLimitBackend(rate, burst, settings.RATE_LIMIT_MAX_CLIENTS)
+    client = create_redis_client(url)
+    if client is None:
+        raise ValueError(f"Unsupported RATE_LIMIT_URL scheme: {url}")
+    return RedisRateLimitBackend(client, rate, burst)
+
+
+def parse_route_costs(spec: str) -> Dict[Tuple[str, str], float]:
+    """Parse ``"METHOD /path=cost,..."`` into a {(method, path): cost} map."""
+    costs = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        route, _, cost = entry.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        costs[(method.upper(), path.strip())] = float(cost)
+    return costs
+
+
+class RateLimiter:
+    """Per-client request limits applied before any route runs.
+
+    Clients are keyed by IP address. Each request costs the tokens configured
+    for its exact method and path in ``RATE_LIMIT_COSTS`` (1 by default, 0 to
+    exempt a route); writes cost more than reads.
+    """
+
+    def __init__(self, backend: RateLimitBackend, costs: Dict[Tuple[str, str], float], enabled: bool):
+        self.backend = backend
+        # A request can never cost more than a full bucket, or it could never pass
+        self.costs = {route: min(cost, backend.burst) for route, cost in costs.items()}
+        self.enabled = enabled
+        self.allowed = 0
+        self.limited = 0
+
+    def cost(self, method: str, path: str) -> float:
+        return self.costs.get((method, path), 1.0)
+
+    async def check(self, client: str, method: str, path: str) -> float:
+        """Seconds the client must wait before this request, or 0 to proceed."""
+        cost = self.cost(method, path)
+        if not self.enabled or cost <= 0:
+            return 0.0
+        wait = await self.backend.acquire(client, cost)
+        if wait > 0:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {"enabled": self.enabled, "allowed": self.allowed, "limited": self.limited, **self.backend.stats()}
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering over-limit requests with 429 and ``Retry-After``.
+
+    It runs before routing, so a rejected request never reaches the
+    database. Behind a proxy, run uvicorn with ``--proxy-headers`` so the
+    client address is the real client rather than the proxy.
+    """
+
+    def __init__(self, app, limiter: "RateLimiter" = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = scope.get("client")
+        wait = await self.limiter.check(client[0] if client else "unknown", scope["method"], scope["path"])
+        if wait > 0:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(
+    create_rate_limit_backend(settings.RATE_LIMIT_URL),
+    parse_route_costs(settings.RATE_LIMIT_COSTS),
+    settings.RATE_LIMIT_PER_MINUTE > 0,
+)
@@ -0,0 +1,184 @@
+from datetime import datetime, UTC
+from typing import Dict, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from .cache import post_group, response_cache
+from .config import settings
+from .database import database
+from .live import live_feed
+from .sketches import ReactorSketches, reactor_sketches
+
+logger = logging.getLogger(__name__)
+
+
+class ReactionBuffer:
+    """Write-behind buffer for denormalized ``reaction_counts``.
+
+    Reactions are coalesced per (post_id, reaction_type) in memory and
+    written every ``flush_interval_ms`` as one unordered ``bulk_write`` with
+    a single ``$inc`` per post, so a viral post costs one update per flush
+    instead of one per click.
+
+    With ``sketches``, reactions carry the client token they came from and
+    only the first reaction of each type per client and post is counted:
+    tokens are collected per post and type, and each flush checks them
+    against the posts' ``ReactorSketches`` before writing the counts.
+    """
+
+    def __init__(self, flush_interval_ms: int, max_pending: int, sketches: Optional[ReactorSketches] = None):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.sketches = sketches
+        self._pending: Dict[Tuple[str, str], int] = {}
+        self._reactors: Dict[str, Dict[str, Set[str]]] = {}
+        # unique_reactors estimates whose write failed, retried with the next flush
+        self._unique: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.received = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.ops_written = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def add(self, post_id: str, reaction_type: str, amount: int = 1, client: Optional[str] = None):
+        """Buffer a reaction; it reaches MongoDB on the next flush."""
+        self.received += 1
+        if self.sketches is not None and client is not None:
+            self._reactors.setdefault(post_id, {}).setdefault(reaction_type, set()).add(client)
+        else:
+            key = (post_id, reaction_type)
+            self._pending[key] = self._pending.get(key, 0) + amount
+        if len(self._pending) + len(self._reactors) >= self.max_pending:
+            # Flush early rather than let the buffer grow without bound
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write all buffered increments in a single bulk_write."""
+        async with self._flush_lock:
+            if not self._pending and not self._reactors and not self._unique:
+                return
+            pending, self._pending = self._pending, {}
+            reactors, self._reactors = self._reactors, {}
+            unique, self._unique = self._unique, {}
+            start = time.perf_counter()
+
+            if reactors:
+                try:
+                    deduped = await self.sketches.dedupe(reactors)
+                except Exception as e:
+                    # Nothing was counted yet, so the reactions are simply retried
+                    self._restore(pending, reactors, unique)
+                    self.flush_failures += 1
+                    logger.error(f"Error deduplicating reactions to {len(reactors)} posts: {e}")
+                    return
+                for post_id, (counts, unique_reactors) in deduped.items():
+                    unique[post_id] = unique_reactors
+                    for reaction_type, amount in counts.items():
+                        key = (post_id, reaction_type)
+                        pending[key] = pending.get(key, 0) + amount
+
+            increments: Dict[str, Dict[str, int]] = {}
+            for (post_id, reaction_type), amount in pending.items():
+                if amount:
+                    increments.setdefault(post_id, {})[f"reaction_counts.{reaction_type}"] = amount
+            # reactions_updated_at lets the trending worker rescore only these posts
+            now = datetime.now(UTC)
+            ops = []
+            for post_id in increments.keys() | unique.keys():
+                update = {}
+                if post_id in increments:
+                    update = {"$inc": increments[post_id], "$set": {"reactions_updated_at": now}}
+                if post_id in unique:
+                    update.setdefault("$set", {})["unique_reactors"] = unique[post_id]
+                ops.append(UpdateOne({"_id": ObjectId(post_id)}, update))
+            if not ops:
+                return
+
+            try:
+                await database.get_collection("posts").bulk_write(ops, ordered=False)
+            except Exception as e:
+                # Put the increments back so they are retried on the next flush;
+                # deduplicated reactions are already in the sketches, so only their
+                # counts and unique reactor estimates return
+                self._restore(pending, {}, unique)
+                self.flush_failures += 1
+                logger.error(f"Error flushing {len(ops)} reaction updates: {e}")
+                return
+            finally:
+                self.last_flush_ms = (time.perf_counter() - start) * 1000
+                self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+
+            self.flushes += 1
+            self.ops_written += len(ops)
+        await response_cache.invalidate([post_group(post_id) for post_id in increments.keys() | unique.keys()])
+        try:
+            await live_feed.source.reactions_flushed(increments)
+        except Exception as e:
+            logger.error(f"Error publishing reaction updates: {e}")
+
+    def _restore(self, pending: Dict[Tuple[str, str], int], reactors: Dict[str, Dict[str, Set[str]]],
+                 unique: Dict[str, int]):
+        for key, amount in pending.items():
+            self._pending[key] = self._pending.get(key, 0) + amount
+        for post_id, types in reactors.items():
+            for reaction_type, tokens in types.items():
+                self._reactors.setdefault(post_id, {}).setdefault(reaction_type, set()).update(tokens)
+        for post_id, unique_reactors in unique.items():
+            # An estimate from a flush that ran meanwhile is newer
+            self._unique.setdefault(post_id, unique_reactors)
+
+    async def start(self):
+        """Start the periodic flush loop."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still buffered."""
+        if self._task is not None:
+            # Let the loop finish its current flush instead of cancelling it
+            # mid-write, which would lose the swapped-out increments
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Reaction flush loop error: {e}")
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "buffer_depth": len(self._pending) + len(self._reactors) + len(self._unique),
+            "pending_increments": sum(self._pending.values()),
+            "pending_reactors": sum(len(tokens) for types in self._reactors.values() for tokens in types.values()),
+            "received": self.received,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "ops_written": self.ops_written,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+
+# Global reaction buffer instance
+reaction_buffer = ReactionBuffer(settings.REACTION_FLUSH_INTERVAL_MS, settings.REACTION_BUFFER_MAX_KEYS, reactor_sketches)
@@ -0,0 +1,301 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import heapq
+import logging
+import math
+import re
+
+from bson import ObjectId
+
+from .config import settings
+from .database import database
+from .moderation import VISIBLE
+from .serialization import POST_PROJECTION
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i if in is it its me my of on or so "
+    "that the their this to was we were what when with you your".split()
+)
+
+# Rough per-item memory costs used to keep the in-memory index under budget
+BYTES_PER_POSTING = 6  # array('I') doc number + array('H') term frequency
+BYTES_PER_TERM = 200   # dict slot, key string and two array objects
+BYTES_PER_DOC = 16     # ObjectId bytes, length and distinct-term count
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of ``text`` without stopwords."""
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """In-process BM25 index over post content.
+
+    Documents are numbered in insertion order, so postings lists stay sorted
+    and evicting the oldest documents is just raising a floor; the evicted
+    prefix of every postings list is trimmed in occasional compactions.
+    Removed documents are skipped until eviction reaches them. The index
+    keeps at most ``max_docs`` documents and stays under roughly
+    ``memory_budget`` bytes. Only ids are stored, not content.
+    """
+
+    def __init__(self, max_docs: int, memory_budget: int, k1: float = 1.2, b: float = 0.75):
+        self.max_docs = max_docs
+        self.memory_budget = memory_budget
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_ids = bytearray()
+        self._doc_lengths = array("H")
+        self._doc_terms = array("H")
+        self._base = 0   # document number of the first entry in the per-doc arrays
+        self._floor = 0  # documents numbered below this are evicted
+        self._next = 0
+        self._total_length = 0
+        self._total_postings = 0
+        self._removed: Set[int] = set()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return self._next - self._floor
+
+    def add(self, post_id: ObjectId, text: str):
+        """Index a post; call in creation order."""
+        frequencies = Counter(tokenize(text))
+        length = min(sum(frequencies.values()), 0xFFFF)
+        docnum = self._next
+        self._next += 1
+        self._doc_ids += post_id.binary
+        self._doc_lengths.append(length)
+        self._doc_terms.append(min(len(frequencies), 0xFFFF))
+        for term, count in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("H"))
+            postings[0].append(docnum)
+            postings[1].append(min(count, 0xFFFF))
+        self._total_length += length
+        self._total_postings += len(frequencies)
+        self._evict()
+
+    def remove(self, post_ids: Iterable[ObjectId]):
+        """Stop returning ``post_ids``; unknown ids are ignored."""
+        for post_id in post_ids:
+            offset = self._doc_ids.find(post_id.binary)
+            while offset != -1 and offset % 12:
+                offset = self._doc_ids.find(post_id.binary, offset + 1)
+            docnum = self._base + offset // 12
+            if offset != -1 and docnum >= self._floor:
+                self._removed.add(docnum)
+
+    def search(self, query: str, limit: int,
+               after: Optional[Tuple[float, ObjectId]] = None) -> List[Tuple[float, ObjectId]]:
+        """Top ``limit`` (score, post_id) pairs by BM25, after a keyset position."""
+        live = len(self)
+        if not live:
+            return []
+        avg_length = self._total_length / live or 1
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            docnums, frequencies = postings
+            start = bisect_left(docnums, self._floor)
+            df = len(docnums) - start
+            if not df:
+                continue
+            idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+            for i in range(start, len(docnums)):
+                docnum = docnums[i]
+                if docnum in self._removed:
+                    continue
+                tf = frequencies[i]
+                norm = 1 - self.b + self.b * self._doc_lengths[docnum - self._base] / avg_length
+                scores[docnum] = scores.get(docnum, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+        hits = ((round(score, 9), self._doc_id(docnum)) for docnum, score in scores.items())
+        if after is not None:
+            after_score, after_id = after
+            hits = (hit for hit in hits if hit[0] < after_score or (hit[0] == after_score and hit[1] < after_id))
+        return heapq.nlargest(limit, hits)
+
+    def estimated_bytes(self) -> int:
+        return (self._total_postings * BYTES_PER_POSTING
+                + len(self._postings) * BYTES_PER_TERM
+                + len(self) * BYTES_PER_DOC)
+
+    def stats(self) -> dict:
+        return {
+            "docs": len(self),
+            "terms": len(self._postings),
+            "postings": self._total_postings,
+            "removed": len(self._removed),
+            "evicted": self.evicted,
+            "estimated_bytes": self.estimated_bytes(),
+            "memory_budget": self.memory_budget,
+        }
+
+    def _doc_id(self, docnum: int) -> ObjectId:
+        offset = (docnum - self._base) * 12
+        return ObjectId(bytes(self._doc_ids[offset:offset + 12]))
+
+    def _evict(self):
+        """Drop the oldest documents until the index fits its limits."""
+        while len(self) > self.max_docs:
+            self._drop_oldest()
+        if self.estimated_bytes() > self.memory_budget:
+            # Reclaim terms held only by already evicted documents first, then
+            # evict in 1% steps so compactions stay rare
+            self._compact()
+            while len(self) > 1 and self.estimated_bytes() > self.memory_budget:
+                for _ in range(max(1, len(self) // 100)):
+                    self._drop_oldest()
+                self._compact()
+        elif self._floor - self._base > max(1024, len(self) // 4):
+            self._compact()
+
+    def _drop_oldest(self):
+        i = self._floor - self._base
+        self._total_length -= self._doc_lengths[i]
+        self._total_postings -= self._doc_terms[i]
+        self._floor += 1
+        self.evicted += 1
+
+    def _compact(self):
+        """Trim evicted documents from postings lists and per-doc arrays."""
+        for term in list(self._postings):
+            docnums, frequencies = self._postings[term]
+            start = bisect_left(docnums, self._floor)
+            if start == len(docnums):
+                del self._postings[term]
+            elif start:
+                del docnums[:start]
+                del frequencies[:start]
+        dropped = self._floor - self._base
+        del self._doc_ids[:dropped * 12]
+        del self._doc_lengths[:dropped]
+        del self._doc_terms[:dropped]
+        self._base = self._floor
+        self._removed = {docnum for docnum in self._removed if docnum >= self._floor}
+
+
+class SearchBackend:
+    """Interface for full-text search over public posts.
+
+    ``search`` returns post documents (``POST_PROJECTION`` fields plus
+    ``search_score``) ordered by descending (score, _id), starting after the
+    optional keyset position ``after``. Fewer than ``limit`` posts means
+    there are no more matches.
+    """
+
+    async def start(self):
+        """Prepare the backend once the database is connected."""
+
+    def add(self, post: dict):
+        """Make a newly created post searchable."""
+
+    async def search(self, query: str, limit: int,
+                     after: Optional[Tuple[float, ObjectId]] = None) -> List[dict]:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MongoTextSearch(SearchBackend):
+    """Search through the MongoDB text index on ``content``."""
+
+    async def search(self, query: str, limit: int,
+                     after: Optional[Tuple[float, ObjectId]] = None) -> List[dict]:
+        pipeline = [
+            {"$match": {"$text": {"$search": query}, **VISIBLE}},
+            {"$addFields": {"search_score": {"$meta": "textScore"}}},
+        ]
+        if after is not None:
+            score, post_id = after
+            pipeline.append({"$match": {"$or": [
+                {"search_score": {"$lt": score}},
+                {"search_score": score, "_id": {"$lt": post_id}},
+            ]}})
+        pipeline += [
+            {"$sort": {"search_score": -1, "_id": -1}},
+            {"$limit": limit},
+            {"$project": {**POST_PROJECTION, "search_score": 1}},
+        ]
+        collection = database.get_read_collection("posts")
+        return await collection.aggregate(pipeline).to_list(length=limit)
+
+    def stats(self) -> dict:
+        return {"backend": "mongo"}
+
+
+class MemorySearch(SearchBackend):
+    """Search through an in-process ``InvertedIndex``, for tests and local dev.
+
+    The index is loaded with the most recent public posts at startup and
+    kept up to date as posts are created; matching posts are then fetched
+    from MongoDB by id. Hits that turn out hidden or gone are removed from
+    the index and the next hits fetched in their place, so pages stay full.
+    """
+
+    def __init__(self, index: InvertedIndex):
+        self.index = index
+
+    async def start(self):
+        collection = database.get_read_collection("posts")
+        cursor = collection.find(VISIBLE, {"content": 1}).sort("created_at", -1)
+        recent = await cursor.limit(self.index.max_docs).to_list(length=self.index.max_docs)
+        for post in reversed(recent):
+            self.index.add(post["_id"], post["content"])
+        logger.info(f"Loaded {len(self.index)} posts into the search index")
+
+    def add(self, post: dict):
+        if not post.get("is_private") and not post.get("is_flagged"):
+            self.index.add(ObjectId(post["_id"]), post["content"])
+
+    async def search(self, query: str, limit: int,
+                     after: Optional[Tuple[float, ObjectId]] = None) -> List[dict]:
+        collection = database.get_read_collection("posts")
+        results: List[dict] = []
+        while len(results) < limit:
+            hits = self.index.search(query, limit - len(results), after)
+            if not hits:
+                break
+            ids = [post_id for _, post_id in hits]
+            found = await collection.find({"_id": {"$in": ids}, **VISIBLE}, POST_PROJECTION).to_list(length=len(ids))
+            by_id = {post["_id"]: post for post in found}
+            stale = []
+            for score, post_id in hits:
+                post = by_id.pop(post_id, None)
+                if post is None:
+                    stale.append(post_id)
+                else:
+                    post["search_score"] = score
+                    results.append(post)
+            if not stale:
+                break
+            self.index.remove(stale)
+            after = hits[-1]
+        return results
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self.index.stats()}
+
+
+def create_search_backend(name: str) -> SearchBackend:
+    """Build the search backend named by ``SEARCH_BACKEND``."""
+    if name == "memory":
+        return MemorySearch(InvertedIndex(settings.SEARCH_MAX_DOCS, settings.SEARCH_MEMORY_BUDGET_MB * 1024 * 1024))
+    if name == "mongo":
+        return MongoTextSearch()
+    raise ValueError(f"Unsupported SEARCH_BACKEND: {name}")
+
+
+# Global search backend instance
+search_backend = create_search_backend(settings.SEARCH_BACKEND)
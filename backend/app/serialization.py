@@ -0,0 +1,74 @@
+from typing import List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+import orjson
+
+from .config import settings
+from .models.post import PostResponse
+
+# Fields of a stored post that make up a PostResponse. Fetching only these
+# keeps internal bookkeeping fields out of responses on the fast path.
+POST_PROJECTION = {
+    "content": 1,
+    "tags": 1,
+    "is_private": 1,
+    "created_at": 1,
+    "is_flagged": 1,
+    "reaction_counts": 1,
+    "unique_reactors": 1,
+}
+# Single posts also fetch when reactions or moderation last changed them,
+# for their Last-Modified header
+DETAIL_PROJECTION = {**POST_PROJECTION, "reactions_updated_at": 1, "moderated_at": 1}
+# The trending feed also needs the score to build its cursor
+TRENDING_PROJECTION = {**POST_PROJECTION, "trending_score": 1}
+
+post_list_adapter = TypeAdapter(List[PostResponse])
+
+# Response fields with a model default, filled in on the fast path for
+# documents written before the field existed (e.g. ``unique_reactors``)
+_DEFAULTED_FIELDS = [
+    (field.alias or name, field)
+    for name, field in PostResponse.model_fields.items()
+    if not field.is_required() and (field.alias or name) in POST_PROJECTION
+]
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _fill_defaults(post: dict) -> dict:
+    for key, field in _DEFAULTED_FIELDS:
+        if post.get(key) is None:
+            post[key] = field.get_default(call_default_factory=True)
+    return post
+
+
+def render_post(post: dict) -> bytes:
+    """Serialize a post document read from MongoDB to response JSON."""
+    if settings.FAST_SERIALIZATION:
+        return orjson.dumps(_fill_defaults(post), default=_default)
+    post["_id"] = str(post["_id"])
+    return PostResponse(**post).model_dump_json(by_alias=True).encode()
+
+
+def render_posts(posts: List[dict]) -> bytes:
+    """Serialize a page of post documents read from MongoDB to response JSON.
+
+    The fast path trusts documents written by this API and encodes them
+    straight from the driver's dicts with orjson, skipping the pydantic
+    model construction and validation of the standard path. Only missing
+    fields with a model default are filled in, so both paths return the
+    same fields.
+    """
+    if settings.FAST_SERIALIZATION:
+        for post in posts:
+            _fill_defaults(post)
+        return orjson.dumps(posts, default=_default)
+    for post in posts:
+        post["_id"] = str(post["_id"])
+    return post_list_adapter.dump_json([PostResponse(**post) for post in posts], by_alias=True)
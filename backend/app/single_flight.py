@@ -0,0 +1,52 @@
+from typing import Awaitable, Callable, Dict, TypeVar
+import asyncio
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapses concurrent identical loads into one execution.
+
+    The first caller for a key starts the load as its own task; callers
+    arriving while it runs await the same task instead of querying MongoDB
+    again. Callers wait through ``asyncio.shield``, so a client that
+    disconnects only cancels its own wait, never the load the others share.
+    Results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, load: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of ``load()``, sharing a call already in flight for ``key``."""
+        if not self.enabled:
+            return await load()
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the error as retrieved in case every caller went away
+            task.exception()
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {"in_flight": len(self._calls), "executions": self.executions, "coalesced": self.coalesced}
+
+
+# Global single-flight group for feed and post reads
+single_flight = SingleFlight(settings.COALESCE_READS)
@@ -0,0 +1,307 @@
+from datetime import datetime, UTC
+from hashlib import blake2b
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import math
+import struct
+
+from bson import Binary, ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from .config import settings
+from .database import database
+
+logger = logging.getLogger(__name__)
+
+SKETCH_COLLECTION = "reaction_sketches"
+
+# Each Bloom slice holds BLOOM_GROWTH times the reactors of the previous one
+# at BLOOM_TIGHTENING times its error rate, so the rates sum to at most the target
+BLOOM_GROWTH = 2
+BLOOM_TIGHTENING = 0.5
+
+# HyperLogLog encodings: (index, rank) pairs while few registers are set, all registers after
+_SPARSE, _DENSE = 0, 1
+_SPARSE_ENTRY = struct.Struct(">HB")
+
+# Attempts at merging into a post's sketches before the flush gives up on it
+MAX_MERGE_ATTEMPTS = 5
+
+
+def _hash128(key: bytes) -> Tuple[int, int]:
+    digest = blake2b(key, digest_size=16, person=b"reactor-bloom").digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+def _hash64(key: bytes) -> int:
+    return int.from_bytes(blake2b(key, digest_size=8, person=b"reactor-hll").digest(), "little")
+
+
+class ScalableBloomFilter:
+    """Bloom filter that adds slices as it fills, up to ``max_bytes``.
+
+    Slice ``i`` is sized for ``initial_capacity * BLOOM_GROWTH**i`` keys at a
+    false positive rate of ``error_rate * (1 - BLOOM_TIGHTENING) *
+    BLOOM_TIGHTENING**i``, so the combined rate stays below ``error_rate``
+    however many slices there are. Slice sizes follow from their position,
+    so only the bit arrays and their key counts are stored. Once another
+    slice would exceed ``max_bytes`` the filter is full: keys beyond its
+    capacity are reported new without being stored, so the false positive
+    rate stays at ``error_rate`` and reactions are never wrongly dropped,
+    but repeats from reactors past the capacity are no longer caught.
+    """
+
+    def __init__(self, initial_capacity: int, error_rate: float, max_bytes: int,
+                 slices: Optional[List[bytearray]] = None, counts: Optional[List[int]] = None):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.max_bytes = max_bytes
+        self.slices = slices if slices is not None else []
+        self.counts = counts if counts is not None else []
+        self._shapes: List[Tuple[int, int, int]] = []
+
+    def _shape(self, i: int) -> Tuple[int, int, int]:
+        """Capacity, bit count and hash count of slice ``i``."""
+        while len(self._shapes) <= i:
+            n = len(self._shapes)
+            capacity = self.initial_capacity * BLOOM_GROWTH ** n
+            error = self.error_rate * (1 - BLOOM_TIGHTENING) * BLOOM_TIGHTENING ** n
+            bits = math.ceil(-capacity * math.log(error) / math.log(2) ** 2 / 8) * 8
+            self._shapes.append((capacity, bits, max(1, math.ceil(-math.log2(error)))))
+        return self._shapes[i]
+
+    def _positions(self, i: int, h1: int, h2: int):
+        # Enhanced double hashing; plain h1 + j*h2 repeats positions often
+        # enough in small slices to triple the false positive rate
+        _, bits, hashes = self._shape(i)
+        return ((h1 + j * h2 + (j * j * j - j) // 6) % bits for j in range(hashes))
+
+    def __contains__(self, key: bytes) -> bool:
+        h1, h2 = _hash128(key)
+        for i, bits in enumerate(self.slices):
+            if all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(i, h1, h2)):
+                return True
+        return False
+
+    def add(self, key: bytes) -> bool:
+        """Add ``key``; False if it was (or looks) already present."""
+        if key in self:
+            return False
+        last = len(self.slices) - 1
+        if last < 0 or self.counts[last] >= self._shape(last)[0]:
+            bits = self._shape(last + 1)[1]
+            if last >= 0 and self.nbytes() + bits // 8 > self.max_bytes:
+                return True  # full
+            self.slices.append(bytearray(bits // 8))
+            self.counts.append(0)
+            last += 1
+        h1, h2 = _hash128(key)
+        bits = self.slices[last]
+        for p in self._positions(last, h1, h2):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.counts[last] += 1
+        return True
+
+    def false_positive_rate(self) -> float:
+        """Expected false positive rate at the current fill."""
+        hit = 1.0
+        for i, count in enumerate(self.counts):
+            _, bits, hashes = self._shape(i)
+            hit *= 1 - (1 - math.exp(-hashes * count / bits)) ** hashes
+        return 1 - hit
+
+    def is_full(self) -> bool:
+        """True once keys are no longer stored."""
+        if not self.slices:
+            return False
+        last = len(self.slices) - 1
+        return (self.counts[last] >= self._shape(last)[0]
+                and self.nbytes() + self._shape(last + 1)[1] // 8 > self.max_bytes)
+
+    def nbytes(self) -> int:
+        return sum(len(bits) for bits in self.slices)
+
+
+class HyperLogLog:
+    """Cardinality estimate over ``2**precision`` one-byte registers.
+
+    Serialized sparsely, as 3-byte (index, rank) pairs, while that is
+    smaller than the registers themselves, so posts with few reactors
+    stay a few bytes. The standard error is ``1.04 / sqrt(2**precision)``.
+    """
+
+    def __init__(self, precision: int, registers: Optional[bytearray] = None):
+        self.precision = precision
+        self.registers = registers if registers is not None else bytearray(1 << precision)
+
+    def add(self, key: bytes) -> bool:
+        """Add ``key``; True if a register changed."""
+        h = _hash64(key)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small sets
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        header = bytes([self.precision])
+        used = [(i, rank) for i, rank in enumerate(self.registers) if rank]
+        if len(used) * _SPARSE_ENTRY.size < len(self.registers):
+            return bytes([_SPARSE]) + header + b"".join(_SPARSE_ENTRY.pack(i, rank) for i, rank in used)
+        return bytes([_DENSE]) + header + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        encoding, precision = data[0], data[1]
+        if encoding == _DENSE:
+            return cls(precision, bytearray(data[2:]))
+        sketch = cls(precision)
+        for i, rank in _SPARSE_ENTRY.iter_unpack(data[2:]):
+            sketch.registers[i] = rank
+        return sketch
+
+
+class ReactorSketches:
+    """Per-post "already reacted" filters and unique reactor counts, in MongoDB.
+
+    Each post that got reactions has one document in ``reaction_sketches``
+    holding a ``ScalableBloomFilter`` of (reaction type, client token) pairs
+    and a ``HyperLogLog`` of client tokens, as binary fields. The reaction
+    buffer passes every flush's reactions through ``dedupe``, which counts
+    only pairs the filter has not seen. Documents are merged with a
+    compare-and-set on a version number, so flushes in several workers
+    never overwrite each other's bits.
+    """
+
+    def __init__(self, initial_capacity: int, error_rate: float, max_bytes: int, hll_precision: int):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.max_bytes = max_bytes
+        self.hll_precision = hll_precision
+        self.reactions = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self.conflicts = 0
+        self.merge_failures = 0
+
+    def _load(self, document: Optional[dict]) -> Tuple[ScalableBloomFilter, HyperLogLog]:
+        if document is None:
+            return (ScalableBloomFilter(self.initial_capacity, self.error_rate, self.max_bytes),
+                    HyperLogLog(self.hll_precision))
+        # Stored filters keep the shape they were created with if the settings change
+        bloom = ScalableBloomFilter(document["bloom_capacity"], document["bloom_error_rate"], self.max_bytes,
+                                    [bytearray(bits) for bits in document["bloom"]], list(document["bloom_counts"]))
+        return bloom, HyperLogLog.from_bytes(document["hll"])
+
+    async def _merge(self, post_id: ObjectId, reactors: Dict[str, Set[str]],
+                     document: Optional[dict]) -> Optional[Tuple[Dict[str, int], int]]:
+        """Add one post's reactors to its sketches; the new reactions per type and unique reactors.
+
+        None if every attempt lost the compare-and-set to another worker.
+        """
+        collection = database.get_collection(SKETCH_COLLECTION)
+        for _ in range(MAX_MERGE_ATTEMPTS):
+            bloom, hll = self._load(document)
+            accepted: Dict[str, int] = {}
+            changed = False
+            for reaction_type, tokens in reactors.items():
+                for token in tokens:
+                    if bloom.add(f"{reaction_type}:{token}".encode()):
+                        accepted[reaction_type] = accepted.get(reaction_type, 0) + 1
+                    changed |= hll.add(token.encode())
+            if not accepted and not changed:
+                return accepted, hll.count()
+            fields = {
+                "bloom": [Binary(bytes(bits)) for bits in bloom.slices],
+                "bloom_counts": bloom.counts,
+                "bloom_capacity": bloom.initial_capacity,
+                "bloom_error_rate": bloom.error_rate,
+                "hll": Binary(hll.to_bytes()),
+                "updated_at": datetime.now(UTC),
+            }
+            try:
+                if document is None:
+                    await collection.insert_one({"_id": post_id, "v": 1, **fields})
+                    return accepted, hll.count()
+                result = await collection.update_one({"_id": post_id, "v": document["v"]},
+                                                     {"$set": fields, "$inc": {"v": 1}})
+                if result.modified_count:
+                    return accepted, hll.count()
+            except DuplicateKeyError:
+                pass
+            # Another worker merged first; start again from its version
+            self.conflicts += 1
+            document = await collection.find_one({"_id": post_id})
+        return None
+
+    async def dedupe(self, reactors: Dict[str, Dict[str, Set[str]]]) -> Dict[str, Tuple[Dict[str, int], int]]:
+        """Record ``{post_id: {reaction_type: client tokens}}`` in the posts' sketches.
+
+        Returns, per existing post, the reactions to count (new pairs per
+        type) and the estimated unique reactors. Reactions to unknown posts
+        are dropped, like the counters they would have incremented.
+        """
+        by_id: Dict[ObjectId, Dict[str, Set[str]]] = {}
+        for post_id, types in reactors.items():
+            merged_types = by_id.setdefault(ObjectId(post_id), {})
+            for reaction_type, tokens in types.items():
+                merged_types.setdefault(reaction_type, set()).update(tokens)
+        ids = list(by_id)
+        posts = database.get_collection("posts")
+        existing = [post["_id"] for post in await posts.find({"_id": {"$in": ids}}, {"_id": 1}).to_list(length=len(ids))]
+        documents = {
+            document["_id"]: document
+            for document in await database.get_collection(SKETCH_COLLECTION).find({"_id": {"$in": existing}})
+            .to_list(length=len(existing))
+        }
+        results = await asyncio.gather(*(
+            self._merge(post_id, by_id[post_id], documents.get(post_id)) for post_id in existing
+        ))
+        merged = {str(post_id): result for post_id, result in zip(existing, results) if result is not None}
+        failed = [post_id for post_id, result in zip(existing, results) if result is None]
+        if failed:
+            # Counting these without the filter could count repeats, so they are dropped
+            lost = sum(len(tokens) for post_id in failed for tokens in by_id[post_id].values())
+            self.merge_failures += len(failed)
+            logger.error(f"Dropped {lost} reactions to {len(failed)} posts after {MAX_MERGE_ATTEMPTS} "
+                         f"conflicting sketch merges each: {', '.join(map(str, failed))}")
+
+        received = sum(len(tokens) for types in by_id.values() for tokens in types.values())
+        dropped = sum(len(tokens) for post_id, types in by_id.items() if str(post_id) not in merged
+                      for tokens in types.values())
+        accepted = sum(n for counts, _ in merged.values() for n in counts.values())
+        self.reactions += received
+        self.dropped += dropped
+        self.duplicates += received - dropped - accepted
+        return merged
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "reactions": self.reactions,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped,
+            "conflicts": self.conflicts,
+            "merge_failures": self.merge_failures,
+        }
+
+
+# Global reactor sketches, or None when reactions are not deduplicated
+reactor_sketches = ReactorSketches(
+    settings.REACTION_BLOOM_CAPACITY,
+    settings.REACTION_BLOOM_ERROR_RATE,
+    settings.REACTION_BLOOM_MAX_BYTES,
+    settings.REACTION_HLL_PRECISION,
+) if settings.REACTION_DEDUPE else None
@@ -0,0 +1,239 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+import asyncio
+import heapq
+import logging
+import sys
+import time
+
+from pymongo import UpdateOne
+
+from .config import settings
+from .database import database
+
+logger = logging.getLogger(__name__)
+
+# Most suggestions a single request may ask for
+MAX_SUGGESTIONS = 20
+# Prefixes matching more tags than this keep their ranking instead of
+# scanning their range on every request
+SUGGEST_SCAN_LIMIT = 64
+# Sorts after any character a tag can continue with
+_LAST_CHAR = "\U0010ffff"
+
+
+def normalize_tag(tag: str) -> str:
+    """Canonical form of a tag, matching the feed's tag filter."""
+    return tag.strip().lower()
+
+
+async def update_tag_counts(collection, tag_lists: Iterable[Iterable[str]], delta: int = 1) -> Counter:
+    """Apply ``delta`` to ``usage_count`` of every tag in one bulk write.
+
+    ``tag_lists`` holds the tags of each affected post. Increments upsert
+    new tags; decrements (deleted or hidden posts) only touch existing ones.
+    Failures are logged rather than raised so they never fail the write
+    that triggered them. Successful writes also update the suggestion index.
+    """
+    counts = Counter(tag for tags in tag_lists for tag in {normalize_tag(tag) for tag in tags})
+    counts.pop("", None)
+    if not counts:
+        return counts
+    ops = [
+        UpdateOne({"name": name}, {"$inc": {"usage_count": n * delta}}, upsert=delta > 0)
+        for name, n in counts.items()
+    ]
+    try:
+        await collection.bulk_write(ops, ordered=False)
+    except Exception as e:
+        logger.warning(f"Error updating usage counts for {len(ops)} tags: {e}")
+        return counts
+    tag_suggester.index.apply(counts, delta)
+    return counts
+
+
+class TagIndex:
+    """Tag names in sorted order, for prefix suggestions ranked by usage.
+
+    The tags starting with a prefix form one contiguous range of the sorted
+    list, found with two binary searches. Narrow ranges are ranked on every
+    request; prefixes matching more than ``scan_limit`` tags (the short ones
+    clients type first) keep their top ``max_suggestions`` tags, which usage
+    changes update in place.
+    """
+
+    def __init__(self, max_suggestions: int = MAX_SUGGESTIONS, scan_limit: int = SUGGEST_SCAN_LIMIT):
+        self.max_suggestions = max_suggestions
+        self.scan_limit = scan_limit
+        self.names: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self._top: Dict[str, List[str]] = {}
+
+    def load(self, tags: Iterable[Tuple[str, int]]):
+        """Replace the index with ``(name, usage_count)`` pairs."""
+        self.counts = {name: count for name, count in tags}
+        self.names = sorted(self.counts)
+        self._top = {}
+        # Rank every prefix too wide to scan, descending only into those
+        pending = [("", 0, len(self.names))]
+        while pending:
+            prefix, lo, hi = pending.pop()
+            length = len(prefix) + 1
+            i = lo
+            while i < hi:
+                if len(self.names[i]) < length:
+                    i += 1  # the tag equal to the prefix itself
+                    continue
+                child = self.names[i][:length]
+                j = bisect_left(self.names, child + _LAST_CHAR, i, hi)
+                if j - i > self.scan_limit:
+                    self._top[child] = self._rank(i, j)
+                    pending.append((child, i, j))
+                i = j
+
+    def _key(self, name: str):
+        return -self.counts[name], name
+
+    def _rank(self, lo: int, hi: int) -> List[str]:
+        """The most used tags in ``names[lo:hi]``."""
+        counts = self.counts
+        return heapq.nsmallest(self.max_suggestions, (name for name in self.names[lo:hi] if counts[name] > 0), key=self._key)
+
+    def suggest(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """Up to ``limit`` tags starting with ``prefix``, most used first."""
+        top = self._top.get(prefix)
+        if top is None:
+            lo = bisect_left(self.names, prefix)
+            hi = bisect_left(self.names, prefix + _LAST_CHAR, lo)
+            top = self._rank(lo, hi)
+            if hi - lo > self.scan_limit:
+                self._top[prefix] = top
+        return [(name, self.counts[name]) for name in top[:limit]]
+
+    def apply(self, counts: Mapping[str, int], delta: int = 1):
+        """Apply the usage changes of one ``update_tag_counts`` call."""
+        for name, n in counts.items():
+            old = self.counts.get(name)
+            if old is None:
+                if delta < 0:
+                    continue
+                insort(self.names, name)
+                old = 0
+            self.counts[name] = old + n * delta
+            for length in range(1, len(name) + 1):
+                prefix = name[:length]
+                top = self._top.get(prefix)
+                if top is not None:
+                    self._rerank(prefix, top, name, delta > 0)
+
+    def _rerank(self, prefix: str, top: List[str], name: str, increased: bool):
+        if name in top:
+            if increased:
+                top.sort(key=self._key)
+            else:
+                # A tag outside the ranking may now belong in it; rank again when next asked
+                del self._top[prefix]
+        elif self.counts[name] > 0 and (len(top) < self.max_suggestions or self._key(name) < self._key(top[-1])):
+            top.append(name)
+            top.sort(key=self._key)
+            del top[self.max_suggestions:]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def ranked_prefixes(self) -> int:
+        return len(self._top)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the index, counting each string once."""
+        size = sys.getsizeof(self.names) + sys.getsizeof(self.counts) + sys.getsizeof(self._top)
+        size += sum(sys.getsizeof(name) + sys.getsizeof(count) for name, count in self.counts.items())
+        size += sum(sys.getsizeof(prefix) + sys.getsizeof(top) for prefix, top in self._top.items())
+        return size
+
+
+class TagSuggester:
+    """Serves tag suggestions from a ``TagIndex`` held in each API worker.
+
+    The index is loaded from the ``tags`` collection at startup and updated
+    as this worker's posts change tag counts. Tags created through other
+    workers show up at the next full reload, every ``refresh_seconds``.
+    """
+
+    def __init__(self, max_tags: int, refresh_seconds: float):
+        self.max_tags = max_tags
+        self.refresh_seconds = refresh_seconds
+        self.index = TagIndex()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.loads = 0
+        self.load_failures = 0
+        self.last_load_ms = 0.0
+        self.last_load_bytes = 0
+        self.queries = 0
+
+    async def load(self):
+        """Rebuild the index from the most used ``max_tags`` tags."""
+        start = time.perf_counter()
+        collection = database.get_read_collection("tags")
+        cursor = collection.find({"usage_count": {"$gt": 0}}, {"_id": 0, "name": 1, "usage_count": 1})
+        tags = [(tag["name"], tag["usage_count"]) async for tag in cursor.sort("usage_count", -1).limit(self.max_tags)]
+        index = TagIndex()
+        index.load(tags)
+        self.index = index
+        self.loads += 1
+        self.last_load_ms = (time.perf_counter() - start) * 1000
+        # Measured once per load; walking every tag on each /stats call would stall the loop
+        self.last_load_bytes = index.nbytes()
+        logger.info(f"Loaded {len(index)} tags into the suggestion index")
+
+    async def start(self):
+        """Load the index and start the periodic reload."""
+        try:
+            await self.load()
+        except Exception as e:
+            self.load_failures += 1
+            logger.error(f"Error loading tag suggestions: {e}")
+        if self._task is None and self.refresh_seconds > 0:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.refresh_seconds)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.load()
+            except Exception as e:
+                self.load_failures += 1
+                logger.error(f"Error reloading tag suggestions: {e}")
+
+    def suggest(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        self.queries += 1
+        return self.index.suggest(prefix, limit)
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "tags": len(self.index),
+            "ranked_prefixes": self.index.ranked_prefixes(),
+            "queries": self.queries,
+            "loads": self.loads,
+            "load_failures": self.load_failures,
+            "last_load_ms": round(self.last_load_ms, 3),
+            "memory_bytes_at_load": self.last_load_bytes,
+        }
+
+
+# Global tag suggestion index
+tag_suggester = TagSuggester(settings.TAG_SUGGEST_MAX_TAGS, settings.TAG_SUGGEST_REFRESH_SECONDS)
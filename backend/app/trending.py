@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, UTC
+from typing import Optional
+import asyncio
+import logging
+import math
+import time
+
+from pymongo import UpdateOne
+
+from .cache import TRENDING_GROUP, response_cache
+from .config import settings
+from .database import database
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# Passes overlap by this much so reactions flushed by another worker with a
+# slightly different clock are never missed
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+def hot_score(reaction_counts: dict, created_at: datetime) -> float:
+    """Time-decayed popularity score of a post.
+
+    ``log10(reactions) + age_bonus``: every ``TRENDING_DECAY_SECONDS`` of
+    recency is worth ten times the reactions. Because the time term is fixed
+    at creation, scores only change when reactions do, so older posts decay
+    relative to newer ones without ever being rescored.
+    """
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=UTC)
+    total = sum(max(count, 0) for count in (reaction_counts or {}).values())
+    age_bonus = (created_at - EPOCH).total_seconds() / settings.TRENDING_DECAY_SECONDS
+    return round(math.log10(max(total, 1)) + age_bonus, 7)
+
+
+async def rescore(collection, since: Optional[datetime], batch_size: int) -> int:
+    """Recompute ``trending_score`` for posts whose reactions changed since ``since``.
+
+    With ``since=None`` only posts that have never been scored are
+    processed, which backfills posts written before the score existed.
+    Returns the number of posts rescored.
+    """
+    if since is None:
+        query = {"trending_score": {"$exists": False}}
+    else:
+        query = {"reactions_updated_at": {"$gte": since}}
+    cursor = collection.find(query, {"reaction_counts": 1, "created_at": 1}).batch_size(batch_size)
+
+    rescored = 0
+    ops = []
+    async for post in cursor:
+        ops.append(UpdateOne(
+            {"_id": post["_id"]},
+            {"$set": {"trending_score": hot_score(post.get("reaction_counts"), post["created_at"])}},
+        ))
+        if len(ops) >= batch_size:
+            await collection.bulk_write(ops, ordered=False)
+            rescored += len(ops)
+            ops = []
+    if ops:
+        await collection.bulk_write(ops, ordered=False)
+        rescored += len(ops)
+    return rescored
+
+
+class TrendingWorker:
+    """Background task keeping ``trending_score`` up to date.
+
+    Each pass only touches posts whose reactions changed since the previous
+    pass (``reactions_updated_at`` is set by the reaction buffer), so its
+    cost follows reaction volume rather than corpus size.
+    """
+
+    def __init__(self, interval_seconds: float, batch_size: int):
+        self.interval = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._watermark: Optional[datetime] = None
+        self.passes = 0
+        self.failures = 0
+        self.rescored = 0
+        self.last_pass_ms = 0.0
+        self.last_pass_rescored = 0
+
+    async def run_pass(self):
+        """Rescore every post whose reactions changed since the last pass."""
+        started_at = datetime.now(UTC)
+        start = time.perf_counter()
+        collection = database.get_collection("posts")
+        count = await rescore(collection, self._watermark, self.batch_size)
+        if self._watermark is None:
+            # First pass after startup: backfill unscored posts, then catch up
+            # on reactions flushed just before a restart
+            count += await rescore(collection, started_at - timedelta(seconds=self.interval) - WATERMARK_OVERLAP, self.batch_size)
+        self._watermark = started_at - WATERMARK_OVERLAP
+        self.passes += 1
+        self.rescored += count
+        self.last_pass_rescored = count
+        self.last_pass_ms = (time.perf_counter() - start) * 1000
+        if count:
+            await response_cache.invalidate([TRENDING_GROUP])
+
+    async def start(self):
+        """Start the periodic recompute loop."""
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the loop and run a final pass over the last flushed reactions."""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+            try:
+                await self.run_pass()
+            except Exception as e:
+                logger.error(f"Final trending recompute failed: {e}")
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await self.run_pass()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Trending recompute failed: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        return {
+            "passes": self.passes,
+            "failures": self.failures,
+            "rescored": self.rescored,
+            "last_pass_rescored": self.last_pass_rescored,
+            "last_pass_ms": round(self.last_pass_ms, 3),
+        }
+
+
+# Global trending worker instance
+trending_worker = TrendingWorker(settings.TRENDING_INTERVAL_SECONDS, settings.TRENDING_BATCH_SIZE)
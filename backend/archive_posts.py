@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Archival job for the Anti-LinkedIn MongoDB database.
+Moves posts older than ARCHIVE_AFTER_DAYS from the hot ``posts`` collection
+to ``posts_archive`` in batches, keeping the hot tier's indexes small enough
+to stay in RAM. Reports the size of both tiers and their indexes before and
+after. Safe to re-run or interrupt; schedule it e.g. nightly with cron.
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+from datetime import datetime, timedelta, UTC
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.archive import ARCHIVE_COLLECTION, ARCHIVE_PASSES, archive_posts, collection_stats
+from app.config import settings
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+async def report(db, label: str):
+    """Print document counts, data and index sizes of both tiers."""
+    print(f"\n{label}:")
+    for name in ("posts", ARCHIVE_COLLECTION):
+        stats = await collection_stats(db, name)
+        print(f"  {name}: {stats['count']} posts, data {_mb(stats['size'])}, indexes {_mb(stats['index_size'])}")
+        for index_name, size in sorted(stats["index_sizes"].items()):
+            print(f"    {index_name}: {_mb(size)}")
+
+
+async def run(args):
+    if not settings.MONGODB_URI:
+        print("Error: MONGODB_URI not found in environment variables")
+        return False
+
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    db = client[settings.DATABASE_NAME]
+    cutoff = datetime.now(UTC) - timedelta(days=args.days)
+
+    try:
+        await report(db, "Before")
+        if args.dry_run:
+            due = sum([
+                await db.posts.count_documents({**selector, "created_at": {"$lt": cutoff}})
+                for selector in ARCHIVE_PASSES
+            ])
+            print(f"\n{due} posts are older than {args.days} days (dry run, nothing moved)")
+            return True
+
+        print(f"\nArchiving posts created before {cutoff:%Y-%m-%d %H:%M} UTC...")
+        start = time.perf_counter()
+        moved = await archive_posts(db, cutoff, args.batch_size)
+        print(f"✓ Moved {moved} posts in {time.perf_counter() - start:.1f}s")
+        await report(db, "After")
+        return True
+    except Exception as e:
+        print(f"Error archiving posts: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="Archive posts older than this")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="Posts moved per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Only report sizes and how many posts are due")
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
+
+
+if __name__ == "__main__":
+    main()
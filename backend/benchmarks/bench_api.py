@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+End-to-end API benchmark for the Anti-LinkedIn backend.
+Seeds an in-memory, Motor-compatible fake with synthetic posts (skewed tag
+distribution, as sample_data.py generates them) and drives the real FastAPI
+app in-process through httpx's ASGI transport, so every middleware, cache
+and serializer is on the path but no server or network is. Reports
+throughput and latency percentiles per endpoint and page depth, can write
+them as JSON and compare them against a saved baseline:
+
+    python benchmarks/bench_api.py --output baseline.json
+    python benchmarks/bench_api.py --baseline baseline.json
+
+The comparison exits non-zero when a scenario got slower than the tolerance.
+The fake keeps query costs shaped like indexed MongoDB but is not MongoDB;
+compare runs against each other, not against production numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, UTC
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time: no database URI is needed, and rate
+# limiting would reject most benchmark requests
+os.environ.setdefault("MONGODB_URI", "mongodb://benchmark.invalid")
+os.environ["RATE_LIMIT_PER_MINUTE"] = "0"
+
+CACHE_ENTRIES = os.environ.get("FEED_CACHE_MAX_ENTRIES", "1024")
+if "--cache" not in sys.argv:
+    # Measure the query path by default; --cache measures cache hits instead
+    os.environ["FEED_CACHE_MAX_ENTRIES"] = "0"
+
+import httpx
+
+from benchmarks.fake_motor import FakeMotorClient
+from sample_data import public_tags, synthetic_posts
+from app.config import settings
+from app.database import database
+from app.ingest import insert_post_documents
+from app.main import app
+from app.tags import update_tag_counts
+from app.trending import hot_score
+
+API = settings.API_V1_STR
+
+# httpx logs every request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """Nearest-rank percentile of already sorted ``samples``."""
+    index = max(0, min(len(samples) - 1, int(round(fraction * len(samples) + 0.5)) - 1))
+    return samples[index]
+
+
+async def seed(posts: int) -> list:
+    """Point the app at a fresh fake database holding ``posts`` synthetic posts."""
+    database.client = FakeMotorClient()
+    database.database = database.client[settings.DATABASE_NAME]
+    documents = list(synthetic_posts(posts, datetime.now(UTC)))
+    for document in documents:
+        document["trending_score"] = hot_score(document["reaction_counts"], document["created_at"])
+    await insert_post_documents(database.database.posts, documents)
+    await update_tag_counts(database.database.tags, public_tags(documents))
+    return documents
+
+
+async def page_cursor(client: httpx.AsyncClient, params: dict, depth: int) -> str:
+    """Follow the cursor chain to the start of page ``depth`` (1-based)."""
+    cursor = None
+    for _ in range(depth - 1):
+        response = await client.get(f"{API}/posts/", params={**params, **({"cursor": cursor} if cursor else {})})
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            raise SystemExit(f"Feed {params} has fewer than {depth} pages; seed more posts")
+    return cursor
+
+
+async def build_scenarios(client: httpx.AsyncClient, documents: list, args) -> dict:
+    """Map scenario names to functions building the next request."""
+    limit = args.limit
+    top_tag = max(tag_counts(documents).items(), key=lambda item: item[1])[0]
+    public_ids = [str(document["_id"]) for document in documents if not document["is_private"]]
+    scenarios = {}
+
+    def feed(params: dict):
+        return lambda: ("GET", f"{API}/posts/", {"params": params})
+
+    for label, base in (("feed", {"limit": limit}), (f"feed tag={top_tag}", {"limit": limit, "tag": top_tag}),
+                        ("feed trending", {"limit": limit, "sort": "trending"})):
+        for depth in args.depths:
+            if depth == 1:
+                scenarios[f"{label} page 1"] = feed(base)
+                continue
+            cursor = await page_cursor(client, base, depth)
+            scenarios[f"{label} page {depth} cursor"] = feed({**base, "cursor": cursor})
+            if label == "feed":
+                scenarios[f"{label} page {depth} skip"] = feed({**base, "skip": (depth - 1) * limit})
+
+    scenarios["post by id"] = lambda: ("GET", f"{API}/posts/{random.choice(public_ids)}", {})
+    scenarios["create post"] = lambda: ("POST", f"{API}/posts/", {"json": {
+        # Distinct content, so the near-duplicate check lets every post through
+        "content": f"Benchmark post {random.getrandbits(64):016x} about week {random.getrandbits(64):016x}.",
+        "tags": random.sample([top_tag, "career", "burnout", "growth"], 2),
+        "is_private": False,
+    }})
+    return scenarios
+
+
+def tag_counts(documents: list) -> dict:
+    counts = {}
+    for tags in public_tags(documents):
+        for tag in tags:
+            counts[tag] = counts.get(tag, 0) + 1
+    return counts
+
+
+async def measure(client: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    """Send ``requests`` requests from ``concurrency`` workers; summarize their latencies."""
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, kwargs = make_request()
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each scenario against the baseline; return the regressed ones."""
+    regressions = []
+    print(f"\nAgainst baseline (tolerance {tolerance:.0%})")
+    print(f"{'scenario':<34} {'p50 Δ':>9} {'p99 Δ':>9} {'req/s Δ':>9}")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            print(f"{name:<34} {'new':>9}")
+            continue
+        deltas = {
+            field: current[field] / previous[field] - 1 if previous[field] else 0.0
+            for field in ("p50_ms", "p99_ms", "throughput_rps")
+        }
+        regressed = (deltas["p50_ms"] > tolerance or deltas["p99_ms"] > tolerance
+                     or deltas["throughput_rps"] < -tolerance)
+        print(f"{name:<34} {deltas['p50_ms']:>+9.1%} {deltas['p99_ms']:>+9.1%} "
+              f"{deltas['throughput_rps']:>+9.1%}{'  REGRESSED' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+async def run(args) -> int:
+    random.seed(args.seed)
+    print(f"Seeding {args.posts} posts into the in-memory fake...")
+    start = time.perf_counter()
+    documents = await seed(args.posts)
+    print(f"✓ Seeded in {time.perf_counter() - start:.1f}s\n")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        scenarios = await build_scenarios(client, documents, args)
+        results = {
+            "meta": {
+                "posts": args.posts,
+                "limit": args.limit,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "cache": args.cache,
+                "python": platform.python_version(),
+                "timestamp": datetime.now(UTC).isoformat(),
+            },
+            "scenarios": {},
+        }
+        print(f"{args.requests} requests per scenario, concurrency {args.concurrency}, "
+              f"response cache {'on' if args.cache else 'off'}")
+        print(f"{'scenario':<34} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for name, make_request in scenarios.items():
+            await measure(client, make_request, args.warmup, 1)
+            summary = await measure(client, make_request, args.requests, args.concurrency)
+            results["scenarios"][name] = summary
+            print(f"{name:<34} {summary['throughput_rps']:>9.0f} {summary['p50_ms']:>9.2f} "
+                  f"{summary['p90_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['errors']:>7}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for field in ("posts", "limit", "concurrency", "cache"):
+            if baseline.get("meta", {}).get(field) != results["meta"][field]:
+                print(f"Warning: baseline ran with {field}={baseline.get('meta', {}).get(field)}, "
+                      f"this run with {field}={results['meta'][field]}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n✗ {len(regressions)} scenario(s) regressed")
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=20_000, help="Number of posts to seed")
+    parser.add_argument("--limit", type=int, default=settings.DEFAULT_PAGE_SIZE, help="Page size")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 10, 50], help="Page numbers to measure")
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent in-flight requests")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"Keep the response cache on ({CACHE_ENTRIES} entries) to measure hits")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and request mix")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results saved with --output")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown before a scenario counts as regressed")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
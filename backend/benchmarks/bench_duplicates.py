@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection benchmark for the Anti-LinkedIn API.
+Fills a DuplicateIndex to a full window of posts, then measures index
+inserts per second, lookup latency at that size, memory use, MinHash
+signature throughput inline and in a process pool, and how much of a
+copy-paste flood with small edits is caught. No database is needed.
+"""
+
+import argparse
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.duplicates import BANDS, NUM_BINS, DuplicateIndex, minhash_signature, shingles
+
+# A Zipf-weighted vocabulary, so common words repeat across posts as in real text
+_vocab_rng = random.Random(7)
+WORDS = ["".join(_vocab_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_vocab_rng.randint(2, 9))) for _ in range(5000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+
+def random_post(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, weights=WEIGHTS, k=rng.randint(10, 80)))
+
+
+def edited(text: str, rng: random.Random) -> str:
+    """A copy with a few words swapped, as spammers do to dodge exact matching."""
+    words = text.split()
+    for _ in range(rng.randint(0, 3)):
+        words[rng.randrange(len(words))] = rng.choices(WORDS, weights=WEIGHTS)[0]
+    return " ".join(words)
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--window", type=int, default=1_000_000, help="Posts held in the index")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Similarity threshold")
+    parser.add_argument("--samples", type=int, default=5000, help="Timed lookups and signatures")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Signature processes")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    index = DuplicateIndex(window_seconds=1e9, max_posts=args.window, threshold=args.threshold)
+    rss_before = rss_mb()
+    print(f"Filling the index with {args.window} posts...")
+    # Random signatures stand in for distinct posts; the index cost does not depend on content
+    start = time.perf_counter()
+    for _ in range(args.window):
+        keys = tuple(rng.getrandbits(32) for _ in range(BANDS))
+        index.add(keys, rng.randbytes(NUM_BINS), now=0.0)
+    elapsed = time.perf_counter() - start
+    print(f"✓ {args.window / elapsed:,.0f} inserts/s")
+    print(f"  index arrays {index.nbytes() / 1024 / 1024:.1f} MB "
+          f"({index.nbytes() / len(index):.0f} bytes/post), peak RSS grew {rss_mb() - rss_before:.1f} MB\n")
+
+    texts = [random_post(rng) for _ in range(args.samples)]
+    signatures = [minhash_signature(text) for text in texts]
+
+    # Lookup plus insert, as DuplicateDetector.check does for a new post
+    latencies = []
+    for keys, signature in signatures:
+        start = time.perf_counter()
+        if index.match(keys, signature, now=0.0) is None:
+            index.add(keys, signature, now=0.0)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    print(f"check at a full window: {1e6 / statistics.mean(latencies):,.0f}/s, "
+          f"p50 {latencies[len(latencies) // 2]:.1f} µs, p99 {latencies[int(len(latencies) * 0.99)]:.1f} µs")
+
+    start = time.perf_counter()
+    for text in texts:
+        minhash_signature(text)
+    inline = args.samples / (time.perf_counter() - start)
+    print(f"signatures inline: {inline:,.0f}/s ({1e6 / inline:.0f} µs each, "
+          f"{statistics.mean(len(text) for text in texts):.0f} chars on average)")
+    with ProcessPoolExecutor(args.workers) as pool:
+        list(pool.map(minhash_signature, texts[:args.workers]))  # start the workers
+        start = time.perf_counter()
+        list(pool.map(minhash_signature, texts, chunksize=64))
+        pooled = args.samples / (time.perf_counter() - start)
+    print(f"signatures in {args.workers} process(es): {pooled:,.0f}/s\n")
+
+    # A flood: each original posted again with small edits, grouped by how
+    # similar the copy really is (exact Jaccard over the same shingles)
+    groups = {"identical": [0, 0], f">= {args.threshold + 0.1:.1f}": [0, 0], f">= {args.threshold:.1f}": [0, 0]}
+    for text in texts[:3000]:
+        copy = edited(text, rng)
+        a, b = shingles(text), shingles(copy)
+        jaccard = len(a & b) / len(a | b)
+        if jaccard == 1:
+            group = "identical"
+        elif jaccard >= args.threshold + 0.1:
+            group = f">= {args.threshold + 0.1:.1f}"
+        elif jaccard >= args.threshold:
+            group = f">= {args.threshold:.1f}"
+        else:
+            continue
+        keys, signature = minhash_signature(copy)
+        groups[group][0] += 1
+        groups[group][1] += index.match(keys, signature, now=0.0) is not None
+    for group, (total, caught) in groups.items():
+        print(f"edited copies with similarity {group}: {caught / max(total, 1):.1%} caught of {total}")
+    false_matches = 0
+    for _ in range(1000):
+        keys, signature = minhash_signature(random_post(rng))
+        false_matches += index.match(keys, signature, now=0.0) is not None
+    print(f"unrelated posts matched: {false_matches / 1000:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Pagination benchmark for the Anti-LinkedIn feed.
+Seeds a scratch collection and compares page-N latency of skip/limit against
+keyset (cursor) pagination, for both the global and the tag-filtered feed.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, UTC
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from app.config import settings
+from app.pagination import FEED_SORT, cursor_filter, decode_cursor, encode_cursor
+
+TAGS = ["burnout", "career", "jobsearch", "interviews", "growth", "management", "mentalhealth", "promotion"]
+
+
+async def seed(collection, total: int, batch_size: int = 5000):
+    """Insert ``total`` synthetic posts spread over the last year."""
+    await collection.drop()
+    now = datetime.now(UTC)
+    inserted = 0
+    while inserted < total:
+        batch = []
+        for _ in range(min(batch_size, total - inserted)):
+            batch.append({
+                "content": "benchmark post " * 8,
+                "tags": random.sample(TAGS, 2),
+                "is_private": random.random() < 0.05,
+                "is_flagged": False,
+                "created_at": now - timedelta(seconds=random.randint(0, 365 * 24 * 3600)),
+                "reaction_counts": {"same": 0, "helpful": 0, "upvote": 0},
+            })
+        await collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    await collection.create_index([("created_at", DESCENDING), ("_id", DESCENDING)])
+    await collection.create_index([("tags", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+
+
+async def time_query(make_cursor, limit: int, repeat: int) -> float:
+    """Median latency in milliseconds of fetching one page."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await make_cursor().limit(limit).to_list(length=limit)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def bench_depth(collection, base_query: dict, depth: int, limit: int, repeat: int):
+    """Return (skip_ms, cursor_ms) for page number ``depth``."""
+    skip = depth * limit
+
+    # Locate the last post of the previous page once, untimed, to build the cursor
+    previous = await collection.find(base_query).sort(FEED_SORT).skip(max(skip - 1, 0)).limit(1).to_list(length=1)
+    if not previous:
+        return None
+
+    skip_ms = await time_query(lambda: collection.find(base_query).sort(FEED_SORT).skip(skip), limit, repeat)
+
+    if depth == 0:
+        cursor_query = base_query
+    else:
+        # Round-trip through the opaque cursor exactly as the endpoint does
+        cursor = encode_cursor(previous[0]["created_at"], previous[0]["_id"])
+        cursor_query = {**base_query, **cursor_filter(*decode_cursor(cursor))}
+    cursor_ms = await time_query(lambda: collection.find(cursor_query).sort(FEED_SORT), limit, repeat)
+    return skip_ms, cursor_ms
+
+
+async def run(args):
+    if not settings.MONGODB_URI:
+        print("Error: MONGODB_URI not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    collection = client[settings.DATABASE_NAME][args.collection]
+
+    try:
+        print(f"Seeding {args.posts} posts into {settings.DATABASE_NAME}.{args.collection}...")
+        start = time.perf_counter()
+        await seed(collection, args.posts)
+        print(f"✓ Seeded in {time.perf_counter() - start:.1f}s\n")
+
+        max_depth = args.posts // args.limit
+        depths = [d for d in (0, 10, 100, 500, 1000, 2500, 5000) if d < max_depth]
+
+        for label, base_query in (
+            ("global feed", {"is_private": False}),
+            ("tag feed (career)", {"is_private": False, "tags": "career"}),
+        ):
+            print(f"{label} — median of {args.repeat} runs, limit={args.limit}")
+            print(f"{'page':>8} {'skip (ms)':>12} {'cursor (ms)':>12}")
+            for depth in depths:
+                result = await bench_depth(collection, base_query, depth, args.limit, args.repeat)
+                if result is None:
+                    break
+                skip_ms, cursor_ms = result
+                print(f"{depth:>8} {skip_ms:>12.2f} {cursor_ms:>12.2f}")
+            print()
+    finally:
+        if not args.keep:
+            await collection.drop()
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=100_000, help="Number of posts to seed")
+    parser.add_argument("--limit", type=int, default=settings.DEFAULT_PAGE_SIZE, help="Page size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per page")
+    parser.add_argument("--collection", default="bench_posts", help="Scratch collection name")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch collection afterwards")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Rate limiter overhead benchmark for the Anti-LinkedIn API.
+Drives a minimal FastAPI app through its ASGI interface with and without
+RateLimitMiddleware and reports throughput and the added cost per request.
+Requests come from many client addresses and are never limited, so every one
+pays the full bucket update. No database or network is needed; pass --redis
+to also time the shared backend against a Redis server.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from app.cache import create_redis_client
+from app.rate_limit import MemoryRateLimitBackend, RateLimiter, RateLimitMiddleware, RedisRateLimitBackend
+
+
+def make_app(limiter=None):
+    app = FastAPI()
+
+    @app.get("/api/v1/posts/")
+    async def posts():
+        return []
+
+    if limiter is not None:
+        app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return app
+
+
+async def drive(app, requests: int, clients: int) -> float:
+    """Send ``requests`` GETs straight through the ASGI app; return requests/second."""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"Unexpected status {message['status']}")
+
+    scopes = [
+        {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/api/v1/posts/", "raw_path": b"/api/v1/posts/", "root_path": "",
+            "query_string": b"", "headers": [(b"host", b"localhost")],
+            "client": (f"10.0.{i // 256 % 256}.{i % 256}", 40000), "server": ("localhost", 8000),
+        }
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(dict(scopes[i % clients]), receive, send)
+    return requests / (time.perf_counter() - start)
+
+
+async def run(args):
+    # Generous limits so no benchmark request is rejected
+    rate, burst = 1e9, 1e9
+    backends = [("memory", MemoryRateLimitBackend(rate, burst, max_keys=args.clients))]
+    if args.redis:
+        backends.append(("redis", RedisRateLimitBackend(create_redis_client(args.redis), rate, burst)))
+
+    baseline_app = make_app()
+    await drive(baseline_app, 1000, args.clients)  # warm up
+    baseline = await drive(baseline_app, args.requests, args.clients)
+    print(f"{args.requests} requests from {args.clients} clients")
+    print(f"{'backend':>10} {'req/s':>12} {'µs/request':>12} {'overhead µs':>12}")
+    print(f"{'none':>10} {baseline:>12.0f} {1e6 / baseline:>12.1f} {0:>12.1f}")
+    for name, backend in backends:
+        app = make_app(RateLimiter(backend, {}, enabled=True))
+        await drive(app, 1000, args.clients)
+        throughput = await drive(app, args.requests, args.clients)
+        print(f"{name:>10} {throughput:>12.0f} {1e6 / throughput:>12.1f} {1e6 / throughput - 1e6 / baseline:>12.1f}")
+        await backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50_000, help="Requests per run")
+    parser.add_argument("--clients", type=int, default=10_000, help="Distinct client addresses")
+    parser.add_argument("--redis", help="Also benchmark the shared backend, e.g. redis://localhost:6379/0")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Reactor sketch benchmark for the Anti-LinkedIn API.
+Fills a post's ScalableBloomFilter and HyperLogLog with distinct client
+tokens, as ReactorSketches does, and reports for each false positive
+target and reactor count: the bytes stored per post, the measured false
+positive rate (reactions wrongly dropped as repeats), whether the filter
+is full (repeats past its capacity are no longer caught), and the HyperLogLog
+error of the unique reactor estimate. A reactions document per click is
+shown for comparison. No database is needed.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from bson import ObjectId
+
+from app.config import settings
+from app.sketches import HyperLogLog, ScalableBloomFilter
+
+
+def stored_bytes(bloom: ScalableBloomFilter, hll: HyperLogLog) -> int:
+    """BSON size of the post's reaction_sketches document."""
+    return len(bson.encode({
+        "_id": ObjectId(), "v": 1,
+        "bloom": [bson.Binary(bytes(bits)) for bits in bloom.slices],
+        "bloom_counts": bloom.counts,
+        "bloom_capacity": bloom.initial_capacity,
+        "bloom_error_rate": bloom.error_rate,
+        "hll": bson.Binary(hll.to_bytes()),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reactors", type=int, nargs="+", default=[10, 100, 1000, 10_000, 100_000],
+                        help="Distinct reactors per post")
+    parser.add_argument("--error-rates", type=float, nargs="+", default=[0.1, 0.01, 0.001],
+                        help="Bloom false positive targets")
+    parser.add_argument("--capacity", type=int, default=settings.REACTION_BLOOM_CAPACITY, help="First slice capacity")
+    parser.add_argument("--max-bytes", type=int, default=settings.REACTION_BLOOM_MAX_BYTES, help="Bloom size cap")
+    parser.add_argument("--precision", type=int, default=settings.REACTION_HLL_PRECISION, help="HyperLogLog precision")
+    parser.add_argument("--probes", type=int, default=20_000, help="New reactors probed for false positives")
+    args = parser.parse_args()
+
+    per_click = len(bson.encode({"_id": ObjectId(), "post_id": ObjectId(), "reaction_type": "upvote",
+                                 "client": "x" * 22, "created_at": 0}))
+    print(f"First slice capacity {args.capacity}, cap {args.max_bytes} bytes, HyperLogLog precision {args.precision}")
+    print(f"For comparison, a reactions document per click is {per_click} bytes before indexes\n")
+    print(f"{'target':>7} {'reactors':>9} {'bytes/post':>11} {'bloom':>7} {'slices':>6} "
+          f"{'full':>5} {'false pos':>10} {'expected':>9} {'hll error':>10} {'µs/add':>7}")
+
+    for error_rate in args.error_rates:
+        bloom = ScalableBloomFilter(args.capacity, error_rate, args.max_bytes)
+        hll = HyperLogLog(args.precision)
+        added = 0
+        for reactors in sorted(args.reactors):
+            start = time.perf_counter()
+            for i in range(added, reactors):
+                token = f"client-{i}".encode()
+                bloom.add(b"upvote:" + token)
+                hll.add(token)
+            add_us = (time.perf_counter() - start) * 1e6 / max(reactors - added, 1)
+            added = reactors
+            false_positives = sum(b"upvote:" + f"probe-{i}".encode() in bloom for i in range(args.probes))
+            hll_error = abs(hll.count() - reactors) / reactors
+            print(f"{error_rate:>7} {reactors:>9,} {stored_bytes(bloom, hll):>11,} {bloom.nbytes():>7,} "
+                  f"{len(bloom.slices):>6} {'yes' if bloom.is_full() else 'no':>5} {false_positives / args.probes:>10.3%} {bloom.false_positive_rate():>9.3%} "
+                  f"{hll_error:>10.2%} {add_us:>7.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
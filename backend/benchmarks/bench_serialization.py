@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Serialization microbenchmark for the Anti-LinkedIn feed.
+Compares the cost of turning one page of post documents, as returned by Motor,
+into response bytes via the original pydantic/response_model path, the pydantic
+TypeAdapter path and the orjson fast path. No database is needed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+from app.models.post import PostResponse
+from app.serialization import post_list_adapter, render_posts
+
+
+def make_page(limit: int):
+    """Documents shaped like Motor's output (ObjectId ids, naive UTC datetimes)."""
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "content": "Why do job descriptions ask for 5+ years of experience for entry-level positions? " * 10,
+            "tags": ["jobsearch", "entrylevel", "frustration"],
+            "is_private": False,
+            "is_flagged": False,
+            "created_at": now - timedelta(minutes=i),
+            "reaction_counts": {"same": 67, "helpful": 34, "upvote": 89},
+        }
+        for i in range(limit)
+    ]
+
+
+def original_path(page):
+    """Model per document, response_model re-validation, jsonable_encoder, json.dumps."""
+    posts = [dict(post, _id=str(post["_id"])) for post in page]
+    models = [PostResponse(**post) for post in posts]
+    validated = post_list_adapter.validate_python(models)
+    content = jsonable_encoder(validated, by_alias=True)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def adapter_path(page):
+    """Model per document, serialized in one pass by a TypeAdapter."""
+    posts = [dict(post, _id=str(post["_id"])) for post in page]
+    return post_list_adapter.dump_json([PostResponse(**post) for post in posts], by_alias=True)
+
+
+def fast_path(page):
+    """orjson straight from the driver's dicts."""
+    settings.FAST_SERIALIZATION = True
+    return render_posts(page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100, help="Posts per page")
+    parser.add_argument("--number", type=int, default=200, help="Pages per timing run")
+    args = parser.parse_args()
+
+    page = make_page(args.limit)
+    assert json.loads(original_path(page)) == json.loads(fast_path(page)), "fast path output differs"
+
+    print(f"Serializing one page of {args.limit} posts (best of 5 x {args.number} runs)")
+    print(f"{'path':>12} {'µs/page':>12} {'speedup':>10}")
+    baseline = None
+    for name, fn in (("original", original_path), ("typeadapter", adapter_path), ("orjson", fast_path)):
+        best = min(timeit.repeat(lambda: fn(page), number=args.number, repeat=5)) / args.number
+        baseline = baseline or best
+        print(f"{name:>12} {best * 1e6:>12.1f} {baseline / best:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tag suggestion benchmark for the Anti-LinkedIn API.
+Loads a TagIndex with many distinct tags (Zipf-distributed usage counts),
+reports build time and memory, then measures suggestion latency per prefix
+length and the cost of the incremental updates made as posts are created.
+No database is needed.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tags import MAX_SUGGESTIONS, TagIndex
+
+SYLLABLES = ["ca", "re", "er", "bur", "no", "ut", "gro", "wth", "lay", "off", "pro", "mo", "tion", "sa",
+             "la", "ry", "re", "mote", "ma", "na", "ger", "in", "ter", "view", "de", "v", "ops", "data"]
+
+
+def tag_names(count: int, rng: random.Random) -> list:
+    """``count`` distinct lowercase tags built from syllables, some hyphenated."""
+    names = set()
+    while len(names) < count:
+        name = "".join(rng.choices(SYLLABLES, k=rng.randint(1, 4)))
+        if rng.random() < 0.2:
+            name += "-" + "".join(rng.choices(SYLLABLES, k=rng.randint(1, 3)))
+        names.add(name)
+    return sorted(names)
+
+
+def percentiles(latencies: list) -> str:
+    latencies.sort()
+    return (f"mean {statistics.mean(latencies):.1f} µs, p50 {latencies[len(latencies) // 2]:.1f} µs, "
+            f"p99 {latencies[int(len(latencies) * 0.99)]:.1f} µs, max {latencies[-1]:.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tags", type=int, default=100_000, help="Distinct tags in the index")
+    parser.add_argument("--queries", type=int, default=20_000, help="Timed suggestions per prefix length")
+    parser.add_argument("--limit", type=int, default=10, help="Suggestions per query")
+    parser.add_argument("--updates", type=int, default=50_000, help="Timed usage count updates")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    names = tag_names(args.tags, rng)
+    rng.shuffle(names)
+    # Zipf usage: a few tags are everywhere, most are used a handful of times
+    tags = [(name, max(1, int(1_000_000 / (rank + 1)))) for rank, name in enumerate(names)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = TagIndex()
+    index.load(tags)
+    elapsed = time.perf_counter() - start
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Loaded {len(index):,} tags in {elapsed * 1000:.0f} ms, {index.ranked_prefixes():,} ranked prefixes")
+    print(f"  {index.nbytes() / 1024 / 1024:.1f} MB with the tag strings ({index.nbytes() / len(index):.0f} bytes/tag), "
+          f"{traced / 1024 / 1024:.1f} MB allocated by the load itself\n")
+
+    # Prefixes of existing tags, weighted by usage as users type popular tags more
+    weights = [count for _, count in tags]
+    for length in (1, 2, 3, 4, 6):
+        typed = [name[:length] for name, _ in rng.choices(tags, weights=weights, k=args.queries)]
+        typed += [name[:length] for name, _ in rng.choices(tags, k=args.queries)]
+        latencies = []
+        for prefix in typed:
+            start = time.perf_counter()
+            index.suggest(prefix, args.limit)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        print(f"prefix length {length}: {percentiles(latencies)}")
+
+    # As create_post applies them: mostly existing tags, some brand new ones
+    latencies = []
+    for i in range(args.updates):
+        name = rng.choice(names) if rng.random() < 0.9 else f"new-tag-{i}"
+        start = time.perf_counter()
+        index.apply({name: 1})
+        latencies.append((time.perf_counter() - start) * 1e6)
+    print(f"\nupdates: {percentiles(latencies)}")
+
+    # Suggestions stay correct after the updates
+    for name, _ in rng.sample(tags, 200):
+        prefix = name[:2]
+        expected = sorted((tag for tag in index.names if tag.startswith(prefix) and index.counts[tag] > 0),
+                          key=lambda tag: (-index.counts[tag], tag))[:MAX_SUGGESTIONS]
+        assert [tag for tag, _ in index.suggest(prefix, MAX_SUGGESTIONS)] == expected, prefix
+    print("✓ rankings match a full scan after the updates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Trending recompute benchmark for the Anti-LinkedIn feed.
+Measures the cost of an incremental trending pass (only posts whose reactions
+changed) against a full recompute, for growing corpus sizes.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, UTC
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from app.config import settings
+from app.trending import hot_score, rescore
+
+
+async def seed(collection, total: int, batch_size: int = 5000):
+    """Insert ``total`` scored posts spread over the last 30 days."""
+    await collection.drop()
+    now = datetime.now(UTC)
+    inserted = 0
+    while inserted < total:
+        batch = []
+        for _ in range(min(batch_size, total - inserted)):
+            created_at = now - timedelta(seconds=random.randint(0, 30 * 24 * 3600))
+            counts = {"same": random.randint(0, 20), "helpful": random.randint(0, 20), "upvote": random.randint(0, 50)}
+            batch.append({
+                "content": "benchmark post",
+                "tags": ["career"],
+                "is_private": False,
+                "is_flagged": False,
+                "created_at": created_at,
+                "reaction_counts": counts,
+                "trending_score": hot_score(counts, created_at),
+            })
+        await collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    await collection.create_index([("trending_score", DESCENDING), ("_id", DESCENDING)])
+    await collection.create_index([("reactions_updated_at", ASCENDING)], sparse=True)
+
+
+async def touch(collection, count: int) -> datetime:
+    """Simulate a reaction flush on ``count`` random posts; return the watermark."""
+    watermark = datetime.now(UTC)
+    ids = [doc["_id"] async for doc in collection.aggregate([{"$sample": {"size": count}}, {"$project": {"_id": 1}}])]
+    await collection.update_many(
+        {"_id": {"$in": ids}},
+        {"$inc": {"reaction_counts.upvote": 1}, "$set": {"reactions_updated_at": datetime.now(UTC)}},
+    )
+    return watermark
+
+
+async def run(args):
+    if not settings.MONGODB_URI:
+        print("Error: MONGODB_URI not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    collection = client[settings.DATABASE_NAME][args.collection]
+
+    try:
+        print(f"Rescoring {args.changed} changed posts per pass, batch size {settings.TRENDING_BATCH_SIZE}")
+        print(f"{'corpus':>10} {'incremental (ms)':>18} {'full (ms)':>12} {'full µs/post':>14}")
+        for size in args.sizes:
+            await seed(collection, size)
+
+            watermark = await touch(collection, min(args.changed, size))
+            start = time.perf_counter()
+            await rescore(collection, watermark, settings.TRENDING_BATCH_SIZE)
+            incremental_ms = (time.perf_counter() - start) * 1000
+
+            # A full recompute rescores every post, as a non-incremental worker would
+            await collection.update_many({}, {"$unset": {"trending_score": ""}})
+            start = time.perf_counter()
+            rescored = await rescore(collection, None, settings.TRENDING_BATCH_SIZE)
+            full_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{size:>10} {incremental_ms:>18.1f} {full_ms:>12.1f} {full_ms * 1000 / max(rescored, 1):>14.1f}")
+    finally:
+        if not args.keep:
+            await collection.drop()
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Corpus sizes to test")
+    parser.add_argument("--changed", type=int, default=1000, help="Posts with new reactions per pass")
+    parser.add_argument("--collection", default="bench_trending", help="Scratch collection name")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch collection afterwards")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Wire format benchmark for the Anti-LinkedIn feed.
+Renders pages of posts as the API does and reports, for every negotiated
+representation (JSON or msgpack, identity, gzip or brotli): the bytes on the
+wire, the server CPU to encode a page on a cache miss, the client CPU to
+decode it and the transfer time on a slow mobile link. Cache hits serve the
+stored bytes without encoding. No database is needed.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+import zlib
+from datetime import datetime, timedelta
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from bson import ObjectId
+
+from app.cache import RenderedBody
+from app.config import settings
+from app.negotiation import JSON, MSGPACK, Representation, brotli, msgpack, response_encoder
+from app.serialization import render_posts
+
+SYLLABLES = ["ca", "re", "er", "job", "in", "ter", "view", "man", "age", "sal", "ary", "off", "er", "the", "and",
+             "lay", "pro", "mo", "tion", "team", "work", "ing", "ed", "s", "ly", "con", "tract", "hire", "un", "de"]
+
+
+def vocabulary(rng: random.Random, size: int = 5000) -> list:
+    """Pseudo-words; drawn Zipf-like so a few are everywhere, like real text."""
+    words = list({"".join(rng.choices(SYLLABLES, k=rng.randint(1, 4))) for _ in range(size * 2)})[:size]
+    rng.shuffle(words)
+    return words
+
+
+def make_page(limit: int, rng: random.Random, words: list):
+    """Documents shaped like Motor's output, with varied content up to the 2000 character limit."""
+    now = datetime.utcnow()
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return [
+        {
+            "_id": ObjectId(),
+            "content": " ".join(rng.choices(words, weights=weights, k=rng.randint(20, 300)))[:2000],
+            "tags": rng.sample(["jobsearch", "career", "layoffs", "remote", "burnout", "interviews"], 3),
+            "is_private": False,
+            "is_flagged": False,
+            "created_at": now - timedelta(minutes=i),
+            "reaction_counts": {"same": rng.randint(0, 99), "helpful": rng.randint(0, 99), "upvote": rng.randint(0, 99)},
+            "unique_reactors": rng.randint(0, 200),
+        }
+        for i in range(limit)
+    ]
+
+
+def decode(body: bytes, representation: Representation):
+    """What a client does with the response body."""
+    if representation.encoding == "br":
+        body = brotli.decompress(body)
+    elif representation.encoding == "gzip":
+        body = zlib.decompress(body, 47)
+    return msgpack.unpackb(body) if representation.media_type == MSGPACK else orjson.loads(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limits", type=int, nargs="+", default=[1, 20, settings.MAX_PAGE_SIZE], help="Posts per page")
+    parser.add_argument("--number", type=int, default=50, help="Encodes per timing run")
+    parser.add_argument("--link-kbps", type=float, default=1000, help="Mobile link speed for the transfer column")
+    args = parser.parse_args()
+    rng = random.Random(42)
+    words = vocabulary(rng)
+
+    media_types = [JSON] + ([MSGPACK] if msgpack is not None else [])
+    encodings = [None] + response_encoder.encodings
+    if msgpack is None or brotli is None:
+        print("msgpack and/or brotli are not installed; their rows are skipped\n")
+    print(f"gzip level {response_encoder.gzip_level}, brotli quality {response_encoder.brotli_quality}, "
+          f"compression from {response_encoder.min_bytes} bytes, link {args.link_kbps:g} kbit/s")
+
+    for limit in args.limits:
+        rendered = RenderedBody(render_posts(make_page(limit, rng, words)), etag='"bench"')
+        expected = json.loads(rendered.body)
+        print(f"\nPage of {limit} posts, {len(rendered.body):,} bytes of JSON")
+        print(f"{'representation':>26} {'bytes':>9} {'vs json':>8} {'encode µs':>10} {'decode µs':>10} {'transfer ms':>12}")
+        for media_type in media_types:
+            for encoding in encodings:
+                representation = Representation(media_type, encoding)
+                encoded = response_encoder.encode(rendered, representation)
+                assert decode(encoded.body, response_encoder.effective(rendered, representation)) == expected
+                encode_us = min(timeit.repeat(lambda: response_encoder.encode(rendered, representation),
+                                              number=args.number, repeat=5)) / args.number * 1e6
+                effective = response_encoder.effective(rendered, representation)
+                decode_us = min(timeit.repeat(lambda: decode(encoded.body, effective),
+                                              number=args.number, repeat=5)) / args.number * 1e6
+                name = f"{media_type.split('/')[1]} + {encoding or 'identity'}"
+                if encoding and not encoded.content_encoding:
+                    name += " (sent as is)"
+                transfer_ms = len(encoded.body) * 8 / args.link_kbps
+                print(f"{name:>26} {len(encoded.body):>9,} {len(encoded.body) / len(rendered.body):>8.1%} "
+                      f"{encode_us:>10.1f} {decode_us:>10.1f} {transfer_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
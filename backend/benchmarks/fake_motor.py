@@ -0,0 +1,376 @@
+"""
+In-memory, Motor-compatible stand-in for the parts of MongoDB the API uses.
+
+It exists so the API benchmarks can run without a server while keeping query
+costs shaped like an indexed MongoDB: sorted queries walk a presorted copy of
+the collection, seek past range bounds on the leading sort key with a binary
+search and stop as soon as the page is full, instead of filtering and sorting
+the whole collection on every request. Documents round-trip like BSON:
+datetimes come back naive in UTC and results are copies.
+
+Supported: find/find_one with projections, sort, skip, limit, to_list and
+async iteration; insert_one/insert_many; bulk_write with UpdateOne
+($set/$inc, upsert); equality, $lt/$lte/$gt/$gte/$ne/$in/$exists, $or/$and
+filters. Sessions are not supported, like mongomock.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, UTC
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+_MISSING = object()
+
+
+def _bson(value):
+    """Normalize a value the way a BSON round-trip would."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, dict):
+        return {key: _bson(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_bson(item) for item in value]
+    return value
+
+
+def _get(document: dict, path: str):
+    for part in path.split("."):
+        if not isinstance(document, dict) or part not in document:
+            return _MISSING
+        document = document[part]
+    return document
+
+
+def _compare(value, operator: str, operand) -> bool:
+    if operator == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if operator == "$ne":
+        return not _compare(value, "$eq", operand)
+    if value is _MISSING:
+        return False
+    if isinstance(value, list) and operator in ("$eq", "$in"):
+        return any(_compare(item, operator, operand) for item in value)
+    if operator == "$eq":
+        return value == operand
+    if operator == "$in":
+        return value in operand
+    try:
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+    except TypeError:
+        return False
+    raise NotImplementedError(f"Unsupported query operator {operator}")
+
+
+def _matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, clause) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(_matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict) and condition and next(iter(condition)).startswith("$"):
+            value = _get(document, key)
+            if not all(_compare(value, operator, operand) for operator, operand in condition.items()):
+                return False
+        elif not _compare(_get(document, key), "$eq", condition):
+            return False
+    return True
+
+
+def _project(document: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return dict(document)
+    include = {field for field, flag in projection.items() if flag and field != "_id"}
+    if include:
+        result = {field: document[field] for field in include if field in document}
+        if projection.get("_id", 1):
+            result["_id"] = document["_id"]
+        return result
+    return {field: value for field, value in document.items() if projection.get(field, 1)}
+
+
+def _sort_spec(key_or_list, direction=None) -> Tuple[Tuple[str, int], ...]:
+    if isinstance(key_or_list, str):
+        return ((key_or_list, direction or 1),)
+    return tuple((key, direction) for key, direction in key_or_list)
+
+
+class _Descending:
+    """Wrapper inverting the order of a sort key."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _sort_key(spec):
+    def key(document):
+        parts = []
+        for field, direction in spec:
+            value = _get(document, field)
+            # Missing fields sort before everything, as in MongoDB
+            part = (value is not _MISSING, None if value is _MISSING else value)
+            parts.append(part if direction == 1 else _Descending(part))
+        return tuple(parts)
+    return key
+
+
+class FakeCursor:
+    def __init__(self, collection: "FakeCollection", query: dict, projection: Optional[dict]):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[List[dict]] = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        results = self._execute()
+        return results if length is None else results[:length]
+
+    async def close(self):
+        self._results = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        results = self._execute()
+        if not results:
+            raise StopAsyncIteration
+        return results.pop(0)
+
+    def _execute(self) -> List[dict]:
+        if self._results is None:
+            self._results = [
+                _project(document, self._projection)
+                for document in self._collection._scan(self._query, self._sort, self._skip, self._limit)
+            ]
+        return self._results
+
+
+class FakeCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self._documents: Dict[Any, dict] = {}
+        self._sorted: Dict[tuple, Tuple[List[dict], list]] = {}
+
+    def _changed(self, fields=None):
+        """Drop presorted copies whose order may depend on ``fields`` (all when None)."""
+        if fields is None:
+            self._sorted.clear()
+            return
+        roots = {field.split(".")[0] for field in fields}
+        for spec in list(self._sorted):
+            if any(field.split(".")[0] in roots for field, _ in spec):
+                del self._sorted[spec]
+
+    def _add_sorted(self, document: dict):
+        """Insert a new document into every presorted copy, like an index update."""
+        for spec, (documents, leading) in self._sorted.items():
+            size = len(documents)
+            position = bisect_right(documents, _sort_key(spec)(document), key=_sort_key(spec))
+            documents.insert(position, document)
+            field, direction = spec[0]
+            key = _sort_key(((field, 1),))(document)[0]
+            leading.insert(position if direction == 1 else size - position, key)
+
+    def _presorted(self, spec) -> Tuple[List[dict], list]:
+        """Documents in ``spec`` order plus the leading keys, like an index."""
+        entry = self._sorted.get(spec)
+        if entry is None:
+            documents = sorted(self._documents.values(), key=_sort_key(spec))
+            field, direction = spec[0]
+            leading = [_sort_key(((field, 1),))(document)[0] for document in documents]
+            if direction == -1:
+                leading.reverse()
+            entry = self._sorted[spec] = (documents, leading)
+        return entry
+
+    def _scan(self, query: dict, spec, skip: int, limit: int) -> List[dict]:
+        if spec is None:
+            matched = [document for document in self._documents.values() if _matches(document, query)]
+            return matched[skip:skip + limit if limit else None]
+
+        documents, leading = self._presorted(spec)
+        start, stop = 0, len(documents)
+        field, direction = spec[0]
+        bounds = query.get(field)
+        if isinstance(bounds, dict):
+            # Seek like an index range scan on the leading sort key
+            upper = [(op, bounds[op]) for op in ("$lt", "$lte") if op in bounds]
+            lower = [(op, bounds[op]) for op in ("$gt", "$gte") if op in bounds]
+            ascending_lo, ascending_hi = 0, len(documents)
+            for op, value in upper:
+                key = (True, value)
+                ascending_hi = min(ascending_hi, (bisect_left if op == "$lt" else bisect_right)(leading, key))
+            for op, value in lower:
+                key = (True, value)
+                ascending_lo = max(ascending_lo, (bisect_right if op == "$gt" else bisect_left)(leading, key))
+            if direction == 1:
+                start, stop = ascending_lo, ascending_hi
+            else:
+                start, stop = len(documents) - ascending_hi, len(documents) - ascending_lo
+
+        wanted = skip + limit if limit else None
+        matched = []
+        for index in range(start, max(start, stop)):
+            document = documents[index]
+            if _matches(document, query):
+                matched.append(document)
+                if wanted is not None and len(matched) >= wanted:
+                    break
+        return matched[skip:]
+
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None, session=None, **kwargs) -> FakeCursor:
+        return FakeCursor(self, _bson(filter or {}), projection)
+
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None, session=None, **kwargs):
+        filter = _bson(filter or {})
+        if set(filter) == {"_id"} and not isinstance(filter["_id"], dict):
+            document = self._documents.get(filter["_id"])
+            return _project(document, projection) if document is not None else None
+        results = self._scan(filter, None, 0, 1)
+        return _project(results[0], projection) if results else None
+
+    async def insert_one(self, document: dict, session=None):
+        self._insert(document)
+        return SimpleNamespace(inserted_id=document["_id"], acknowledged=True)
+
+    async def insert_many(self, documents: List[dict], ordered: bool = True, session=None):
+        for document in documents:
+            self._insert(document)
+        return SimpleNamespace(inserted_ids=[document["_id"] for document in documents], acknowledged=True)
+
+    def _insert(self, document: dict):
+        document.setdefault("_id", ObjectId())
+        stored = self._documents[document["_id"]] = _bson(document)
+        self._add_sorted(stored)
+
+    async def bulk_write(self, requests: list, ordered: bool = True, session=None):
+        matched = modified = upserted = 0
+        changed = set()
+        for request in requests:
+            # pymongo write models keep their arguments in private attributes
+            query, update, upsert = _bson(request._filter), _bson(request._doc), request._upsert
+            document = await self._find_raw(query)
+            if document is None:
+                if not upsert:
+                    continue
+                document = {key: value for key, value in query.items() if not key.startswith("$")}
+                document.setdefault("_id", ObjectId())
+                self._documents[document["_id"]] = document
+                self._add_sorted(document)
+                upserted += 1
+            else:
+                matched += 1
+                modified += 1
+            _apply_update(document, update)
+            changed.update(path for fields in update.values() for path in fields)
+        self._changed(changed)
+        return SimpleNamespace(matched_count=matched, modified_count=modified, upserted_count=upserted)
+
+    async def _find_raw(self, query: dict) -> Optional[dict]:
+        if set(query) == {"_id"} and not isinstance(query["_id"], dict):
+            return self._documents.get(query["_id"])
+        results = self._scan(query, None, 0, 1)
+        return results[0] if results else None
+
+    async def count_documents(self, filter: dict, session=None, **kwargs) -> int:
+        filter = _bson(filter)
+        return sum(1 for document in self._documents.values() if _matches(document, filter))
+
+    async def create_index(self, keys, **kwargs):
+        return "_".join(f"{key}_{direction}" for key, direction in _sort_spec(keys))
+
+    async def drop(self):
+        self._documents.clear()
+        self._changed()
+
+
+def _apply_update(document: dict, update: dict):
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            *parents, leaf = path.split(".")
+            target = document
+            for part in parents:
+                target = target.setdefault(part, {})
+            if operator == "$set":
+                target[leaf] = value
+            elif operator == "$inc":
+                target[leaf] = target.get(leaf, 0) + value
+            else:
+                raise NotImplementedError(f"Unsupported update operator {operator}")
+
+
+class FakeDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.get_collection(name)
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    def get_collection(self, name: str, **options) -> FakeCollection:
+        # Read preferences and other options do not matter in memory
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = FakeCollection(name)
+        return collection
+
+
+class FakeMotorClient:
+    def __init__(self):
+        self._databases: Dict[str, FakeDatabase] = {}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = FakeDatabase(name)
+        return database
+
+    async def start_session(self, **kwargs):
+        raise NotImplementedError("FakeMotorClient does not support sessions")
+
+    def close(self):
+        pass
@@ -2,21 +2,101 @@
 """
 Sample data script for Anti-LinkedIn MongoDB database.
 This script adds sample posts and reactions for testing and development.
+With --synthetic N it also generates N random posts through the bulk
+ingestion path, which is fast enough to seed millions of posts.
 """
 
+import argparse
 import asyncio
+import random
 import sys
 import os
+import time
 from datetime import datetime, timedelta, UTC
-from bson import ObjectId
 
 # Add the backend directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.config import settings
+from app.ingest import insert_post_documents
+from app.tags import update_tag_counts
 
-async def add_sample_data():
+SYNTHETIC_TAGS = [
+    "career", "burnout", "jobsearch", "interviews", "growth", "management",
+    "workload", "mentalhealth", "promotion", "impostersyndrome", "quitting",
+    "mentorship", "entrylevel", "frustration", "accomplishment", "projects",
+    "layoffs", "remotework", "salary", "worklifebalance",
+]
+SYNTHETIC_SENTENCES = [
+    "Had another one of those weeks.",
+    "My manager keeps moving the goalposts.",
+    "Finally shipped the thing I've been working on for months.",
+    "Not sure if I should stay or start looking elsewhere.",
+    "Interview loops are getting longer every year.",
+    "Grateful for a team that actually has my back.",
+    "Is it normal to feel this tired on a Monday?",
+    "Negotiated my salary for the first time and it worked.",
+]
+
+def synthetic_posts(count: int, now: datetime):
+    """Random posts with a skewed tag distribution spread over the last 90 days."""
+    # A few tags are very popular and most are rare, like real usage
+    weights = [1 / (rank + 1) for rank in range(len(SYNTHETIC_TAGS))]
+    for _ in range(count):
+        tags = set(random.choices(SYNTHETIC_TAGS, weights=weights, k=random.randint(1, 3)))
+        yield {
+            "content": " ".join(random.choices(SYNTHETIC_SENTENCES, k=random.randint(1, 4))),
+            "tags": sorted(tags),
+            "is_private": random.random() < 0.05,
+            "is_flagged": False,
+            "created_at": now - timedelta(seconds=random.randint(0, 90 * 24 * 3600)),
+            "reaction_counts": {
+                "same": random.randint(0, 50),
+                "helpful": random.randint(0, 30),
+                "upvote": random.randint(0, 80),
+            },
+        }
+
+def public_tags(posts):
+    """Tag lists of the public posts in ``posts``."""
+    return [post["tags"] for post in posts if not post["is_private"]]
+
+async def add_synthetic_posts(db, count: int, batch_size: int, concurrency: int):
+    """Generate and bulk insert ``count`` synthetic posts."""
+    print(f"Generating {count} synthetic posts...")
+    now = datetime.now(UTC)
+    generator = synthetic_posts(count, now)
+    semaphore = asyncio.Semaphore(concurrency)
+    inserted = failed = 0
+    start = time.perf_counter()
+
+    async def insert_batch(batch):
+        nonlocal inserted, failed
+        async with semaphore:
+            errors = await insert_post_documents(db.posts, batch)
+            ok = [post for post, error in zip(batch, errors) if error is None]
+            await update_tag_counts(db.tags, public_tags(ok))
+            inserted += len(ok)
+            failed += len(batch) - len(ok)
+
+    pending = set()
+    while True:
+        batch = [post for _, post in zip(range(batch_size), generator)]
+        if not batch:
+            break
+        # Bound the number of generated-but-unwritten batches held in memory
+        if len(pending) >= concurrency:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        pending.add(asyncio.create_task(insert_batch(batch)))
+    if pending:
+        await asyncio.gather(*pending)
+
+    elapsed = time.perf_counter() - start
+    print(f"✓ Inserted {inserted} synthetic posts ({failed} failed) in {elapsed:.1f}s "
+          f"({inserted / max(elapsed, 1e-9):.0f} posts/s)")
+
+async def add_sample_data(synthetic: int = 0, batch_size: int = 10000, concurrency: int = 4):
     """Add sample data to the database."""
     
     if not settings.MONGODB_URI:
@@ -102,11 +182,9 @@ async def add_sample_data():
         posts_collection = db.posts
         print("Adding sample posts...")
         
-        inserted_posts = []
-        for post in sample_posts:
-            result = await posts_collection.insert_one(post)
-            post["_id"] = result.inserted_id
-            inserted_posts.append(post)
+        errors = await insert_post_documents(posts_collection, sample_posts)
+        inserted_posts = [post for post, error in zip(sample_posts, errors) if error is None]
+        for post in inserted_posts:
             print(f"✓ Added post: {post['content'][:50]}...")
         
         # Sample reactions data
@@ -131,42 +209,21 @@ async def add_sample_data():
             await reactions_collection.insert_many(sample_reactions)
             print(f"✓ Added {len(sample_reactions)} reactions")
         
-        # Sample tags data
-        sample_tags = [
-            {"name": "burnout", "usage_count": 3},
-            {"name": "interviews", "usage_count": 1},
-            {"name": "jobsearch", "usage_count": 3},
-            {"name": "promotion", "usage_count": 1},
-            {"name": "impostersyndrome", "usage_count": 1},
-            {"name": "career", "usage_count": 4},
-            {"name": "management", "usage_count": 1},
-            {"name": "workload", "usage_count": 1},
-            {"name": "quitting", "usage_count": 1},
-            {"name": "mentalhealth", "usage_count": 1},
-            {"name": "mentorship", "usage_count": 1},
-            {"name": "growth", "usage_count": 2},
-            {"name": "entrylevel", "usage_count": 1},
-            {"name": "frustration", "usage_count": 1},
-            {"name": "accomplishment", "usage_count": 1},
-            {"name": "projects", "usage_count": 1}
-        ]
-        
-        # Insert sample tags
-        tags_collection = db.tags
+        # Tag usage counts derived from the inserted posts
         print("Adding sample tags...")
-        for tag in sample_tags:
-            try:
-                await tags_collection.insert_one(tag)
-                print(f"✓ Added tag: {tag['name']}")
-            except Exception as e:
-                # Tag might already exist, that's okay
-                print(f"Tag {tag['name']} already exists or error: {e}")
+        tag_counts = await update_tag_counts(db.tags, public_tags(inserted_posts))
+        print(f"✓ Added {len(tag_counts)} tags")
+        
+        if synthetic:
+            await add_synthetic_posts(db, synthetic, batch_size, concurrency)
         
         print("\n🎉 Sample data added successfully!")
         print(f"\nAdded:")
-        print(f"- {len(sample_posts)} sample posts")
+        print(f"- {len(inserted_posts)} sample posts")
         print(f"- {len(sample_reactions)} sample reactions")
-        print(f"- {len(sample_tags)} sample tags")
+        print(f"- {len(tag_counts)} sample tags")
+        if synthetic:
+            print(f"- {synthetic} synthetic posts requested")
         
     except Exception as e:
         print(f"Error adding sample data: {e}")
@@ -176,4 +233,9 @@ async def add_sample_data():
         client.close()
 
 if __name__ == "__main__":
-    asyncio.run(add_sample_data()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Add sample data to the Anti-LinkedIn database.")
+    parser.add_argument("--synthetic", type=int, default=0, help="Number of synthetic posts to generate")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Synthetic posts per bulk insert")
+    parser.add_argument("--concurrency", type=int, default=4, help="Bulk inserts in flight at once")
+    args = parser.parse_args()
+    asyncio.run(add_sample_data(args.synthetic, args.batch_size, args.concurrency)) 
\ No newline at end of file
@@ -2,96 +2,296 @@
 """
 Schema setup script for Anti-LinkedIn MongoDB database.
 This script creates the necessary collections and indexes for the anonymous social platform.
+
+Indexes are declared in ``INDEXES`` and applied as a diff against what the
+database already has: unchanged indexes are left alone, changed ones are
+rebuilt, and indexes no longer declared are only dropped with --prune.
+With --explain it also runs every query shape the API issues and fails if
+a winning plan scans the whole collection or sorts in memory.
 """
 
+import argparse
 import asyncio
 import sys
 import os
+from datetime import datetime, UTC
+from typing import Dict, List, NamedTuple, Optional
 
 # Add the backend directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
 from app.config import settings
+from app.moderation import VISIBLE, review_queue_pipeline
+from app.pagination import FEED_SORT, TRENDING_SORT, cursor_filter, score_cursor_filter
+
+# Feed reads always filter on VISIBLE, so their indexes skip private and hidden posts
+INDEXES: Dict[str, List[IndexModel]] = {
+    "posts": [
+        # Chronological feed, cursor pagination and export
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="feed_recent", partialFilterExpression=VISIBLE),
+        # Tag feed and tag export
+        IndexModel([("tags", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="feed_tag_recent", partialFilterExpression=VISIBLE),
+        # Trending feed; not partial so the worker's backfill of unscored posts can use it too
+        IndexModel([("trending_score", DESCENDING), ("_id", DESCENDING)]),
+        # Tag trending feed
+        IndexModel([("tags", ASCENDING), ("trending_score", DESCENDING), ("_id", DESCENDING)], name="feed_tag_trending", partialFilterExpression=VISIBLE),
+        # Incremental trending recompute
+        IndexModel([("reactions_updated_at", ASCENDING)], sparse=True),
+        # Full-text search
+        IndexModel([("content", TEXT)], name="content_text"),
+        # Moderation: hidden posts oldest first (for archival), and the review queue of posts with pending flags
+        IndexModel([("is_flagged", ASCENDING), ("created_at", ASCENDING)]),
+        IndexModel([("flag_count", DESCENDING), ("_id", DESCENDING)], name="review_queue", partialFilterExpression={"flag_count": {"$gt": 0}}),
+        # Archival of private posts; visible and hidden ones are found through the indexes above
+        IndexModel([("created_at", ASCENDING)], name="archive_private", partialFilterExpression={"is_private": True}),
+    ],
+    # Posts moved out of the hot tier by archive_posts.py, read once the hot tier runs out
+    "posts_archive": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="feed_recent", partialFilterExpression=VISIBLE),
+        IndexModel([("tags", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="feed_tag_recent", partialFilterExpression=VISIBLE),
+    ],
+    "reactions": [
+        IndexModel([("post_id", ASCENDING)]),
+        IndexModel([("reaction_type", ASCENDING)]),  # "same", "helpful", "upvote"
+        IndexModel([("post_id", ASCENDING), ("reaction_type", ASCENDING)]),
+    ],
+    "flags": [
+        # Review queue lookup and resolving a post's pending flags
+        IndexModel([("post_id", ASCENDING), ("status", ASCENDING)]),
+        # A client flags a post once; the flag buffer upserts on this key
+        IndexModel([("post_id", ASCENDING), ("flagger", ASCENDING)], name="one_flag_per_flagger", unique=True,
+                   partialFilterExpression={"flagger": {"$exists": True}}),
+        IndexModel([("created_at", DESCENDING)]),
+        IndexModel([("status", ASCENDING)]),  # "pending", "resolved"
+    ],
+    "tags": [
+        IndexModel([("name", ASCENDING)], unique=True),
+        IndexModel([("usage_count", DESCENDING)]),
+    ],
+}
+
+# Options that change what an index contains or enforces
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "weights")
+
+
+def _definition(document: dict) -> dict:
+    """Comparable form of an index document, declared or from ``list_indexes``."""
+    key = [(field, int(direction) if isinstance(direction, (int, float)) else direction)
+           for field, direction in document["key"].items()]
+    options = {option: document[option] for option in COMPARED_OPTIONS if option in document}
+    text_fields = [field for field, direction in key if direction == TEXT]
+    if text_fields:
+        # The server stores text indexes under _fts/_ftsx with per-field weights
+        options.setdefault("weights", {field: 1 for field in text_fields})
+        key = [("_fts", "text"), ("_ftsx", 1)]
+    if "weights" in options:
+        options["weights"] = dict(sorted(options["weights"].items()))
+    return {"key": key, **options}
+
+
+async def apply_indexes(db, dry_run: bool = False, prune: bool = False) -> dict:
+    """Bring every collection's indexes in line with ``INDEXES``.
+
+    An index whose name and definition already match is never touched, so
+    running this on every deploy only builds what changed. An existing
+    index with the same keys as a declared one but another name or other
+    options is replaced by it. Returns how many indexes were in each state.
+    """
+    summary = {"unchanged": 0, "created": 0, "rebuilt": 0, "extra": 0, "dropped": 0}
+    for name, models in INDEXES.items():
+        collection = db[name]
+        existing = {index["name"]: index async for index in collection.list_indexes()}
+        existing.pop("_id_", None)
+        to_drop, to_create = [], []
+
+        for model in models:
+            declared = model.document
+            wanted = _definition(declared)
+            current = existing.pop(declared["name"], None)
+            if current is not None and _definition(current) == wanted:
+                summary["unchanged"] += 1
+                continue
+            if current is None:
+                # An index over the same keys would clash with the new one
+                current = next((index for index in existing.values() if _definition(index)["key"] == wanted["key"]), None)
+                if current is not None:
+                    del existing[current["name"]]
+            if current is None:
+                print(f"  + {name}.{declared['name']}")
+                summary["created"] += 1
+            else:
+                reason = "definition changed" if current["name"] == declared["name"] else f"replaces {current['name']}"
+                print(f"  ~ {name}.{declared['name']} ({reason})")
+                to_drop.append(current["name"])
+                summary["rebuilt"] += 1
+            to_create.append(model)
+
+        for index_name in existing:
+            if prune:
+                print(f"  - {name}.{index_name}")
+                to_drop.append(index_name)
+                summary["dropped"] += 1
+            else:
+                print(f"  ? {name}.{index_name} is not declared (kept; --prune drops it)")
+                summary["extra"] += 1
+
+        if dry_run:
+            continue
+        for index_name in to_drop:
+            await collection.drop_index(index_name)
+        if to_create:
+            await collection.create_indexes(to_create)
+    return summary
+
+
+class QueryShape(NamedTuple):
+    """One query the API issues, with placeholder values."""
+    name: str
+    collection: str
+    filter: dict
+    sort: Optional[list] = None
+    pipeline: Optional[list] = None
+    # The text score is only known after matching, so search always sorts in memory
+    allow_sort: bool = False
+
+
+def query_shapes() -> List[QueryShape]:
+    """Every MongoDB read the API and its workers perform."""
+    now = datetime.now(UTC)
+    post_id = ObjectId()
+    tag = {"tags": "career"}
+    return [
+        QueryShape("feed", "posts", VISIBLE, FEED_SORT),
+        QueryShape("feed next page", "posts", {**VISIBLE, **cursor_filter(now, post_id)}, FEED_SORT),
+        QueryShape("tag feed", "posts", {**VISIBLE, **tag}, FEED_SORT),
+        QueryShape("tag feed next page", "posts", {**VISIBLE, **tag, **cursor_filter(now, post_id)}, FEED_SORT),
+        QueryShape("trending", "posts", VISIBLE, TRENDING_SORT),
+        QueryShape("trending next page", "posts", {**VISIBLE, **score_cursor_filter(1.0, post_id)}, TRENDING_SORT),
+        QueryShape("tag trending", "posts", {**VISIBLE, **tag}, TRENDING_SORT),
+        QueryShape("tag trending next page", "posts", {**VISIBLE, **tag, **score_cursor_filter(1.0, post_id)}, TRENDING_SORT),
+        QueryShape("post by id", "posts", {"_id": post_id}),
+        QueryShape("posts by ids", "posts", {"_id": {"$in": [post_id, ObjectId()]}}),
+        QueryShape("export", "posts", {**VISIBLE, "created_at": {"$gte": now}}, [("created_at", 1), ("_id", 1)]),
+        QueryShape("tag export", "posts", {**VISIBLE, **tag, "created_at": {"$gte": now}}, [("created_at", 1), ("_id", 1)]),
+        QueryShape("rescore changed", "posts", {"reactions_updated_at": {"$gte": now}}),
+        QueryShape("rescore unscored", "posts", {"trending_score": {"$exists": False}}),
+        QueryShape("archive public", "posts", {**VISIBLE, "created_at": {"$lt": now}}, [("created_at", 1)]),
+        QueryShape("archive private", "posts", {"is_private": True, "created_at": {"$lt": now}}, [("created_at", 1)]),
+        QueryShape("archive hidden", "posts", {"is_private": False, "is_flagged": True, "created_at": {"$lt": now}}, [("created_at", 1)]),
+        QueryShape("archived feed", "posts_archive", {**VISIBLE, **cursor_filter(now, post_id)}, FEED_SORT),
+        QueryShape("archived tag feed", "posts_archive", {**VISIBLE, **tag, **cursor_filter(now, post_id)}, FEED_SORT),
+        QueryShape("archived post by id", "posts_archive", {"_id": post_id}),
+        QueryShape("archived export", "posts_archive", {**VISIBLE, "created_at": {"$gte": now}}, [("created_at", 1), ("_id", 1)]),
+        QueryShape("search", "posts", {}, pipeline=[
+            {"$match": {"$text": {"$search": "career"}, **VISIBLE}},
+            {"$addFields": {"search_score": {"$meta": "textScore"}}},
+            {"$sort": {"search_score": -1, "_id": -1}},
+            {"$limit": settings.DEFAULT_PAGE_SIZE},
+        ], allow_sort=True),
+        QueryShape("hide check", "posts", {"_id": {"$in": [post_id]}, "is_flagged": False, "flag_count": {"$gte": 5}}),
+        QueryShape("review queue", "posts", {}, pipeline=review_queue_pipeline(settings.DEFAULT_PAGE_SIZE)),
+        QueryShape("review queue next page", "posts", {},
+                   pipeline=review_queue_pipeline(settings.DEFAULT_PAGE_SIZE, (3, post_id))),
+        QueryShape("pending flags of a post", "flags", {"post_id": post_id, "status": "pending"}),
+        QueryShape("flag by flagger", "flags", {"post_id": post_id, "flagger": "0" * 32}),
+        QueryShape("top tags", "tags", {"usage_count": {"$gt": 0}}, [("usage_count", -1)]),
+        QueryShape("tag by name", "tags", {"name": "career"}),
+    ]
 
-async def setup_schema():
+
+def _plan_stages(explain) -> List[str]:
+    """Stage names of every winning plan in an explain document."""
+    stages = []
+
+    def walk(node, in_winning: bool):
+        if isinstance(node, dict):
+            if in_winning and isinstance(node.get("stage"), str):
+                stages.append(node["stage"])
+            for key, value in node.items():
+                if key != "rejectedPlans":
+                    walk(value, in_winning or key == "winningPlan")
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, in_winning)
+
+    walk(explain, False)
+    return stages
+
+
+async def explain_queries(db) -> List[str]:
+    """Explain every query shape; return descriptions of the bad plans."""
+    failures = []
+    for shape in query_shapes():
+        if shape.pipeline is not None:
+            explain = await db.command("aggregate", shape.collection, pipeline=shape.pipeline, explain=True)
+        else:
+            cursor = db[shape.collection].find(shape.filter).limit(settings.DEFAULT_PAGE_SIZE)
+            if shape.sort:
+                cursor = cursor.sort(shape.sort)
+            explain = await cursor.explain()
+        stages = _plan_stages(explain)
+        problems = [stage for stage in ("COLLSCAN", "SORT") if stage in stages]
+        if shape.allow_sort and "SORT" in problems:
+            problems.remove("SORT")
+        if problems:
+            failures.append(f"{shape.name}: {', '.join(problems)} in {' <- '.join(stages)}")
+            print(f"  ✗ {shape.name}: {' <- '.join(stages)}")
+        else:
+            print(f"  ✓ {shape.name}: {' <- '.join(stages)}")
+    return failures
+
+
+async def setup_schema(dry_run: bool = False, prune: bool = False, explain: bool = False) -> bool:
     """Set up MongoDB collections and indexes for Anti-LinkedIn."""
-    
+
     if not settings.MONGODB_URI:
         print("Error: MONGODB_URI not found in environment variables")
-        return
-    
+        return False
+
     # Connect to MongoDB
     client = AsyncIOMotorClient(settings.MONGODB_URI)
     db = client[settings.DATABASE_NAME]
-    
-    print(f"Setting up schema for database: {settings.DATABASE_NAME}")
-    
+
+    print(f"Setting up schema for database: {settings.DATABASE_NAME}{' (dry run)' if dry_run else ''}")
+
     try:
-        # 1. Posts Collection
-        print("Creating posts collection...")
-        posts_collection = db.posts
-        
-        # Create indexes for posts
-        await posts_collection.create_index([("created_at", DESCENDING)])  # For chronological feed
-        await posts_collection.create_index([("tags", ASCENDING)])  # For tag filtering
-        await posts_collection.create_index([("is_flagged", ASCENDING)])  # For moderation
-        await posts_collection.create_index([("is_private", ASCENDING)])  # For private journaling
-        
-        print("✓ Posts collection and indexes created")
-        
-        # 2. Reactions Collection
-        print("Creating reactions collection...")
-        reactions_collection = db.reactions
-        
-        # Create indexes for reactions
-        await reactions_collection.create_index([("post_id", ASCENDING)])
-        await reactions_collection.create_index([("reaction_type", ASCENDING)])  # "same", "helpful", "upvote"
-        await reactions_collection.create_index([("post_id", ASCENDING), ("reaction_type", ASCENDING)])  # Compound index
-        
-        print("✓ Reactions collection and indexes created")
-        
-        # 3. Flags Collection (for moderation)
-        print("Creating flags collection...")
-        flags_collection = db.flags
-        
-        # Create indexes for flags
-        await flags_collection.create_index([("post_id", ASCENDING)])
-        await flags_collection.create_index([("created_at", DESCENDING)])
-        await flags_collection.create_index([("status", ASCENDING)])  # "pending", "reviewed", "resolved"
-        
-        print("✓ Flags collection and indexes created")
-        
-        # 4. Tags Collection (for tag management and analytics)
-        print("Creating tags collection...")
-        tags_collection = db.tags
-        
-        # Create indexes for tags
-        await tags_collection.create_index([("name", ASCENDING)], unique=True)
-        await tags_collection.create_index([("usage_count", DESCENDING)])
-        
-        print("✓ Tags collection and indexes created")
-        
+        summary = await apply_indexes(db, dry_run=dry_run, prune=prune)
+        print(f"✓ Indexes: {summary['unchanged']} unchanged, {summary['created']} created, "
+              f"{summary['rebuilt']} rebuilt, {summary['dropped']} dropped, {summary['extra']} not declared")
+
+        if explain:
+            print("\nExplaining query shapes...")
+            failures = await explain_queries(db)
+            if failures:
+                print(f"\n✗ {len(failures)} query shape(s) need an index:")
+                for failure in failures:
+                    print(f"- {failure}")
+                return False
+            print("✓ Every query shape uses an index")
+
         print("\n🎉 Schema setup completed successfully!")
-        print("\nCollections created:")
-        print("- posts: Anonymous career-related posts")
-        print("- reactions: Simple reactions (same, helpful, upvote)")
-        print("- flags: Content moderation flags")
-        print("- tags: Tag management and analytics")
-        
-        print("\nKey indexes created:")
-        print("- Chronological feed ordering (created_at)")
-        print("- Tag filtering and search")
-        print("- Moderation workflow support")
-        print("- Reaction aggregation")
-        
+        return True
+
     except Exception as e:
         print(f"Error setting up schema: {e}")
         import traceback
         traceback.print_exc()
+        return False
     finally:
         client.close()
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Show the index changes without applying them")
+    parser.add_argument("--prune", action="store_true", help="Drop indexes that are not declared in INDEXES")
+    parser.add_argument("--explain", action="store_true",
+                        help="Fail if any API query shape scans the collection or sorts in memory")
+    args = parser.parse_args()
+    ok = asyncio.run(setup_schema(dry_run=args.dry_run, prune=args.prune, explain=args.explain))
+    sys.exit(0 if ok else 1)
+
 if __name__ == "__main__":
-    asyncio.run(setup_schema()) 
\ No newline at end of file
+    main()
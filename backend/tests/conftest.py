@@ -0,0 +1,74 @@
+"""Shared fixtures: the API on an in-memory MongoDB, called in-process through httpx.
+
+Settings are read when ``app`` is imported, so the environment is set first.
+"""
+
+import os
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.update({
+    "CACHE_URL": "memory://",
+    "DUPLICATE_WORKERS": "0",
+    "LIVE_SOURCE": "memory",
+    "SEARCH_BACKEND": "memory",
+})
+
+from datetime import datetime, timedelta, UTC
+from typing import List
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.cache import response_cache
+from app.config import settings
+from app.database import database
+from app.duplicates import DuplicateIndex, duplicate_detector
+from app.ingest import new_post_document
+from app.main import app
+from app.models.post import PostCreate
+from app.moderation import flag_buffer
+from app.rate_limit import rate_limiter
+from app.reaction_buffer import reaction_buffer
+from app.search import InvertedIndex, search_backend
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch):
+    """A fresh in-memory database and empty in-process caches and buffers for every test."""
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(database, "client", client)
+    monkeypatch.setattr(database, "database", client[settings.DATABASE_NAME])
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+    monkeypatch.setattr(search_backend, "index", InvertedIndex(1000, 1024 * 1024))
+    monkeypatch.setattr(duplicate_detector, "index", DuplicateIndex(3600, 1000, settings.DUPLICATE_THRESHOLD))
+    response_cache.backend.clear()
+    flag_buffer._pending.clear()
+    reaction_buffer._pending.clear()
+    reaction_buffer._reactors.clear()
+    reaction_buffer._unique.clear()
+    return database.database
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://localhost") as client:
+        yield client
+
+
+async def insert_posts(contents: List[str], tags=("career",), **fields) -> List[dict]:
+    """Store public posts one minute apart, oldest first, and make them searchable."""
+    start = datetime.now(UTC) - timedelta(minutes=len(contents))
+    documents = []
+    for i, content in enumerate(contents):
+        document = new_post_document(PostCreate(content=content, tags=list(tags)), start + timedelta(minutes=i))
+        document.update(fields)
+        document["_id"] = (await database.get_collection("posts").insert_one(document)).inserted_id
+        search_backend.add(document)
+        documents.append(document)
+    return documents
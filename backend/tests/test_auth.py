@@ -0,0 +1,20 @@
+from bson import ObjectId
+import pytest
+
+from app.config import settings
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("token, status", [
+    ("moderator-secret", 404),  # authorized; the post does not exist
+    ("wrong", 403),
+    ("modérateur".encode("latin-1"), 403),
+])
+async def test_moderator_token(client, monkeypatch, token, status):
+    monkeypatch.setattr(settings, "MODERATOR_TOKEN", "moderator-secret")
+
+    response = await client.post(f"/api/v1/flags/{ObjectId()}/resolve", json={"action": "restore"},
+                                 headers={"X-Moderator-Token": token})
+
+    assert response.status_code == status
@@ -0,0 +1,67 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.cache import MemoryCacheBackend, RedisCacheBackend, RenderedBody, ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def workers():
+    """Two workers' response caches sharing one fake Redis server."""
+    server = fakeredis.FakeServer()
+    caches = [
+        ResponseCache(RedisCacheBackend(fakeredis.FakeAsyncRedis(server=server), 60, MemoryCacheBackend(100, 5)))
+        for _ in range(2)
+    ]
+    for cache in caches:
+        await cache.backend.start()
+    await asyncio.sleep(0.05)  # let the listeners subscribe
+    yield caches
+    for cache in caches:
+        await cache.backend.close()
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def page(body: bytes) -> RenderedBody:
+    return RenderedBody(body, "cursor", '"etag"', groups=("feed:*", "post:1"))
+
+
+async def test_remote_hit_is_copied_locally_with_its_groups(workers):
+    a, b = workers
+    await a.set("feed", page(b"page"), ("feed:*", "post:1"), a.version)
+
+    assert (await b.get("feed")) == page(b"page")
+    assert b.backend.local.get_local("feed") is not None
+
+    await a.invalidate(["post:1"])
+    await wait_for(lambda: b.backend.local.get_local("feed") is None)
+    assert await b.get("feed") is None
+
+
+async def test_remote_invalidation_rejects_pages_read_before_it(workers):
+    a, b = workers
+    version = b.version  # b starts reading the page from MongoDB
+
+    await a.invalidate(["feed:*"])  # a's write lands meanwhile
+    await wait_for(lambda: b.version != version)
+    await b.set("feed", page(b"stale"), ("feed:*",), version)
+
+    assert await a.get("feed") is None
+    assert await b.get("feed") is None
+
+
+async def test_entries_in_older_format_are_misses(workers):
+    a, _ = workers
+    await a.backend.client.set(a.backend.namespace + "feed", b"\n\n\napplication/json\n\n[]\nbody")
+
+    assert await a.get("feed") is None
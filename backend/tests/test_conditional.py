@@ -0,0 +1,70 @@
+import pytest
+
+from app.conditional import page_etag
+from tests.conftest import insert_posts
+
+pytestmark = pytest.mark.anyio
+
+FUTURE = "Tue, 01 Jan 2036 00:00:00 GMT"
+
+
+async def test_feed_etag_revalidates_with_304(client):
+    await insert_posts(["Salary negotiation went sideways"])
+    first = await client.get("/api/v1/posts/")
+    etag = first.headers["ETag"]
+
+    again = await client.get("/api/v1/posts/", headers={"If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+
+async def test_feed_etag_changes_with_reactions(client, db):
+    [post] = await insert_posts(["Got a referral after 200 applications"])
+    etag = (await client.get("/api/v1/posts/")).headers["ETag"]
+    await db["posts"].update_one({"_id": post["_id"]}, {"$set": {"reaction_counts.same": 3}})
+    await client.post("/api/v1/posts/", json={"content": "Something new", "tags": ["career"]})  # drops cached head pages
+
+    response = await client.get("/api/v1/posts/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_feed_ignores_if_modified_since(client):
+    await insert_posts(["Contract not renewed"])
+
+    response = await client.get("/api/v1/posts/", headers={"If-Modified-Since": FUTURE})
+
+    assert response.status_code == 200
+    assert "Last-Modified" not in response.headers
+
+
+async def test_post_honours_if_modified_since(client):
+    [post] = await insert_posts(["Promotion denied again"])
+    first = await client.get(f"/api/v1/posts/{post['_id']}")
+
+    response = await client.get(f"/api/v1/posts/{post['_id']}",
+                                headers={"If-Modified-Since": first.headers["Last-Modified"]})
+
+    assert response.status_code == 304
+
+
+async def test_private_and_flagged_posts_are_not_shared(client):
+    [public] = await insert_posts(["Public story"])
+    [private] = await insert_posts(["Private story"], is_private=True)
+    [flagged] = await insert_posts(["Flagged story"], is_flagged=True)
+
+    assert (await client.get(f"/api/v1/posts/{public['_id']}")).headers["Cache-Control"].startswith("public")
+    for post in (private, flagged):
+        response = await client.get(f"/api/v1/posts/{post['_id']}")
+        assert response.headers["Cache-Control"].startswith("private")
+
+
+def test_page_etag_covers_unique_reactors():
+    [post] = [{"_id": "a", "reaction_counts": {"same": 1}, "unique_reactors": 1, "is_flagged": False}]
+
+    assert page_etag([post]) != page_etag([{**post, "unique_reactors": 2}])
+    assert page_etag([post]) != page_etag([{**post, "is_flagged": True}])
+    assert page_etag([post]) == page_etag([dict(post)])
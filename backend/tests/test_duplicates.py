@@ -0,0 +1,19 @@
+import pytest
+
+from app.duplicates import duplicate_detector
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_short_common_replies_are_never_rejected(client):
+    for _ in range(duplicate_detector.max_copies + 3):
+        response = await client.post("/api/v1/posts/", json={"content": "Same here.", "tags": ["career"]})
+        assert response.status_code == 200
+
+
+async def test_long_copies_are_rejected_past_max_copies(client):
+    post = {"content": "DM me for a guaranteed FAANG referral, only 49.99 via the link in my bio", "tags": ["jobs"]}
+    statuses = [(await client.post("/api/v1/posts/", json=post)).status_code
+                for _ in range(duplicate_detector.max_copies + 1)]
+
+    assert statuses == [200] * duplicate_detector.max_copies + [409]
@@ -0,0 +1,31 @@
+import pytest
+
+from app.live import CHANGE_STREAM_PIPELINE, MemoryEventSource
+from tests.conftest import insert_posts
+
+pytestmark = pytest.mark.anyio
+
+
+def reactions_change(post: dict) -> dict:
+    return {
+        "operationType": "update",
+        "documentKey": {"_id": post["_id"]},
+        "updateDescription": {"updatedFields": {"reaction_counts.same": 1, "reactions_updated_at": 1}},
+        "fullDocument": post,
+    }
+
+
+async def test_reactions_to_hidden_posts_are_not_streamed(db):
+    public, private, flagged = await insert_posts(["Public", "Private", "Flagged"])
+    await db["posts"].update_one({"_id": private["_id"]}, {"$set": {"is_private": True}})
+    await db["posts"].update_one({"_id": flagged["_id"]}, {"$set": {"is_flagged": True}})
+    posts = await db["posts"].find().to_list(length=None)
+    await db["changes"].insert_many([reactions_change(post) for post in posts])
+
+    streamed = await db["changes"].aggregate(CHANGE_STREAM_PIPELINE[:1]).to_list(length=None)
+    assert [change["documentKey"]["_id"] for change in streamed] == [public["_id"]]
+
+    source = MemoryEventSource()
+    await source.reactions_flushed([str(post["_id"]) for post in posts])
+    assert source._queue.qsize() == 1
+    assert (await source._queue.get())[1]["_id"] == public["_id"]
@@ -0,0 +1,92 @@
+from hashlib import blake2b
+
+import pytest
+
+from app import moderation
+from app.duplicates import duplicate_detector
+from app.moderation import flag_buffer, flagger_id, review_queue_pipeline
+from schema_setup import INDEXES
+from tests.conftest import insert_posts
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+async def flag_indexes(db):
+    await db["flags"].create_indexes(INDEXES["flags"])
+
+
+async def test_repeated_flags_from_one_client_count_once(client, db):
+    [post] = await insert_posts(["My manager took credit for my launch"])
+    for _ in range(flag_buffer.threshold + 2):
+        response = await client.post("/api/v1/flags/", json={"post_id": str(post["_id"]), "reason": "spam"})
+        assert response.status_code == 202
+        # Separate flushes, so the unique index rather than the buffer dedupes
+        await flag_buffer.flush()
+
+    stored = await db["posts"].find_one({"_id": post["_id"]})
+    assert stored["flag_count"] == 1
+    assert stored["is_flagged"] is False
+    assert await db["flags"].count_documents({"post_id": post["_id"]}) == 1
+
+
+async def test_distinct_flaggers_hide_post_at_threshold(db):
+    [post] = await insert_posts(["Recruiter ghosted me after five rounds"])
+    for i in range(flag_buffer.threshold - 1):
+        flag_buffer.add(str(post["_id"]), "spam", f"10.0.0.{i}")
+    await flag_buffer.flush()
+    assert (await db["posts"].find_one({"_id": post["_id"]}))["is_flagged"] is False
+
+    flag_buffer.add(str(post["_id"]), "spam", "10.0.0.0")  # already counted
+    await flag_buffer.flush()
+    assert (await db["posts"].find_one({"_id": post["_id"]}))["is_flagged"] is False
+
+    flag_buffer.add(str(post["_id"]), "spam", "10.0.1.1")
+    await flag_buffer.flush()
+    stored = await db["posts"].find_one({"_id": post["_id"]})
+    assert stored["flag_count"] == flag_buffer.threshold
+    assert stored["is_flagged"] is True
+
+
+async def test_failed_flush_is_retried_without_double_counting(db, monkeypatch):
+    [post] = await insert_posts(["Offer rescinded the day before I started"])
+    flag_buffer.add(str(post["_id"]), "spam", "10.0.0.1")
+    original = flag_buffer._recount
+
+    async def failing_recount(post_ids):
+        raise RuntimeError("primary stepped down")
+
+    monkeypatch.setattr(flag_buffer, "_recount", failing_recount)
+    await flag_buffer.flush()
+    monkeypatch.setattr(flag_buffer, "_recount", original)
+    await flag_buffer.flush()
+
+    assert await db["flags"].count_documents({"post_id": post["_id"]}) == 1
+    assert (await db["posts"].find_one({"_id": post["_id"]}))["flag_count"] == 1
+
+
+async def test_duplicate_flagged_post_is_in_review_queue(client, db, monkeypatch):
+    monkeypatch.setattr(duplicate_detector, "action", "flag")
+    monkeypatch.setattr(duplicate_detector, "max_copies", 1)
+    content = {"content": "Apply now at totally-real-jobs dot example for a remote role", "tags": ["jobs"]}
+    await client.post("/api/v1/posts/", json=content)
+    copy = (await client.post("/api/v1/posts/", json=content)).json()
+    assert copy["is_flagged"] is True
+
+    # mongomock lacks $lookup with a pipeline; the queue's own stages pick the posts
+    stages = [stage for stage in review_queue_pipeline(20) if "$lookup" not in stage and "$project" not in stage]
+    queue = await db["posts"].aggregate(stages).to_list(length=20)
+
+    assert [str(post["_id"]) for post in queue] == [copy["_id"]]
+    flag = await db["flags"].find_one({"post_id": queue[0]["_id"]})
+    assert (flag["reason"], flag["status"]) == ("duplicate", "pending")
+
+
+def test_flagger_id_depends_on_the_secret_key(monkeypatch):
+    address = "203.0.113.7"
+    stored = flagger_id(address)
+    assert stored == flagger_id(address)
+    assert stored != blake2b(address.encode(), digest_size=16, person=b"flagger").hexdigest()
+
+    monkeypatch.setattr(moderation, "_flagger_key", b"another deployment's key")
+    assert flagger_id(address) != stored
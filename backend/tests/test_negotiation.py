@@ -0,0 +1,42 @@
+import msgpack
+import pytest
+
+from app.negotiation import JSON, MSGPACK, NDJSON, response_encoder
+from tests.conftest import insert_posts
+
+
+@pytest.mark.parametrize("accept, accept_encoding, expected", [
+    (None, None, (JSON, None)),
+    ("application/msgpack", "gzip, br", (MSGPACK, "br")),
+    ("application/x-msgpack", "gzip", (MSGPACK, "gzip")),
+    ("application/json, application/msgpack;q=0.5", "br;q=0.1, gzip", (JSON, "gzip")),
+    ("text/html", "identity", (JSON, None)),
+    ("*/*", "*", (JSON, "br")),
+])
+def test_negotiate(accept, accept_encoding, expected):
+    headers = {name: value for name, value in (("accept", accept), ("accept-encoding", accept_encoding)) if value}
+
+    assert tuple(response_encoder.negotiate(headers)) == expected
+
+
+def test_negotiate_offered_types_in_order():
+    representation = response_encoder.negotiate({"accept": "application/msgpack"}, [NDJSON, MSGPACK])
+
+    assert representation.media_type == MSGPACK
+    assert response_encoder.negotiate({}, [NDJSON, MSGPACK]).media_type == NDJSON
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+async def test_feed_in_msgpack_matches_json(client, encoding):
+    await insert_posts([f"Week {i} of the job hunt: " + "applied, rejected, ghosted. " * 10 for i in range(10)])
+    plain = await client.get("/api/v1/posts/", headers={"Accept-Encoding": "identity"})
+
+    response = await client.get("/api/v1/posts/", headers={"Accept": MSGPACK, "Accept-Encoding": encoding})
+
+    assert response.headers["Content-Type"] == MSGPACK
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Vary"] == "Accept, Accept-Encoding"
+    assert response.headers["ETag"] != plain.headers["ETag"]
+    # httpx has already undone the Content-Encoding
+    assert msgpack.unpackb(response.content) == plain.json()
@@ -0,0 +1,44 @@
+import pytest
+
+from tests.conftest import insert_posts
+
+pytestmark = pytest.mark.anyio
+
+
+async def fetch_all(client, path: str, **params) -> list:
+    """Follow ``X-Next-Cursor`` from the first page to the last."""
+    pages = []
+    cursor = None
+    while True:
+        response = await client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append([post["_id"] for post in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+async def test_feed_cursor_walks_every_post_once(client):
+    posts = await insert_posts([f"Interview story {i}" for i in range(7)])
+
+    pages = await fetch_all(client, "/api/v1/posts/", limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [post_id for page in pages for post_id in page] == [str(post["_id"]) for post in reversed(posts)]
+
+
+async def test_feed_cursor_is_stable_when_posts_are_added(client):
+    await insert_posts([f"Layoff story {i}" for i in range(4)])
+    first = await client.get("/api/v1/posts/", params={"limit": 2})
+    await insert_posts(["A newer post"])
+
+    second = await client.get("/api/v1/posts/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+
+    seen = {post["_id"] for post in first.json()}
+    assert len(second.json()) == 2
+    assert seen.isdisjoint(post["_id"] for post in second.json())
+
+
+async def test_feed_rejects_invalid_cursor(client):
+    response = await client.get("/api/v1/posts/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
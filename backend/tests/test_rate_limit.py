@@ -0,0 +1,48 @@
+import pytest
+
+from app.rate_limit import MemoryRateLimitBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable ``time.monotonic`` for the rate limiter."""
+    now = [1000.0]
+    monkeypatch.setattr("app.rate_limit.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_burst_then_waits(clock):
+    backend = MemoryRateLimitBackend(rate=1.0, burst=3, max_keys=10)
+
+    assert [backend.acquire_local("client", 1) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.acquire_local("client", 1) == pytest.approx(1.0)
+
+
+def test_bucket_refills_at_rate(clock):
+    backend = MemoryRateLimitBackend(rate=2.0, burst=4, max_keys=10)
+    for _ in range(4):
+        backend.acquire_local("client", 1)
+
+    clock[0] += 1.0  # two tokens back
+
+    assert backend.acquire_local("client", 1) == 0.0
+    assert backend.acquire_local("client", 1) == 0.0
+    assert backend.acquire_local("client", 1) == pytest.approx(0.5)
+
+
+def test_bucket_never_exceeds_burst(clock):
+    backend = MemoryRateLimitBackend(rate=1.0, burst=2, max_keys=10)
+    backend.acquire_local("client", 1)
+
+    clock[0] += 3600
+
+    assert backend.acquire_local("client", 2) == 0.0
+    assert backend.acquire_local("client", 1) == pytest.approx(1.0)
+
+
+def test_clients_have_separate_buckets(clock):
+    backend = MemoryRateLimitBackend(rate=1.0, burst=1, max_keys=10)
+
+    assert backend.acquire_local("a", 1) == 0.0
+    assert backend.acquire_local("b", 1) == 0.0
+    assert backend.acquire_local("a", 1) > 0
@@ -0,0 +1,32 @@
+import time
+
+from bson.timestamp import Timestamp
+
+from app.config import settings
+from app.database import READ_TOKEN_MAX_SKEW_SECONDS, decode_read_token, encode_read_token
+
+
+def test_signed_token_round_trips():
+    operation_time = Timestamp(int(time.time()), 7)
+
+    assert decode_read_token(encode_read_token(operation_time)) == operation_time
+
+
+def test_unsigned_and_forged_tokens_are_ignored():
+    now = int(time.time())
+    token = encode_read_token(Timestamp(now, 7))
+    forged = f"{now}.8.{token.rsplit('.', 1)[1]}"
+
+    assert decode_read_token(f"{now}.7") is None
+    assert decode_read_token(forged) is None
+    assert decode_read_token(token[:-1] + "é") is None
+    assert decode_read_token("garbage") is None
+
+
+def test_future_and_expired_tokens_are_ignored():
+    now = time.time()
+    future = encode_read_token(Timestamp(int(now) + READ_TOKEN_MAX_SKEW_SECONDS + 60, 1))
+    expired = encode_read_token(Timestamp(int(now) - settings.FEED_MAX_STALENESS_SECONDS - 1, 1))
+
+    assert decode_read_token(future, now) is None
+    assert decode_read_token(expired, now) is None
@@ -0,0 +1,18 @@
+import pytest
+
+from tests.test_pagination import fetch_all
+from tests.conftest import insert_posts
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_search_pages_stay_full_when_hits_are_hidden(client, db):
+    posts = await insert_posts([f"burnout burnout story {i}" for i in range(9)])
+    hidden = [post["_id"] for post in posts[::3]]
+    await db["posts"].update_many({"_id": {"$in": hidden}}, {"$set": {"is_flagged": True}})
+
+    pages = await fetch_all(client, "/api/v1/posts/search", q="burnout", limit=2)
+
+    found = [post_id for page in pages for post_id in page]
+    assert [len(page) for page in pages[:-1]] == [2] * (len(pages) - 1)
+    assert sorted(found) == sorted(str(post["_id"]) for post in posts if post["_id"] not in hidden)
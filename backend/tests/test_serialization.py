@@ -0,0 +1,33 @@
+from datetime import datetime
+
+import orjson
+import pytest
+from bson import ObjectId
+
+from app.config import settings
+from app.serialization import render_post, render_posts
+
+
+def legacy_post() -> dict:
+    """A post as Motor returns it, stored before unique_reactors existed."""
+    return {
+        "_id": ObjectId(),
+        "content": "Four years at the company and laid off by email",
+        "tags": ["layoffs"],
+        "is_private": False,
+        "created_at": datetime(2024, 3, 1, 9, 30, 15, 123000),
+        "is_flagged": False,
+        "reaction_counts": {"same": 4, "helpful": 0, "upvote": 1},
+    }
+
+
+@pytest.mark.parametrize("render", [lambda post: render_post(post), lambda post: render_posts([post])])
+def test_fast_and_model_paths_agree_on_legacy_documents(render, monkeypatch):
+    post = legacy_post()
+    rendered = {}
+    for fast in (True, False):
+        monkeypatch.setattr(settings, "FAST_SERIALIZATION", fast)
+        rendered[fast] = orjson.loads(render(dict(post)))
+
+    assert rendered[True] == rendered[False]
+    assert (rendered[True] if isinstance(rendered[True], dict) else rendered[True][0])["unique_reactors"] == 0
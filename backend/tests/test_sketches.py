@@ -0,0 +1,135 @@
+import pytest
+
+from app.database import database
+from app.reaction_buffer import reaction_buffer
+from app.sketches import HyperLogLog, ScalableBloomFilter, reactor_sketches
+from tests.conftest import insert_posts
+
+
+def keys(prefix: str, n: int):
+    return [f"{prefix}{i}".encode() for i in range(n)]
+
+
+def test_bloom_reports_added_keys_once():
+    bloom = ScalableBloomFilter(100, 0.01, 1 << 20)
+
+    new = sum(bloom.add(key) for key in keys("a", 1000))
+
+    assert new > 1000 * (1 - 0.01)  # a few false positives are allowed
+    assert not any(bloom.add(key) for key in keys("a", 1000))
+    assert len(bloom.slices) > 1  # grew past its initial capacity
+
+
+def test_bloom_false_positive_rate_stays_under_target():
+    bloom = ScalableBloomFilter(1000, 0.01, 1 << 20)
+    for key in keys("in", 5000):
+        bloom.add(key)
+
+    false_positives = sum(key in bloom for key in keys("out", 20000))
+
+    assert false_positives / 20000 < 0.01
+
+
+def test_full_bloom_accepts_new_keys_without_storing_them():
+    bloom = ScalableBloomFilter(100, 0.01, 256)
+    for key in keys("a", 2000):
+        bloom.add(key)
+
+    assert bloom.is_full()
+    assert bloom.nbytes() <= 256
+    assert sum(key in bloom for key in keys("out", 2000)) / 2000 < 0.05
+
+
+@pytest.mark.parametrize("n", [10, 1000, 50000])
+def test_hyperloglog_estimate_within_error(n):
+    hll = HyperLogLog(12)
+    for key in keys("r", n):
+        hll.add(key)
+        hll.add(key)  # repeats never count
+
+    assert abs(hll.count() - n) <= max(2, 4 * 1.04 / 64 * n)
+
+
+def test_hyperloglog_round_trips_sparse_and_dense():
+    for n in (5, 5000):
+        hll = HyperLogLog(12)
+        for key in keys("r", n):
+            hll.add(key)
+        restored = HyperLogLog.from_bytes(hll.to_bytes())
+        assert restored.registers == hll.registers
+    assert len(HyperLogLog(12).to_bytes()) == 2
+
+
+@pytest.mark.anyio
+async def test_reactions_count_once_per_client(client, db):
+    [post] = await insert_posts(["Took a pay cut to escape a toxic team"])
+    cookies = [{"reactor": f"client-token-{i:04d}"} for i in range(3)]
+    for _ in range(2):  # every client reacts twice, in separate flushes
+        for cookie in cookies:
+            client.cookies.update(cookie)
+            response = await client.post("/api/v1/reactions/",
+                                         json={"post_id": str(post["_id"]), "reaction_type": "same"})
+            assert response.status_code == 202
+        await reaction_buffer.flush()
+
+    stored = await db["posts"].find_one({"_id": post["_id"]})
+    assert stored["reaction_counts"]["same"] == 3
+    assert stored["unique_reactors"] == 3
+
+
+@pytest.mark.anyio
+async def test_first_reaction_counts_under_the_issued_cookie(client, db):
+    [post] = await insert_posts(["Negotiated a raise with a competing offer"])
+    client.cookies.clear()
+    for _ in range(2):
+        response = await client.post("/api/v1/reactions/", json={"post_id": str(post["_id"]), "reaction_type": "same"})
+        assert response.status_code == 202
+    await reaction_buffer.flush()
+
+    stored = await db["posts"].find_one({"_id": post["_id"]})
+    assert stored["reaction_counts"]["same"] == 1
+    assert stored["unique_reactors"] == 1
+
+
+class FailingBulkWrite:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def bulk_write(self, *args, **kwargs):
+        raise ConnectionError("primary stepped down")
+
+
+@pytest.mark.anyio
+async def test_failed_write_keeps_unique_reactors_for_the_next_flush(db, monkeypatch):
+    [post] = await insert_posts(["Quit without another job lined up"])
+    get_collection = database.get_collection
+    monkeypatch.setattr(database, "get_collection",
+                        lambda name: FailingBulkWrite(get_collection(name)) if name == "posts" else get_collection(name))
+    reaction_buffer.add(str(post["_id"]), "same", client="client-token-0000")
+    await reaction_buffer.flush()
+    monkeypatch.setattr(database, "get_collection", get_collection)
+    await reaction_buffer.flush()
+
+    stored = await db["posts"].find_one({"_id": post["_id"]})
+    assert stored["reaction_counts"]["same"] == 1
+    assert stored["unique_reactors"] == 1
+
+
+@pytest.mark.anyio
+async def test_abandoned_merges_are_counted(db, monkeypatch):
+    [post] = await insert_posts(["Asked for feedback and got a checklist"])
+
+    async def conflicting_merge(post_id, reactors, document):
+        return None
+
+    monkeypatch.setattr(reactor_sketches, "_merge", conflicting_merge)
+    before = reactor_sketches.stats()
+    merged = await reactor_sketches.dedupe({str(post["_id"]): {"same": {"client-token-0000", "client-token-0001"}}})
+
+    after = reactor_sketches.stats()
+    assert merged == {}
+    assert after["merge_failures"] == before["merge_failures"] + 1
+    assert after["dropped"] == before["dropped"] + 2
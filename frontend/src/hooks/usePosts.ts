@@ -16,12 +16,12 @@ export const usePosts = (limit = 20): UsePostsReturn => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [hasMore, setHasMore] = useState(true);
-  const [skip, setSkip] = useState(0);
+  const [cursor, setCursor] = useState<string | null>(null);
 
-  const fetchPosts = useCallback(async (skipCount = 0, append = false) => {
+  const fetchPosts = useCallback(async (pageCursor: string | null = null, append = false) => {
     try {
       setError(null);
-      const fetchedPosts = await postsApi.getPosts(skipCount, limit);
+      const { posts: fetchedPosts, nextCursor } = await postsApi.getPosts(pageCursor ?? undefined, limit);
       
       if (append) {
         setPosts(prev => [...prev, ...fetchedPosts]);
@@ -29,8 +29,8 @@ export const usePosts = (limit = 20): UsePostsReturn => {
         setPosts(fetchedPosts);
       }
       
-      setHasMore(fetchedPosts.length === limit);
-      setSkip(skipCount + fetchedPosts.length);
+      setHasMore(nextCursor !== null);
+      setCursor(nextCursor);
     } catch (err) {
       const errorMessage = err instanceof Error ? err.message : 'Failed to fetch posts';
       setError(errorMessage);
@@ -56,19 +56,19 @@ export const usePosts = (limit = 20): UsePostsReturn => {
 
   const refreshPosts = useCallback(async () => {
     setLoading(true);
-    setSkip(0);
-    await fetchPosts(0, false);
+    setCursor(null);
+    await fetchPosts(null, false);
   }, [fetchPosts]);
 
   const loadMore = useCallback(async () => {
     if (!loading && hasMore) {
-      await fetchPosts(skip, true);
+      await fetchPosts(cursor, true);
     }
-  }, [loading, hasMore, skip, fetchPosts]);
+  }, [loading, hasMore, cursor, fetchPosts]);
 
   // Initial load
   useEffect(() => {
-    fetchPosts(0, false);
+    fetchPosts(null, false);
   }, [fetchPosts]);
 
   return {
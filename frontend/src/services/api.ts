@@ -7,6 +7,8 @@ const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api
 const api = axios.create({
   baseURL: API_BASE_URL,
   timeout: 10000,
+  // Send the read_after cookie so reads right after a post include it
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -49,6 +51,11 @@ export interface Post {
   };
 }
 
+export interface PostsPage {
+  posts: Post[];
+  nextCursor: string | null;
+}
+
 export interface CreatePostRequest {
   content: string;
   tags: string[];
@@ -57,15 +64,18 @@ export interface CreatePostRequest {
 
 // API functions
 export const postsApi = {
-  // Get all posts
-  getPosts: async (skip = 0, limit = 20, tag?: string): Promise<Post[]> => {
+  // Get a page of posts; pass the previous page's nextCursor to continue
+  getPosts: async (cursor?: string, limit = 20, tag?: string): Promise<PostsPage> => {
     const params = new URLSearchParams();
-    if (skip > 0) params.append('skip', skip.toString());
+    if (cursor) params.append('cursor', cursor);
     if (limit !== 20) params.append('limit', limit.toString());
     if (tag) params.append('tag', tag);
     
     const response = await api.get(`/posts?${params.toString()}`);
-    return response.data;
+    return {
+      posts: response.data,
+      nextCursor: response.headers['x-next-cursor'] ?? null,
+    };
   },
 
   // Get a specific post